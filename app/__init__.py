@@ -1,19 +1,26 @@
 # Importações necessárias
+import time
+_INICIO_IMPORTACAO = time.perf_counter()  # Início da importação do pacote (diagnóstico de inicialização)
 from flask import Flask, render_template  # Flask para criar a aplicação e render_template para renderizar templates
 from app.extensions import db, bcrypt  # Importa as extensões SQLAlchemy e Bcrypt
 from app.config import Config  # Importa as configurações da aplicação
+from app import diagnostico  # Importa a contagem de queries por requisição
 from flask_login import LoginManager, login_required  # Importa o gerenciador de login e o decorador de proteção de rotas
 
 # Inicialização do gerenciador de login
 # O LoginManager é responsável por gerenciar as sessões de usuário
 login_manager = LoginManager()
 
-def create_app():
+def create_app(config_class=Config):
     """
     Função factory que cria e configura a aplicação Flask
+    Args:
+        config_class: Classe de configuração (padrão: Config; o benchmark usa uma subclasse com SQLite)
     Returns:
         app: A aplicação Flask configurada
     """
+    inicio = time.perf_counter()
+
     # Cria a instância da aplicação Flask
     # template_folder e static_folder são definidos para apontar para os diretórios corretos
     app = Flask(__name__, 
@@ -22,30 +29,83 @@ def create_app():
     
     # Carrega as configurações da aplicação do objeto Config
     # Inclui configurações como chave secreta, banco de dados, etc.
-    app.config.from_object(Config)
+    app.config.from_object(config_class)
     
     # Inicialização das extensões com a aplicação
+    diagnostico.configurar_pool(app)  # Instrumenta o pool de conexões (antes de criar o engine)
     db.init_app(app)        # Inicializa o SQLAlchemy
     bcrypt.init_app(app)    # Inicializa o Bcrypt para hash de senhas
     login_manager.init_app(app)  # Inicializa o gerenciador de login
+    diagnostico.init_app(app)    # Inicializa a contagem de queries por requisição
+
+    # Métricas de desempenho por endpoint (tempo, comandos SQL, tamanho da resposta)
+    from app.metricas import coletor_metricas
+    coletor_metricas.init_app(app)
     
     # Configurações do gerenciador de login
     login_manager.login_view = 'auth.login'  # Define a view para login
     login_manager.login_message = 'Por favor, faça login para acessar o sistema.'  # Mensagem de redirecionamento
     login_manager.login_message_category = 'info'  # Categoria da mensagem flash
     
+    # Pool de processos para hashing e verificação de senhas
+    from app.autenticacao.senhas import servico_senhas
+    servico_senhas.init_app(app)
+
+    # Limitador de tentativas de login
+    from app.autenticacao.limitador import limitador_login
+    limitador_login.init_app(app)
+
+    # Cache dos usuários autenticados (evita consultar TBUSUARIO/TBROLE a cada requisição)
+    from app.autenticacao.cache import cache_usuarios, UsuarioAutenticado
+    cache_usuarios.init_app(app)
+
+    # Mapa de permissões dos perfis (carregado na primeira verificação)
+    from app.autenticacao.permissoes import mapa_permissoes
+    mapa_permissoes.init_app(app)
+
+    # Versões das tabelas para as respostas condicionais (ETag / 304)
+    from app.versionamento import cache_versoes
+    cache_versoes.init_app(app)
+
+    # Tarefas em segundo plano (exportações e importações)
+    from app.tarefas.gerenciador import gerenciador_tarefas
+    gerenciador_tarefas.init_app(app)
+
+    # Cache dos dados do dashboard
+    from app.dashboard.resumo import cache_dashboard
+    cache_dashboard.init_app(app)
+
+    # Arquivos estáticos com hash de conteúdo e variantes pré-compactadas
+    from app.assets.construcao import assets
+    assets.init_app(app)
+
     # Função que carrega o usuário pelo ID
     @login_manager.user_loader
     def load_user(user_id):
         """
-        Carrega um usuário pelo seu ID
+        Carrega um usuário pelo seu ID, consultando primeiro o cache de usuários.
+        Em caso de ausência no cache, usuário e perfil são lidos em uma única consulta.
         Args:
             user_id: ID do usuário a ser carregado
         Returns:
-            User: Objeto do usuário ou None se não encontrado
+            UsuarioAutenticado: Usuário autenticado ou None se não encontrado/inativo
         """
-        from app.autenticacao.models import User
-        return User.query.get(int(user_id))
+        from app.autenticacao.models import User, Role
+        user_id = int(user_id)
+
+        usuario = cache_usuarios.obter(user_id)
+        if usuario is None:
+            dados = db.session.query(
+                User.ID_USUARIO, User.NOME_USUARIO, User.LOGIN, User.EMAIL,
+                User.ID_ROLE, User.ATIVO, Role.NOME_ROLE
+            ).join(Role, User.ID_ROLE == Role.ID_ROLE).filter(User.ID_USUARIO == user_id).first()
+            if dados is None:
+                return None
+            usuario = UsuarioAutenticado(*dados)
+            cache_usuarios.guardar(user_id, usuario)
+
+        # Usuários inativados perdem o acesso (no máximo após o TTL do cache)
+        return usuario if usuario.ATIVO else None
     
     # Rota para a página inicial
     # @login_required garante que apenas usuários autenticados possam acessar
@@ -74,9 +134,46 @@ def create_app():
     from app.cargo import bp as cargo_bp
     app.register_blueprint(cargo_bp, url_prefix='/cargos')
     
+    # Blueprint de treinamentos por colaborador (conformidade)
+    from app.treina_colaborador import bp as treina_colaborador_bp
+    app.register_blueprint(treina_colaborador_bp, url_prefix='/treina_colaborador')
+    
+    # Blueprint de treinamentos por cargo (lacunas)
+    from app.treina_cargo import bp as treina_cargo_bp
+    app.register_blueprint(treina_cargo_bp, url_prefix='/treina_cargo')
+    
+    # Blueprint do dashboard (resumos de conformidade)
+    from app.dashboard import bp as dashboard_bp
+    app.register_blueprint(dashboard_bp, url_prefix='/dashboard')
+    
+    # Blueprint de acompanhamento das tarefas em segundo plano
+    from app.tarefas import bp as tarefas_bp
+    app.register_blueprint(tarefas_bp, url_prefix='/tarefas')
+    
+    # Blueprint de importação de planilhas
+    from app.importacao import bp as importacao_bp
+    app.register_blueprint(importacao_bp, url_prefix='/importacao')
+    
+    # Blueprint dos arquivos estáticos com hash (cache imutável)
+    from app.assets import bp as assets_bp
+    app.register_blueprint(assets_bp, url_prefix='/assets')
+    
+    # Blueprint de verificação de saúde (pool de conexões)
+    from app.saude import bp as saude_bp
+    app.register_blueprint(saude_bp, url_prefix='/health')
+    
     # Blueprint de tratamento de erros
     from app.errors import bp as errors_bp
     app.register_blueprint(errors_bp)
 
+    # Inicializa o gravador de auditoria (TBLOG) no modo configurado
+    # Importado após o registro dos blueprints: app.logs e app.autenticacao importam um ao outro,
+    # e o pacote app.autenticacao precisa ser carregado primeiro
+    from app.logs.auditoria import gravador_auditoria
+    gravador_auditoria.init_app(app)
+
+    # Registra os tempos de importação e de create_app() e a memória do processo
+    diagnostico.registrar_inicializacao(app, _INICIO_IMPORTACAO, inicio)
+
     # Retorna a aplicação configurada
     return app
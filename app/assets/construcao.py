@@ -0,0 +1,175 @@
+import gzip
+import hashlib
+import json
+import os
+import posixpath
+import re
+from flask import current_app, url_for
+
+ARQUIVO_MANIFESTO = 'manifest.json'
+TAMANHO_HASH = 12  # Caracteres do SHA-256 incluídos no nome do arquivo
+
+# Extensões de texto que recebem variantes compactadas (imagens JPG/PNG já são compactadas)
+EXTENSOES_COMPACTAVEIS = {'.css', '.js', '.svg', '.json', '.txt', '.html', '.map'}
+
+# Variantes compactadas: codificação (Content-Encoding) -> sufixo do arquivo, na ordem de preferência
+VARIANTES = (('br', '.br'), ('gzip', '.gz'))
+
+URL_CSS = re.compile(r'''url\(\s*(['"]?)([^'")]+)\1\s*\)''')
+
+
+def _hash(conteudo):
+    return hashlib.sha256(conteudo).hexdigest()[:TAMANHO_HASH]
+
+
+def _nome_com_hash(relativo, conteudo):
+    """ css/style.css -> css/style.<hash>.css """
+    raiz, extensao = posixpath.splitext(relativo)
+    return f'{raiz}.{_hash(conteudo)}{extensao}'
+
+
+def _gravar(caminho, conteudo):
+    """ Grava de forma atômica (vários processos podem construir os assets ao mesmo tempo) """
+    os.makedirs(os.path.dirname(caminho), exist_ok=True)
+    temporario = f'{caminho}.{os.getpid()}.tmp'
+    with open(temporario, 'wb') as arquivo:
+        arquivo.write(conteudo)
+    os.replace(temporario, caminho)
+
+
+def _compactar(conteudo):
+    """ Retorna as variantes compactadas menores que o original: {codificação: bytes} """
+    variantes = {'gzip': gzip.compress(conteudo, compresslevel=9, mtime=0)}
+    try:
+        import brotli  # Dependência opcional; sem ela, apenas gzip
+        variantes['br'] = brotli.compress(conteudo, quality=11)
+    except ImportError:
+        pass
+    return {codificacao: dados for codificacao, dados in variantes.items() if len(dados) < len(conteudo)}
+
+
+def _reescrever_css(relativo, conteudo, arquivos):
+    """ Troca as referências url() do CSS pelos nomes com hash (relativas ao próprio CSS) """
+    pasta = posixpath.dirname(relativo)
+
+    def substituir(correspondencia):
+        aspas, referencia = correspondencia.groups()
+        if referencia.startswith(('data:', 'http:', 'https:', '//', '#', '/')):
+            return correspondencia.group(0)
+        caminho, complemento = re.match(r'([^?#]*)(.*)', referencia).groups()  # Mantém ?query e #fragmento
+        alvo = posixpath.normpath(posixpath.join(pasta, caminho))
+        if alvo not in arquivos:
+            return correspondencia.group(0)
+        novo = posixpath.relpath(arquivos[alvo]['arquivo'], pasta or '.')
+        return f'url({aspas}{novo}{complemento}{aspas})'
+
+    return URL_CSS.sub(substituir, conteudo.decode('utf-8')).encode('utf-8')
+
+
+def _arquivos_origem(origem):
+    for raiz, _, nomes in os.walk(origem):
+        for nome in sorted(nomes):
+            caminho = os.path.join(raiz, nome)
+            yield os.path.relpath(caminho, origem).replace(os.sep, '/'), caminho
+
+
+def construir_assets(origem, destino):
+    """
+    Copia os arquivos de `origem` (static/) para `destino` com o hash do conteúdo no nome,
+    grava ao lado as variantes .gz e .br dos arquivos de texto e gera o manifesto
+    {nome original: {arquivo, variantes}}. Os CSS são processados por último, para que suas
+    referências url() apontem para os nomes com hash. Arquivos de construções anteriores são
+    mantidos, para que páginas já abertas continuem encontrando os nomes antigos.
+    Retorna o manifesto.
+    """
+    arquivos = {}
+    origens = sorted(_arquivos_origem(origem), key=lambda item: (item[0].endswith('.css'), item[0]))
+    for relativo, caminho in origens:
+        with open(caminho, 'rb') as arquivo:
+            conteudo = arquivo.read()
+        if relativo.endswith('.css'):
+            conteudo = _reescrever_css(relativo, conteudo, arquivos)
+
+        nome = _nome_com_hash(relativo, conteudo)
+        destino_arquivo = os.path.join(destino, nome)
+        variantes = []
+        if not os.path.exists(destino_arquivo):
+            _gravar(destino_arquivo, conteudo)
+        if posixpath.splitext(relativo)[1].lower() in EXTENSOES_COMPACTAVEIS:
+            for codificacao, dados in _compactar(conteudo).items():
+                sufixo = dict(VARIANTES)[codificacao]
+                if not os.path.exists(destino_arquivo + sufixo):
+                    _gravar(destino_arquivo + sufixo, dados)
+                variantes.append(codificacao)
+        arquivos[relativo] = {'arquivo': nome, 'variantes': sorted(variantes)}
+
+    manifesto = {'versao': _hash(json.dumps(arquivos, sort_keys=True).encode('utf-8')), 'arquivos': arquivos}
+    _gravar(os.path.join(destino, ARQUIVO_MANIFESTO), json.dumps(manifesto, indent=2, sort_keys=True).encode('utf-8'))
+    return manifesto
+
+
+def carregar_manifesto(destino):
+    """ Lê o manifesto gerado por construir_assets, ou None se ainda não existir """
+    try:
+        with open(os.path.join(destino, ARQUIVO_MANIFESTO), encoding='utf-8') as arquivo:
+            return json.load(arquivo)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return None
+
+
+def desatualizado(origem, destino):
+    """ Indica se algum arquivo de origem é mais recente que o manifesto (ou se ele não existe) """
+    try:
+        gerado_em = os.path.getmtime(os.path.join(destino, ARQUIVO_MANIFESTO))
+    except OSError:
+        return True
+    return any(os.path.getmtime(caminho) > gerado_em for _, caminho in _arquivos_origem(origem))
+
+
+class Assets:
+    """
+    Mantém o manifesto dos arquivos estáticos com hash e fornece asset_url aos templates.
+    Na inicialização, os assets são (re)construídos se static/ tiver mudado desde a última construção
+    (ASSETS_CONSTRUIR_NA_INICIALIZACAO); também podem ser gerados na implantação com `flask assets construir`.
+    """
+
+    def __init__(self):
+        self.origem = None
+        self.destino = None
+        self.manifesto = None
+
+    def init_app(self, app):
+        self.origem = app.static_folder
+        self.destino = app.config['ASSETS_DIRETORIO'] or os.path.join(app.instance_path, 'assets')
+        if app.config['ASSETS_CONSTRUIR_NA_INICIALIZACAO'] and desatualizado(self.origem, self.destino):
+            self.manifesto = construir_assets(self.origem, self.destino)
+        else:
+            self.manifesto = carregar_manifesto(self.destino)
+        app.extensions['assets'] = self
+        app.add_template_global(asset_url)
+
+    def construir(self):
+        self.manifesto = construir_assets(self.origem, self.destino)
+        return self.manifesto
+
+    @property
+    def versao(self):
+        return self.manifesto['versao'] if self.manifesto else ''
+
+    def nome_com_hash(self, filename):
+        entrada = self.manifesto['arquivos'].get(filename) if self.manifesto else None
+        return entrada['arquivo'] if entrada else None
+
+
+assets = Assets()
+
+
+def asset_url(filename, **valores):
+    """
+    Equivalente a url_for('static', filename=...) que aponta para a cópia com hash do arquivo (/assets/...),
+    servida com cache imutável. Sem manifesto, ou para arquivos fora dele, usa a rota static.
+    """
+    nome = current_app.extensions['assets'].nome_com_hash(filename)
+    if nome is None:
+        return url_for('static', filename=filename, **valores)
+    return url_for('assets.servir', nome=nome, **valores)
@@ -0,0 +1,41 @@
+import mimetypes
+import os
+import click
+from flask import request, send_file, abort, current_app
+from werkzeug.security import safe_join
+from app.assets import bp
+from app.assets.construcao import assets, VARIANTES, ARQUIVO_MANIFESTO
+
+
+@bp.route('/<path:nome>', methods=['GET'])
+def servir(nome):
+    """
+    Serve um arquivo estático com hash no nome (gerado por construir_assets).
+    Como o conteúdo de um nome nunca muda, a resposta pode ficar no cache do navegador por
+    ASSETS_MAX_AGE com `immutable`, sem revalidação. Se o navegador aceitar, envia a variante
+    pré-compactada (brotli ou gzip) gravada na construção, sem compactar a cada requisição.
+    """
+    caminho = safe_join(assets.destino, nome)
+    if caminho is None or nome == ARQUIVO_MANIFESTO or not os.path.isfile(caminho):
+        abort(404)
+
+    mimetype = mimetypes.guess_type(caminho)[0] or 'application/octet-stream'
+    codificacao = next((codificacao for codificacao, sufixo in VARIANTES
+                        if request.accept_encodings[codificacao] and os.path.isfile(caminho + sufixo)), None)
+
+    if codificacao:
+        resposta = send_file(caminho + dict(VARIANTES)[codificacao], mimetype=mimetype)
+        resposta.headers['Content-Encoding'] = codificacao
+    else:
+        resposta = send_file(caminho, mimetype=mimetype)
+
+    resposta.headers['Vary'] = 'Accept-Encoding'
+    resposta.headers['Cache-Control'] = f"public, max-age={current_app.config['ASSETS_MAX_AGE']}, immutable"
+    return resposta
+
+
+@bp.cli.command('construir')
+def construir():
+    """ Gera os arquivos com hash, as variantes .gz/.br e o manifesto (uso: flask assets construir) """
+    manifesto = assets.construir()
+    click.echo(f"{len(manifesto['arquivos'])} arquivo(s) em {assets.destino} (versão {manifesto['versao']}).")
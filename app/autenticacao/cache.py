@@ -0,0 +1,87 @@
+import threading
+import time
+from collections import OrderedDict, namedtuple
+from flask_login import UserMixin
+
+# Dados do perfil necessários durante a requisição (current_user.role.NOME_ROLE)
+PerfilAutenticado = namedtuple('PerfilAutenticado', ['ID_ROLE', 'NOME_ROLE'])
+
+
+class UsuarioAutenticado(UserMixin):
+    """
+    Cópia leve do usuário autenticado, mantida em cache entre requisições.
+    Expõe os mesmos atributos de User usados pelas rotas e templates (ID_USUARIO,
+    NOME_USUARIO, role.NOME_ROLE...), sem depender de uma sessão do SQLAlchemy.
+    """
+
+    def __init__(self, ID_USUARIO, NOME_USUARIO, LOGIN, EMAIL, ID_ROLE, ATIVO, NOME_ROLE):
+        self.ID_USUARIO = ID_USUARIO
+        self.NOME_USUARIO = NOME_USUARIO
+        self.LOGIN = LOGIN
+        self.EMAIL = EMAIL
+        self.ID_ROLE = ID_ROLE
+        self.ATIVO = ATIVO
+        self.role = PerfilAutenticado(ID_ROLE, NOME_ROLE)
+
+    @property
+    def is_active(self):
+        return bool(self.ATIVO)
+
+    def get_id(self):
+        return str(self.ID_USUARIO)  # Retorna o ID do usuário como string
+
+    @property
+    def permissoes(self):
+        """ Conjunto de permissões do perfil, lido do mapa pré-calculado (sem consulta ao banco) """
+        from app.autenticacao.permissoes import mapa_permissoes
+        return mapa_permissoes.permissoes_do_perfil(self.ID_ROLE)
+
+
+class CacheUsuarios:
+    """
+    Cache LRU com expiração (TTL) dos usuários autenticados, indexado pelo ID do usuário.
+    Em um acerto, o carregamento do usuário da requisição não consulta o banco.
+    O TTL limita o tempo em que outro processo pode enxergar um usuário já alterado/inativado.
+    """
+
+    def __init__(self, ttl=60, tamanho_max=1024):
+        self.ttl = ttl
+        self.tamanho_max = tamanho_max
+        self._itens = OrderedDict()
+        self._lock = threading.Lock()
+
+    def init_app(self, app):
+        self.ttl = app.config['CACHE_USUARIOS_TTL']
+        self.tamanho_max = app.config['CACHE_USUARIOS_TAMANHO']
+        self.invalidar()
+
+    def obter(self, id_usuario):
+        """ Retorna o usuário em cache ou None se ausente/expirado """
+        with self._lock:
+            item = self._itens.get(id_usuario)
+            if item is None:
+                return None
+            expira_em, usuario = item
+            if expira_em < time.monotonic():
+                del self._itens[id_usuario]
+                return None
+            self._itens.move_to_end(id_usuario)
+            return usuario
+
+    def guardar(self, id_usuario, usuario):
+        with self._lock:
+            self._itens[id_usuario] = (time.monotonic() + self.ttl, usuario)
+            self._itens.move_to_end(id_usuario)
+            while len(self._itens) > self.tamanho_max:
+                self._itens.popitem(last=False)  # Remove o item usado há mais tempo
+
+    def invalidar(self, id_usuario=None):
+        """ Remove um usuário do cache ou, sem argumento, limpa o cache inteiro """
+        with self._lock:
+            if id_usuario is None:
+                self._itens.clear()
+            else:
+                self._itens.pop(id_usuario, None)
+
+
+cache_usuarios = CacheUsuarios()
@@ -0,0 +1,102 @@
+import threading
+import time
+
+
+class BackendMemoria:
+    """
+    Armazena os baldes de tokens no próprio processo.
+    Cada verificação é O(1); os baldes ociosos (já cheios novamente) são removidos
+    em uma varredura periódica, para que a memória não cresça com IPs/logins antigos.
+    """
+
+    def __init__(self, intervalo_limpeza=60):
+        self.intervalo_limpeza = intervalo_limpeza
+        self._baldes = {}  # chave -> (tokens, instante da última atualização, instante em que volta a ficar cheio)
+        self._proxima_limpeza = time.monotonic() + intervalo_limpeza
+        self._lock = threading.Lock()
+
+    def consumir(self, chave, capacidade, taxa):
+        """ Consome um token do balde da chave; retorna False se não houver token disponível """
+        agora = time.monotonic()
+        with self._lock:
+            if agora >= self._proxima_limpeza:
+                self._limpar(agora)
+
+            tokens, ultimo, _ = self._baldes.get(chave, (capacidade, agora, agora))
+            tokens = min(capacidade, tokens + (agora - ultimo) * taxa)
+
+            permitido = tokens >= 1
+            if permitido:
+                tokens -= 1
+            self._baldes[chave] = (tokens, agora, agora + (capacidade - tokens) / taxa)
+            return permitido
+
+    def _limpar(self, agora):
+        # Um balde que já teria se enchido novamente equivale a um balde novo e pode ser descartado
+        self._baldes = {chave: balde for chave, balde in self._baldes.items() if balde[2] > agora}
+        self._proxima_limpeza = agora + self.intervalo_limpeza
+
+
+class BackendRedis:
+    """
+    Armazena os baldes de tokens no Redis, compartilhando os limites entre vários processos/servidores.
+    A atualização do balde é feita por um script Lua, de forma atômica. Requer o pacote redis.
+    """
+
+    SCRIPT = """
+        local dados = redis.call('HMGET', KEYS[1], 'tokens', 'ultimo')
+        local capacidade = tonumber(ARGV[1])
+        local taxa = tonumber(ARGV[2])
+        local agora = tonumber(ARGV[3])
+        local tokens = tonumber(dados[1]) or capacidade
+        local ultimo = tonumber(dados[2]) or agora
+        tokens = math.min(capacidade, tokens + (agora - ultimo) * taxa)
+        local permitido = 0
+        if tokens >= 1 then
+            tokens = tokens - 1
+            permitido = 1
+        end
+        redis.call('HSET', KEYS[1], 'tokens', tokens, 'ultimo', agora)
+        redis.call('EXPIRE', KEYS[1], math.ceil(capacidade / taxa))
+        return permitido
+    """
+
+    def __init__(self, url):
+        import redis  # Dependência opcional, necessária apenas com LIMITADOR_REDIS_URL
+        self._cliente = redis.Redis.from_url(url)
+        self._script = self._cliente.register_script(self.SCRIPT)
+
+    def consumir(self, chave, capacidade, taxa):
+        return bool(self._script(keys=[chave], args=[capacidade, taxa, time.time()]))
+
+
+class LimitadorLogin:
+    """
+    Limita as tentativas de login por IP e por login com baldes de tokens (token bucket).
+    Cada balde comporta até N tentativas e é reabastecido continuamente ao longo da janela configurada.
+    A verificação acontece antes de qualquer consulta ao banco ou verificação bcrypt.
+    """
+
+    def __init__(self):
+        self.backend = BackendMemoria()
+        self.capacidade_ip = 20
+        self.capacidade_login = 5
+        self.janela = 60
+
+    def init_app(self, app):
+        self.capacidade_ip = app.config['LOGIN_TENTATIVAS_POR_IP']
+        self.capacidade_login = app.config['LOGIN_TENTATIVAS_POR_LOGIN']
+        self.janela = app.config['LOGIN_JANELA_SEGUNDOS']
+
+        url_redis = app.config.get('LIMITADOR_REDIS_URL')
+        self.backend = BackendRedis(url_redis) if url_redis else BackendMemoria()
+
+    def permitir(self, ip, login):
+        """ Retorna False se o IP ou o login excederam o limite de tentativas """
+        if not self.backend.consumir(f'login:ip:{ip}', self.capacidade_ip, self.capacidade_ip / self.janela):
+            return False
+        return self.backend.consumir(f'login:usuario:{login.strip().lower()}',
+                                     self.capacidade_login, self.capacidade_login / self.janela)
+
+
+limitador_login = LimitadorLogin()
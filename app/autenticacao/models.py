@@ -2,6 +2,20 @@ from app.extensions import db
 from flask_login import UserMixin
 from datetime import datetime
 
+# Tabela associativa entre perfis e permissões
+role_permission = db.Table(
+    'TBROLE_PERMISSION',
+    db.Column('ID_ROLE', db.Integer, db.ForeignKey('TBROLE.ID_ROLE'), primary_key=True),  # ID do perfil
+    db.Column('ID_PERMISSION', db.Integer, db.ForeignKey('TBPERMISSION.ID_PERMISSION'), primary_key=True)  # ID da permissão
+)
+
+class Permission(db.Model):
+    __tablename__ = 'TBPERMISSION'
+    
+    ID_PERMISSION = db.Column(db.Integer, primary_key=True)  # Identificador único da permissão
+    NOME_PERMISSION = db.Column(db.String(50), nullable=False)  # Nome da permissão (usado em @requires_permission)
+    DESCRICAO = db.Column(db.String(255))  # Descrição da permissão
+
 class Role(db.Model):
     __tablename__ = 'TBROLE'
     
@@ -11,6 +25,7 @@ class Role(db.Model):
     DATA_CADASTRO = db.Column(db.DateTime, default=datetime.utcnow)  # Data de cadastro do perfil
     
     usuarios = db.relationship('User', backref='role', lazy=True)  # Relacionamento com usuários
+    permissoes = db.relationship('Permission', secondary=role_permission, lazy=True)  # Permissões do perfil
 
 class User(db.Model, UserMixin):
     __tablename__ = 'TBUSUARIO'
@@ -0,0 +1,106 @@
+import threading
+import time
+from functools import wraps
+from flask import current_app, flash, jsonify, redirect, url_for
+from flask_login import current_user
+from app.extensions import db
+from app.autenticacao.models import Role, Permission, role_permission
+
+# Nomes das permissões (TBPERMISSION.NOME_PERMISSION) usadas nas rotas
+GERENCIAR_ACESSO = 'GERENCIAR_ACESSO'
+EXCLUIR_CARGO = 'EXCLUIR_CARGO'
+IMPORTAR_DADOS = 'IMPORTAR_DADOS'
+VISUALIZAR_METRICAS = 'VISUALIZAR_METRICAS'
+
+# Perfil que possui todas as permissões, independentemente de TBROLE_PERMISSION
+PERFIL_ADMINISTRADOR = 'Administrador'
+
+
+class MapaPermissoes:
+    """
+    Mapa pré-calculado das permissões de cada perfil.
+    Cada permissão recebe um bit; cada perfil, a máscara com os bits das suas permissões.
+    O mapa é carregado uma vez (três consultas) e recarregado quando os perfis mudam
+    ou após PERMISSOES_TTL segundos, de modo que a verificação por requisição é um AND de inteiros.
+    """
+
+    def __init__(self):
+        self._bits = {}            # NOME_PERMISSION -> bit
+        self._mascaras = {}        # ID_ROLE -> máscara de bits
+        self._superusuarios = frozenset()  # IDs dos perfis com todas as permissões
+        self._expira_em = 0
+        self._lock = threading.Lock()
+
+    def init_app(self, app):
+        self.invalidar()  # Um mapa carregado por outra aplicação não é reaproveitado
+
+    def invalidar(self):
+        """ Força a recarga do mapa na próxima verificação """
+        self._expira_em = 0
+
+    def _carregar(self):
+        permissoes = db.session.query(Permission.ID_PERMISSION, Permission.NOME_PERMISSION) \
+            .order_by(Permission.ID_PERMISSION).all()
+        bit_por_id = {id_permissao: 1 << posicao for posicao, (id_permissao, _) in enumerate(permissoes)}
+        bits = {nome: bit_por_id[id_permissao] for id_permissao, nome in permissoes}
+
+        mascaras = {}
+        for id_role, id_permissao in db.session.query(role_permission.c.ID_ROLE, role_permission.c.ID_PERMISSION):
+            mascaras[id_role] = mascaras.get(id_role, 0) | bit_por_id.get(id_permissao, 0)
+
+        superusuarios = frozenset(
+            id_role for (id_role,) in
+            db.session.query(Role.ID_ROLE).filter(Role.NOME_ROLE == PERFIL_ADMINISTRADOR)
+        )
+
+        self._bits, self._mascaras, self._superusuarios = bits, mascaras, superusuarios
+        self._expira_em = time.monotonic() + current_app.config['PERMISSOES_TTL']
+
+    def _garantir_carregado(self):
+        if self._expira_em < time.monotonic():
+            with self._lock:
+                if self._expira_em < time.monotonic():
+                    self._carregar()
+
+    def tem_permissao(self, id_role, nome_permissao):
+        """ Verifica se o perfil possui a permissão informada """
+        self._garantir_carregado()
+        if id_role in self._superusuarios:
+            return True
+        bit = self._bits.get(nome_permissao, 0)
+        return bool(bit and self._mascaras.get(id_role, 0) & bit)
+
+    def permissoes_do_perfil(self, id_role):
+        """ Retorna o conjunto de nomes de permissões do perfil """
+        self._garantir_carregado()
+        if id_role in self._superusuarios:
+            return frozenset(self._bits)
+        mascara = self._mascaras.get(id_role, 0)
+        return frozenset(nome for nome, bit in self._bits.items() if mascara & bit)
+
+
+mapa_permissoes = MapaPermissoes()
+
+
+def requires_permission(nome_permissao, redirecionar_para=None, mensagem='Acesso não autorizado'):
+    """
+    Decorador que restringe a rota aos perfis com a permissão informada.
+    Deve ser usado abaixo de @login_required.
+    Sem permissão, rotas de API respondem 403 em JSON; se redirecionar_para for informado,
+    a mensagem é exibida via flash e o usuário é redirecionado para esse endpoint.
+    """
+    def decorador(f):
+        @wraps(f)
+        def wrapper(*args, **kwargs):
+            if not current_user.is_authenticated:
+                return current_app.login_manager.unauthorized()
+
+            if not mapa_permissoes.tem_permissao(current_user.ID_ROLE, nome_permissao):
+                if redirecionar_para:
+                    flash(mensagem, 'danger')
+                    return redirect(url_for(redirecionar_para))
+                return jsonify({'error': 'Não autorizado'}), 403
+
+            return f(*args, **kwargs)
+        return wrapper
+    return decorador
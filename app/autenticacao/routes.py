@@ -1,16 +1,31 @@
-from flask import render_template, redirect, url_for, flash, request, jsonify
+from flask import render_template, redirect, url_for, flash, request, jsonify, current_app
 from flask_login import login_user, logout_user, login_required, current_user
 from datetime import datetime
 
-from app.extensions import db, bcrypt
+from app.extensions import db
 from app.autenticacao import bp
 from app.autenticacao.models import User, Role
+from app.autenticacao.cache import cache_usuarios
+from app.autenticacao.senhas import servico_senhas, ServicoSenhaIndisponivel
+from app.autenticacao.limitador import limitador_login
+from app.autenticacao.permissoes import requires_permission, mapa_permissoes, GERENCIAR_ACESSO
 from app.logs.routes import registrar_log
+from app.versionamento import etag_por_versao
 
 # ========================================================
 #               ROTAS DE AUTENTICAÇÃO
 # ========================================================
 
+def _servidor_ocupado():
+    """
+    Resposta para quando o pool de verificação de senhas está saturado:
+    exibe o formulário novamente com status 503, pedindo nova tentativa.
+    """
+    flash('Servidor ocupado. Tente novamente em instantes.', 'warning')
+    template = 'autenticacao/login.html' if request.endpoint == 'auth.login' else 'autenticacao/register.html'
+    return render_template(template), 503, {'Retry-After': '5'}
+
+
 @bp.route('/login', methods=['GET', 'POST'])
 def login():
     """
@@ -26,14 +41,30 @@ def login():
         login_input = request.form['login']
         senha = request.form['senha']
 
+        # Limita as tentativas por IP e por login antes de qualquer acesso ao banco ou ao bcrypt
+        if not limitador_login.permitir(request.remote_addr, login_input):
+            flash('Muitas tentativas de login. Aguarde alguns instantes e tente novamente.', 'danger')
+            return render_template('autenticacao/login.html'), 429, {'Retry-After': str(current_app.config['LOGIN_JANELA_SEGUNDOS'])}
+
         # Busca um usuário ativo com o login informado
         user = User.query.filter_by(LOGIN=login_input, ATIVO=True).first()
 
-        if user and bcrypt.check_password_hash(user.SENHA, senha):
+        try:
+            senha_valida = user is not None and servico_senhas.verificar(user.SENHA, senha)
+        except ServicoSenhaIndisponivel:
+            return _servidor_ocupado()
+
+        if senha_valida:
             # Credenciais corretas: realiza o login
             login_user(user, remember=False)
             # Atualiza o registro do último acesso do usuário
             user.ULTIMO_ACESSO = datetime.utcnow()
+            # Se o custo do bcrypt configurado mudou, regrava o hash com o novo custo
+            if servico_senhas.precisa_rehash(user.SENHA):
+                try:
+                    user.SENHA = servico_senhas.gerar_hash(senha)
+                except ServicoSenhaIndisponivel:
+                    pass  # O rehash é refeito em um próximo login
             db.session.commit()
 
             # Redireciona para a página de destino (se houver) ou para a home
@@ -87,7 +118,10 @@ def register():
             return redirect(url_for('auth.register'))
 
         # Gera o hash da senha
-        senha_hash = bcrypt.generate_password_hash(senha).decode('utf-8')
+        try:
+            senha_hash = servico_senhas.gerar_hash(senha)
+        except ServicoSenhaIndisponivel:
+            return _servidor_ocupado()
 
         # Cria o objeto do novo usuário
         novo_usuario = User(
@@ -102,16 +136,18 @@ def register():
         try:
             # Adiciona o novo usuário à sessão e salva no banco de dados
             db.session.add(novo_usuario)
-            db.session.commit()
+            db.session.flush()  # Aplica a alteração sem confirmar; o commit inclui o log
 
             # Registra a ação no log
             registrar_log(
-                usuario_id=current_user.ID_USUARIO if current_user.is_authenticated else None,
+                # Em um auto cadastro, o próprio usuário criado é o autor (TBLOG.ID_USUARIO é obrigatório)
+                usuario_id=current_user.ID_USUARIO if current_user.is_authenticated else novo_usuario.ID_USUARIO,
                 acao='INSERT',
                 tabela='TBUSUARIO',
                 id_registro=novo_usuario.ID_USUARIO,
                 dados_novos=novo_usuario.to_dict()
             )
+            db.session.commit()  # Confirma a alteração e o log na mesma transação
 
             flash('Usuário registrado com sucesso!', 'success')
             return redirect(url_for('auth.login'))
@@ -132,15 +168,13 @@ def register():
 
 @bp.route('/gerenciar-acesso')
 @login_required
+@requires_permission(GERENCIAR_ACESSO, redirecionar_para='home')
+@etag_por_versao('TBUSUARIO', 'TBROLE')
 def gerenciar_acesso():
     """
     Interface de gerenciamento de usuários e perfis.
-    Apenas usuários com perfil de 'Administrador' podem acessar esta rota.
+    Apenas perfis com a permissão GERENCIAR_ACESSO podem acessar esta rota.
     """
-    if current_user.role.NOME_ROLE != 'Administrador':
-        flash('Acesso não autorizado', 'danger')
-        return redirect(url_for('home'))
-
     # Renderiza a interface passando a lista de usuários e perfis
     return render_template(
         'autenticacao/gerenciar_acesso.html',
@@ -155,29 +189,26 @@ def gerenciar_acesso():
 
 @bp.route('/usuario/<int:id>', methods=['GET'])
 @login_required
+@requires_permission(GERENCIAR_ACESSO)
+@etag_por_versao('TBUSUARIO')
 def get_usuario(id):
     """
     Retorna os dados de um usuário específico no formato JSON.
-    Requer que o usuário atual seja Administrador.
+    Requer a permissão GERENCIAR_ACESSO.
     """
-    if current_user.role.NOME_ROLE != 'Administrador':
-        return jsonify({'error': 'Não autorizado'}), 403
-
     usuario = User.query.get_or_404(id)
     return jsonify(usuario.to_dict())
 
 
 @bp.route('/usuario/<int:id>/toggle', methods=['POST'])
 @login_required
+@requires_permission(GERENCIAR_ACESSO)
 def toggle_usuario(id):
     """
     Ativa ou desativa um usuário.
-    Requer que o usuário atual seja Administrador.
+    Requer a permissão GERENCIAR_ACESSO.
     Recebe via JSON o novo status (ativo/inativo) e registra a alteração.
     """
-    if current_user.role.NOME_ROLE != 'Administrador':
-        return jsonify({'error': 'Não autorizado'}), 403
-
     usuario = User.query.get_or_404(id)
     data = request.get_json()
 
@@ -187,7 +218,7 @@ def toggle_usuario(id):
 
         # Atualiza o status do usuário conforme o dado recebido
         usuario.ATIVO = data['ativo']
-        db.session.commit()
+        db.session.flush()  # Aplica a alteração sem confirmar; o commit inclui o log
 
         # Registra a alteração no log
         registrar_log(
@@ -198,6 +229,8 @@ def toggle_usuario(id):
             dados_anteriores=dados_anteriores,
             dados_novos=usuario.to_dict()
         )
+        db.session.commit()  # Confirma a alteração e o log na mesma transação
+        cache_usuarios.invalidar(usuario.ID_USUARIO)  # O usuário alterado é recarregado na próxima requisição
 
         return jsonify({'message': 'Status do usuário atualizado'})
 
@@ -208,15 +241,13 @@ def toggle_usuario(id):
 
 @bp.route('/usuario/<int:id>', methods=['PUT'])
 @login_required
+@requires_permission(GERENCIAR_ACESSO)
 def update_usuario(id):
     """
     Atualiza os dados de um usuário.
-    Requer que o usuário atual seja Administrador.
+    Requer a permissão GERENCIAR_ACESSO.
     Permite atualizar nome, email, perfil e, opcionalmente, a senha.
     """
-    if current_user.role.NOME_ROLE != 'Administrador':
-        return jsonify({'error': 'Não autorizado'}), 403
-
     usuario = User.query.get_or_404(id)
     data = request.get_json()
 
@@ -231,9 +262,9 @@ def update_usuario(id):
 
         # Se uma nova senha foi informada, atualiza a senha
         if 'senha' in data and data['senha']:
-            usuario.SENHA = bcrypt.generate_password_hash(data['senha']).decode('utf-8')
+            usuario.SENHA = servico_senhas.gerar_hash(data['senha'])
 
-        db.session.commit()
+        db.session.flush()  # Aplica a alteração sem confirmar; o commit inclui o log
 
         # Registra a alteração no log
         registrar_log(
@@ -244,9 +275,14 @@ def update_usuario(id):
             dados_anteriores=dados_anteriores,
             dados_novos=usuario.to_dict()
         )
+        db.session.commit()  # Confirma a alteração e o log na mesma transação
+        cache_usuarios.invalidar(usuario.ID_USUARIO)  # O usuário alterado é recarregado na próxima requisição
 
         return jsonify({'message': 'Usuário atualizado com sucesso'})
 
+    except ServicoSenhaIndisponivel:
+        db.session.rollback()
+        return jsonify({'error': 'Servidor ocupado. Tente novamente em instantes.'}), 503, {'Retry-After': '5'}
     except Exception as e:
         db.session.rollback()
         return jsonify({'error': str(e)}), 500
@@ -254,11 +290,8 @@ def update_usuario(id):
 # Função para excluir o usuário 
 @bp.route('/usuario/<int:id>/excluir', methods=['POST'])
 @login_required
+@requires_permission(GERENCIAR_ACESSO)
 def excluir_usuario(id):
-    # Verifica se o usuário atual tem permissão (por exemplo, é administrador)
-    if current_user.role.NOME_ROLE != 'Administrador':
-        return jsonify({'error': 'Não autorizado'}), 403
-
     usuario = User.query.get_or_404(id)
     
     try:
@@ -267,7 +300,7 @@ def excluir_usuario(id):
 
         # Exclui o usuário
         db.session.delete(usuario)
-        db.session.commit()
+        db.session.flush()  # Aplica a alteração sem confirmar; o commit inclui o log
 
         registrar_log(
             usuario_id=current_user.ID_USUARIO,
@@ -276,6 +309,8 @@ def excluir_usuario(id):
             id_registro=id,
             dados_anteriores=dados_anteriores
         )
+        db.session.commit()  # Confirma a alteração e o log na mesma transação
+        cache_usuarios.invalidar(id)  # O usuário excluído deixa de ser carregado do cache
 
         return jsonify({'message': 'Usuário excluído com sucesso'})
     except Exception as e:
@@ -289,15 +324,13 @@ def excluir_usuario(id):
 
 @bp.route('/perfil', methods=['POST'])
 @login_required
+@requires_permission(GERENCIAR_ACESSO)
 def add_role():
     """
     Adiciona um novo perfil (Role) ao sistema.
-    Requer que o usuário atual seja Administrador.
+    Requer a permissão GERENCIAR_ACESSO.
     Recebe os dados via JSON ou via formulário e cria um novo perfil.
     """
-    if current_user.role.NOME_ROLE != 'Administrador':
-        return jsonify({'error': 'Não autorizado'}), 403
-
     # Se a requisição vier como JSON, utiliza request.get_json(), senão pega os dados do formulário.
     data = request.get_json() if request.is_json else request.form.to_dict()
 
@@ -316,7 +349,7 @@ def add_role():
             DESCRICAO=descricao_role
         )
         db.session.add(new_role)
-        db.session.commit()
+        db.session.flush()  # Aplica a alteração sem confirmar; o commit inclui o log
 
         # Registra a ação de inserção no log
         registrar_log(
@@ -330,6 +363,8 @@ def add_role():
                 'DESCRICAO': new_role.DESCRICAO
             }
         )
+        db.session.commit()  # Confirma a alteração e o log na mesma transação
+        mapa_permissoes.invalidar()  # Recarrega o mapa de permissões com o novo perfil
 
         return jsonify({'message': 'Perfil criado com sucesso!'})
     except Exception as e:
@@ -338,14 +373,13 @@ def add_role():
 
 @bp.route('/perfil/<int:id>', methods=['GET'])
 @login_required
+@requires_permission(GERENCIAR_ACESSO)
+@etag_por_versao('TBROLE')
 def get_perfil(id):
     """
     Retorna os dados de um perfil específico (Role) no formato JSON.
-    Requer que o usuário atual seja Administrador.
+    Requer a permissão GERENCIAR_ACESSO.
     """
-    if current_user.role.NOME_ROLE != 'Administrador':
-        return jsonify({'error': 'Não autorizado'}), 403
-
     role = Role.query.get_or_404(id)
     return jsonify({
         'ID_ROLE': role.ID_ROLE,
@@ -355,15 +389,13 @@ def get_perfil(id):
     
 @bp.route('/perfil/<int:id>', methods=['PUT'])
 @login_required
+@requires_permission(GERENCIAR_ACESSO)
 def update_perfil(id):
     """
     Atualiza os dados de um perfil.
-    Requer que o usuário atual seja Administrador.
+    Requer a permissão GERENCIAR_ACESSO.
     Permite atualizar o nome e a descrição do perfil.
     """
-    if current_user.role.NOME_ROLE != 'Administrador':
-        return jsonify({'error': 'Não autorizado'}), 403
-
     # Busca o perfil ou retorna 404 se não existir
     perfil = Role.query.get_or_404(id)
     data = request.get_json()
@@ -380,7 +412,7 @@ def update_perfil(id):
         perfil.NOME_ROLE = data.get('nome_role', perfil.NOME_ROLE)
         perfil.DESCRICAO = data.get('descricao', perfil.DESCRICAO)
 
-        db.session.commit()
+        db.session.flush()  # Aplica a alteração sem confirmar; o commit inclui o log
 
         # Registra a alteração no log
         registrar_log(
@@ -395,6 +427,9 @@ def update_perfil(id):
                 'DESCRICAO': perfil.DESCRICAO
             }
         )
+        db.session.commit()  # Confirma a alteração e o log na mesma transação
+        cache_usuarios.invalidar()  # Usuários com este perfil são recarregados com o novo nome
+        mapa_permissoes.invalidar()  # O nome do perfil pode definir o acesso de administrador
 
         return jsonify({'message': 'Perfil atualizado com sucesso'})
 
@@ -404,15 +439,12 @@ def update_perfil(id):
 
 @bp.route('/perfil/<int:id>/excluir', methods=['POST'])
 @login_required
+@requires_permission(GERENCIAR_ACESSO)
 def excluir_perfil(id):
     """
     Exclui um perfil, desde que não haja nenhum usuário associado a ele.
-    Requer que o usuário atual seja Administrador.
+    Requer a permissão GERENCIAR_ACESSO.
     """
-    # Verifica se o usuário atual é Administrador
-    if current_user.role.NOME_ROLE != 'Administrador':
-        return jsonify({'error': 'Não autorizado'}), 403
-
     # Busca o perfil a ser excluído ou retorna 404 se não existir
     perfil = Role.query.get_or_404(id)
 
@@ -434,7 +466,7 @@ def excluir_perfil(id):
 
         # Remove o perfil e confirma a transação
         db.session.delete(perfil)
-        db.session.commit()
+        db.session.flush()  # Aplica a alteração sem confirmar; o commit inclui o log
 
         # Registra a ação de exclusão no log
         registrar_log(
@@ -444,6 +476,9 @@ def excluir_perfil(id):
             id_registro=id,
             dados_anteriores=dados_anteriores
         )
+        db.session.commit()  # Confirma a alteração e o log na mesma transação
+        cache_usuarios.invalidar()  # Remove do cache qualquer referência ao perfil excluído
+        mapa_permissoes.invalidar()  # Remove o perfil excluído do mapa de permissões
 
         return jsonify({'message': 'Perfil excluído com sucesso'})
 
@@ -0,0 +1,107 @@
+import threading
+from concurrent.futures import ProcessPoolExecutor, TimeoutError
+from concurrent.futures.process import BrokenProcessPool
+import bcrypt
+
+
+class ServicoSenhaIndisponivel(Exception):
+    """ Lançada quando o pool de hashing está saturado, não respondeu a tempo ou perdeu um processo """
+
+
+def _gerar_hash(senha, rounds):
+    """ Gera o hash bcrypt da senha (executado em um processo do pool) """
+    return bcrypt.hashpw(senha.encode('utf-8'), bcrypt.gensalt(rounds)).decode('utf-8')
+
+
+def _verificar_hash(senha_hash, senha):
+    """ Verifica a senha contra o hash bcrypt (executado em um processo do pool) """
+    return bcrypt.checkpw(senha.encode('utf-8'), senha_hash.encode('utf-8'))
+
+
+class ServicoSenhas:
+    """
+    Executa o hashing e a verificação de senhas (bcrypt) em um pool de processos dedicado,
+    fora das threads de requisição. O número de operações em andamento e aguardando é limitado:
+    ao atingir o limite, ServicoSenhaIndisponivel é lançada imediatamente em vez de enfileirar.
+    Com SENHA_PROCESSOS = 0 as operações são executadas na própria requisição.
+    """
+
+    def __init__(self):
+        self.rounds = 12
+        self.processos = 0
+        self.timeout = None
+        self._vagas = None
+        self._executor = None
+        self._lock = threading.Lock()
+
+    def init_app(self, app):
+        self.rounds = app.config['BCRYPT_LOG_ROUNDS']
+        self.processos = app.config['SENHA_PROCESSOS']
+        self.timeout = app.config['SENHA_TIMEOUT']
+        # Vagas = operações em execução + operações aguardando um processo livre
+        self._vagas = threading.BoundedSemaphore(self.processos + app.config['SENHA_FILA_MAX'])
+
+    def _obter_executor(self):
+        # O pool só é criado no primeiro uso, para não iniciar processos em workers que não autenticam
+        if self._executor is None:
+            with self._lock:
+                if self._executor is None:
+                    self._executor = ProcessPoolExecutor(max_workers=self.processos)
+        return self._executor
+
+    def _descartar_executor(self, executor):
+        """
+        Descarta um pool quebrado (um processo morreu, ex.: falta de memória): a partir daí o
+        ProcessPoolExecutor lança BrokenProcessPool em todo submit/result, então a próxima
+        operação cria um pool novo
+        """
+        with self._lock:
+            if self._executor is executor:
+                self._executor = None
+        executor.shutdown(wait=False, cancel_futures=True)
+
+    def _executar(self, funcao, *args):
+        if self.processos == 0:
+            return funcao(*args)
+
+        if not self._vagas.acquire(blocking=False):
+            raise ServicoSenhaIndisponivel('Fila de verificação de senhas cheia')
+
+        executor = self._obter_executor()
+        try:
+            futuro = executor.submit(funcao, *args)
+        except BrokenProcessPool:
+            self._vagas.release()
+            self._descartar_executor(executor)
+            raise ServicoSenhaIndisponivel('Pool de verificação de senhas reiniciado')
+        except Exception:
+            self._vagas.release()
+            raise
+        # A vaga só é liberada quando o processo termina, mesmo que a requisição desista antes
+        futuro.add_done_callback(lambda _: self._vagas.release())
+
+        try:
+            return futuro.result(timeout=self.timeout)
+        except TimeoutError:
+            raise ServicoSenhaIndisponivel('Tempo esgotado na verificação de senha')
+        except BrokenProcessPool:
+            self._descartar_executor(executor)
+            raise ServicoSenhaIndisponivel('Pool de verificação de senhas reiniciado')
+
+    def gerar_hash(self, senha):
+        """ Retorna o hash bcrypt (str) da senha com o custo configurado em BCRYPT_LOG_ROUNDS """
+        return self._executar(_gerar_hash, senha, self.rounds)
+
+    def verificar(self, senha_hash, senha):
+        """ Retorna True se a senha corresponde ao hash """
+        return self._executar(_verificar_hash, senha_hash, senha)
+
+    def precisa_rehash(self, senha_hash):
+        """ Indica se o hash foi gerado com um custo diferente do configurado (formato $2b$<custo>$...) """
+        try:
+            return int(senha_hash.split('$')[2]) != self.rounds
+        except (IndexError, ValueError):
+            return True
+
+
+servico_senhas = ServicoSenhas()
@@ -2,6 +2,10 @@ from app.extensions import db
 
 class Cargo(db.Model):
     __tablename__ = 'TBCARGO'
+    __table_args__ = (
+        # Índice da busca por prefixo e da ordenação por nome em /cargos/dados (ver scriptBD.sql)
+        db.Index('IX_TBCARGO_NOME_CARGO', 'NOME_CARGO', 'ID_CARGO'),
+    )
     ID_CARGO = db.Column(db.Integer, primary_key=True, autoincrement=True)
     NOME_CARGO = db.Column(db.String(100), nullable=False)
     DESCRICAO = db.Column(db.String(255), nullable=True)
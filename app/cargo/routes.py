@@ -1,34 +1,77 @@
-from flask import render_template, request, redirect, url_for, flash
-from flask_login import login_required, current_user
+from flask import render_template, request, redirect, url_for, flash, jsonify
+from flask_login import login_required
+from sqlalchemy import select
 from app.extensions import db
 from app.cargo import bp
 from app.cargo.models import Cargo
-from app.autenticacao.models import Role
+from app.autenticacao.permissoes import requires_permission, EXCLUIR_CARGO
+from app.diagnostico import limite_queries
+from app.tabela_dados import TabelaDados
+from app.versionamento import etag_por_versao
+
+# Listagem paginada no servidor: busca por prefixo em NOME_CARGO (IX_TBCARGO_NOME_CARGO)
+# e ordenação apenas pelas colunas abaixo
+tabela_cargos = TabelaDados(
+    consulta=lambda: select(Cargo.ID_CARGO.label('id'), Cargo.NOME_CARGO.label('nome'),
+                            Cargo.DESCRICAO.label('descricao')),
+    colunas=('id', 'nome', 'descricao'),
+    ordenacoes={'id': Cargo.ID_CARGO, 'nome': Cargo.NOME_CARGO},
+    chave=Cargo.ID_CARGO,
+    ordenacao_padrao=('nome', 'asc'),
+    coluna_busca=Cargo.NOME_CARGO,
+)
 
 # Rota para listar os cargos
 @bp.route('/')
+@limite_queries(3)
+@login_required
+@etag_por_versao('TBCARGO')
 def listar_cargos():
-    cargos = Cargo.query.all()
+    """
+    Exibe a primeira página de cargos (com a busca e a ordenação da URL, se houver).
+    As demais páginas, buscas e ordenações são carregadas pela rota dados_cargos.
+    """
     colunas = [
         {'id': 'id', 'nome': 'ID'},
         {'id': 'nome', 'nome': 'Nome do Cargo'},
         {'id': 'descricao', 'nome': 'Descrição'}
     ]
-    
-    # Formata os dados para o template
-    items = [{
-        'id': cargo.ID_CARGO,
-        'nome': cargo.NOME_CARGO,
-        'descricao': cargo.DESCRICAO
-    } for cargo in cargos]
-    
-    return render_template('cargo/index.html',
+
+    # O total (contar) é pedido pela tabela à rota dados_cargos; a página não executa a contagem
+    parametros = {nome: valor for nome, valor in request.args.items() if nome != 'contar'}
+    busca = parametros.get('busca', '')
+    try:
+        dados = tabela_cargos.pagina(parametros)
+    except ValueError as e:
+        # Página HTML: avisa e exibe a listagem com os parâmetros padrão (o JSON 400 fica para dados_cargos)
+        flash(str(e), 'danger')
+        busca = ''
+        dados = tabela_cargos.pagina({})
+
+    return render_template('cargo/Index.html',
                           titulo='Cargos',
                           singular='Cargo',
                           route='cargo',
                           container_id='cargos',
                           colunas=colunas,
-                          items=items)
+                          items=dados['itens'],
+                          dados=dados,
+                          busca=busca)
+
+# Rota com os dados da listagem de cargos (JSON), usada pela tabela de static/js/main.js
+@bp.route('/dados')
+@limite_queries(4)
+@login_required
+@etag_por_versao('TBCARGO')
+def dados_cargos():
+    """
+    Parâmetros: busca (prefixo do nome), ordem (id, nome), direcao (asc, desc), limite,
+    cursor (página seguinte) ou pagina (salto direto), contar=1 (inclui o total).
+    """
+    try:
+        return jsonify(tabela_cargos.pagina(request.args))
+    except ValueError as e:
+        return jsonify({"erro": str(e)}), 400
 
 # Rota para adicionar um cargo
 @bp.route('/adicionar', methods=['GET', 'POST'])
@@ -47,6 +90,7 @@ def adicionar_cargo():
 
 # Rota para editar um cargo
 @bp.route('/editar/<int:id>', methods=['GET', 'POST'])
+@etag_por_versao('TBCARGO')
 def editar_cargo(id):
     cargo = Cargo.query.get_or_404(id)
     if request.method == 'POST':
@@ -63,11 +107,9 @@ def editar_cargo(id):
 # Rota para excluir um cargo
 @bp.route('/excluir/<int:id>', methods=['POST'])
 @login_required
+@requires_permission(EXCLUIR_CARGO, redirecionar_para='cargo.listar_cargos',
+                     mensagem='Você não tem permissão para excluir cargos.')
 def excluir_cargo(id):
-    # Verifica se o usuário logado tem permissão para excluir um cargo
-    if current_user.role.NOME_ROLE != 'Administrador':
-        flash('Você não tem permissão para excluir cargos.', 'danger')
-        return redirect(url_for('cargo.listar_cargos')) 
     cargo = Cargo.query.get_or_404(id)
     try:
         db.session.delete(cargo)
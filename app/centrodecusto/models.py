@@ -0,0 +1,10 @@
+from app.extensions import db
+
+class CentroCusto(db.Model):
+    __tablename__ = 'TBCENTROCUSTO'
+    ID_CENTRODECUSTO = db.Column(db.Integer, primary_key=True, autoincrement=True)
+    NOME_CENTRODECUSTO = db.Column(db.String(50), nullable=False)
+    CODIGO_OBRA = db.Column(db.Integer, nullable=True)
+
+    def __repr__(self):
+        return f'<CentroCusto {self.NOME_CENTRODECUSTO}>'
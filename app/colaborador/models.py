@@ -0,0 +1,17 @@
+from app.extensions import db
+
+class Colaborador(db.Model):
+    __tablename__ = 'TBCOLABORADOR'
+    ID_COLABORADOR = db.Column(db.Integer, primary_key=True, autoincrement=True)
+    CPF = db.Column(db.String(14), nullable=False)
+    MATRICULA = db.Column(db.Integer, nullable=False)
+    NOME_COLABORADOR = db.Column(db.String(50), nullable=False)
+    DATA_ADMISSAO = db.Column(db.Date, nullable=True)
+    STATUS = db.Column(db.Boolean, nullable=False)  # Ativo/inativo
+    REGIME_TRABALHO = db.Column(db.String(50), nullable=True)
+    CARGO_GESTAO = db.Column(db.Boolean, nullable=True)
+    ID_CARGO = db.Column(db.Integer, db.ForeignKey('TBCARGO.ID_CARGO'), nullable=False)
+    ID_DEPARTAMENTO = db.Column(db.Integer, db.ForeignKey('TBDEPARTAMENTO.ID_DEPARTAMENTO'), nullable=False)
+
+    def __repr__(self):
+        return f'<Colaborador {self.NOME_COLABORADOR}>'
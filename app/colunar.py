@@ -0,0 +1,52 @@
+import itertools
+
+# Tipos aceitos na descrição das colunas de escrever_parquet
+TIPOS = ('inteiro', 'texto', 'data', 'data_hora', 'booleano')
+
+LINHAS_POR_LOTE = 10000  # Linhas por record batch (e por row group do arquivo)
+MIMETYPE_PARQUET = 'application/vnd.apache.parquet'
+
+
+class ParquetIndisponivel(RuntimeError):
+    """ Lançada quando o pacote opcional pyarrow não está instalado """
+
+
+def _tipos_arrow(pa):
+    return {
+        'inteiro': pa.int64(),
+        'texto': pa.string(),
+        'data': pa.date32(),
+        'data_hora': pa.timestamp('ms'),
+        'booleano': pa.bool_(),
+    }
+
+
+def escrever_parquet(linhas, destino, colunas, linhas_por_lote=LINHAS_POR_LOTE):
+    """
+    Grava as linhas (listas de valores na ordem de `colunas`) em um arquivo Parquet no destino.
+    colunas: lista de (nome, tipo), com tipo em TIPOS; os tipos são preservados no arquivo
+    (inteiros, datas e timestamps), sem conversão para texto.
+    As linhas são convertidas em record batches de `linhas_por_lote` linhas, portanto apenas
+    um lote fica em memória por vez. Requer o pacote pyarrow.
+    """
+    try:
+        import pyarrow as pa  # Dependência opcional, carregada apenas na exportação Parquet
+        import pyarrow.parquet as pq
+    except ImportError:
+        raise ParquetIndisponivel('Exportação Parquet indisponível: instale o pacote pyarrow.')
+
+    tipos = _tipos_arrow(pa)
+    esquema = pa.schema([(nome, tipos[tipo]) for nome, tipo in colunas])
+    linhas = iter(linhas)
+
+    with pq.ParquetWriter(destino, esquema, compression='zstd') as escritor:
+        while True:
+            lote = list(itertools.islice(linhas, linhas_por_lote))
+            if not lote:
+                break
+            # Transpõe o lote (linhas -> colunas) para montar os arrays tipados
+            valores = list(zip(*lote))
+            escritor.write_batch(pa.record_batch(
+                [pa.array(valores[indice], type=campo.type) for indice, campo in enumerate(esquema)],
+                schema=esquema
+            ))
@@ -3,12 +3,120 @@ from dotenv import load_dotenv
 
 load_dotenv() # Carrega as variáveis de ambiente do arquivo .env
 
+
+def _env_bool(nome, padrao):
+    """ Lê uma variável de ambiente booleana ('true'/'false') """
+    return os.getenv(nome, str(padrao)).lower() == 'true'
+
+
+def _opcoes_engine(uri):
+    """
+    Monta as opções do engine do SQLAlchemy (pool de conexões) a partir das variáveis de ambiente.
+    Tamanho do pool e overflow só se aplicam a bancos servidores (não ao SQLite local),
+    e fast_executemany apenas ao driver mssql+pyodbc.
+    """
+    opcoes = {
+        'pool_pre_ping': _env_bool('DB_POOL_PRE_PING', True), # Testa a conexão antes de usá-la (descarta conexões mortas)
+        'pool_recycle': int(os.getenv('DB_POOL_RECYCLE', 1800)), # Segundos até reabrir uma conexão
+    }
+    if uri and not uri.startswith('sqlite'):
+        opcoes['pool_size'] = int(os.getenv('DB_POOL_SIZE', 10)) # Conexões mantidas abertas no pool
+        opcoes['max_overflow'] = int(os.getenv('DB_POOL_MAX_OVERFLOW', 10)) # Conexões extras permitidas em picos
+        opcoes['pool_timeout'] = int(os.getenv('DB_POOL_TIMEOUT', 30)) # Segundos de espera por uma conexão livre
+    if uri and uri.startswith('mssql+pyodbc'):
+        opcoes['fast_executemany'] = _env_bool('DB_FAST_EXECUTEMANY', True) # Envia executemany em lote pelo pyodbc
+    return opcoes
+
+
 class Config:
     SECRET_KEY = os.getenv('SECRET_KEY') # Chave secreta para proteção contra CSRF
     SQLALCHEMY_DATABASE_URI = os.getenv('DATABASE_URL') # URL de conexão com o banco de dados
     SQLALCHEMY_TRACK_MODIFICATIONS = False # Desativa o tracking de modificações
+    SQLALCHEMY_ENGINE_OPTIONS = _opcoes_engine(SQLALCHEMY_DATABASE_URI) # Pool de conexões (ver _opcoes_engine)
     SESSION_COOKIE_SECURE = True # Apenas para HTTPS
     SESSION_COOKIE_HTTPONLY = True # Proteção contra ataques XSS
     SESSION_COOKIE_SAMESITE = 'Lax' # Proteção contra CSRF
     SESSION_PERMANENT = False # Sessão temporária
-    BCRYPT_LOG_ROUNDS = 12 # Número de rounds para o Bcrypt
\ No newline at end of file
+    BCRYPT_LOG_ROUNDS = int(os.getenv('BCRYPT_LOG_ROUNDS', 12)) # Número de rounds para o Bcrypt (hashes antigos são regravados no login)
+
+    # Paginação da listagem de logs (keyset sobre DATA_HORA + ID_LOG)
+    LOGS_POR_PAGINA = int(os.getenv('LOGS_POR_PAGINA', 50)) # Quantidade de logs por página
+    LOGS_POR_PAGINA_MAX = int(os.getenv('LOGS_POR_PAGINA_MAX', 500)) # Limite máximo aceito via parâmetro
+    LOGS_DETALHES_MAX_AGE = int(os.getenv('LOGS_DETALHES_MAX_AGE', 86400)) # Segundos em que o navegador reutiliza os detalhes de um log
+
+    # Listagens paginadas no servidor (app/tabela_dados.py, ex.: /cargos/dados)
+    TABELA_DADOS_POR_PAGINA = int(os.getenv('TABELA_DADOS_POR_PAGINA', 25)) # Quantidade de registros por página
+    TABELA_DADOS_POR_PAGINA_MAX = int(os.getenv('TABELA_DADOS_POR_PAGINA_MAX', 200)) # Limite máximo aceito via parâmetro
+
+    # Retenção e arquivamento de logs (flask logs arquivar)
+    LOGS_RETENCAO_DIAS = int(os.getenv('LOGS_RETENCAO_DIAS', 365)) # Logs mais antigos são movidos para arquivos compactados
+    LOGS_ARQUIVO_DIRETORIO = os.getenv('LOGS_ARQUIVO_DIRETORIO') # Destino dos arquivos (padrão: instance/arquivo_logs)
+    LOGS_ARQUIVO_TAMANHO_LOTE = int(os.getenv('LOGS_ARQUIVO_TAMANHO_LOTE', 1000)) # Logs removidos por transação (abaixo do limite de escalonamento de bloqueio)
+
+    # Exportação de logs
+    EXPORTACAO_TAMANHO_LOTE = int(os.getenv('EXPORTACAO_TAMANHO_LOTE', 1000)) # Linhas lidas do banco por lote (yield_per)
+    EXPORTACAO_MEMORIA_MAX = int(os.getenv('EXPORTACAO_MEMORIA_MAX', 10 * 1024 * 1024)) # Bytes mantidos em memória antes de usar disco
+    EXPORTACAO_PDF_MAX_LINHAS_DADOS = int(os.getenv('EXPORTACAO_PDF_MAX_LINHAS_DADOS', 8)) # Linhas exibidas por payload JSON no PDF
+    EXPORTACAO_PDF_MAX_LOGS_ARQUIVO = int(os.getenv('EXPORTACAO_PDF_MAX_LOGS_ARQUIVO', 5000)) # Logs por PDF; acima disso, as partes são entregues em um ZIP
+
+    # Diagnóstico
+    LIMITE_QUERIES_ATIVO = _env_bool('LIMITE_QUERIES_ATIVO', False) # Verifica o limite de queries das rotas (@limite_queries)
+
+    # Métricas de desempenho por endpoint (/health/metricas, formato Prometheus)
+    METRICAS_ATIVAS = _env_bool('METRICAS_ATIVAS', True) # Coleta tempo, comandos SQL e tamanho das respostas
+    METRICAS_JANELA_SEGUNDOS = int(os.getenv('METRICAS_JANELA_SEGUNDOS', 300)) # Janela dos quantis do tempo de resposta
+    METRICAS_REQUISICAO_LENTA_MS = int(os.getenv('METRICAS_REQUISICAO_LENTA_MS', 1000)) # Requisições registradas no log acima deste tempo
+    METRICAS_SQL_LENTO_MS = int(os.getenv('METRICAS_SQL_LENTO_MS', 200)) # Comandos SQL registrados no log acima deste tempo
+    METRICAS_SQL_LOG_PARAMETROS = _env_bool('METRICAS_SQL_LOG_PARAMETROS', False) # Inclui os parâmetros no log dos comandos lentos (podem conter hashes de senha, CPFs e outros dados pessoais; habilitar apenas para diagnóstico)
+
+    # Auditoria (TBLOG)
+    AUDITORIA_MODO = os.getenv('AUDITORIA_MODO', 'transacional') # 'transacional' (mesma transação) ou 'assincrono' (thread em lote)
+    AUDITORIA_TAMANHO_FILA = int(os.getenv('AUDITORIA_TAMANHO_FILA', 10000)) # Logs aguardando gravação no modo assíncrono
+    AUDITORIA_TAMANHO_LOTE = int(os.getenv('AUDITORIA_TAMANHO_LOTE', 200)) # Logs inseridos por lote
+    AUDITORIA_INTERVALO_GRAVACAO = float(os.getenv('AUDITORIA_INTERVALO_GRAVACAO', 1.0)) # Segundos de espera por novos logs
+    AUDITORIA_POLITICA_FILA_CHEIA = os.getenv('AUDITORIA_POLITICA_FILA_CHEIA', 'bloquear') # 'bloquear', 'sincrono' ou 'descartar'
+    AUDITORIA_TIMEOUT_FILA = float(os.getenv('AUDITORIA_TIMEOUT_FILA', 2.0)) # Segundos de espera por espaço na fila para os logs de um commit (política 'bloquear')
+
+    # Cache dos usuários autenticados (Flask-Login)
+    CACHE_USUARIOS_TTL = int(os.getenv('CACHE_USUARIOS_TTL', 60)) # Segundos até recarregar o usuário do banco
+    CACHE_USUARIOS_TAMANHO = int(os.getenv('CACHE_USUARIOS_TAMANHO', 1024)) # Quantidade máxima de usuários em cache
+
+    # GET condicional por versão das tabelas (@etag_por_versao, TBVERSAO_TABELA)
+    VERSOES_TTL = int(os.getenv('VERSOES_TTL', 5)) # Segundos em que as versões lidas do banco são reaproveitadas
+
+    # Autorização (@requires_permission)
+    PERMISSOES_TTL = int(os.getenv('PERMISSOES_TTL', 300)) # Segundos até recarregar o mapa de permissões dos perfis
+
+    # Pool de processos para hashing de senhas (bcrypt)
+    SENHA_PROCESSOS = int(os.getenv('SENHA_PROCESSOS', 2)) # Processos dedicados ao bcrypt (0 = executa na própria requisição)
+    SENHA_FILA_MAX = int(os.getenv('SENHA_FILA_MAX', 8)) # Operações aguardando processo livre antes de responder 503
+    SENHA_TIMEOUT = float(os.getenv('SENHA_TIMEOUT', 10)) # Segundos de espera pelo resultado do hashing
+
+    # Limite de tentativas de login (token bucket)
+    LOGIN_TENTATIVAS_POR_IP = int(os.getenv('LOGIN_TENTATIVAS_POR_IP', 20)) # Tentativas por IP dentro da janela
+    LOGIN_TENTATIVAS_POR_LOGIN = int(os.getenv('LOGIN_TENTATIVAS_POR_LOGIN', 5)) # Tentativas por login dentro da janela
+    LOGIN_JANELA_SEGUNDOS = int(os.getenv('LOGIN_JANELA_SEGUNDOS', 60)) # Tempo para reabastecer todas as tentativas
+    LIMITADOR_REDIS_URL = os.getenv('LIMITADOR_REDIS_URL') # Opcional: compartilha os limites entre processos via Redis
+
+    # Conformidade de treinamentos (vencidos / a vencer)
+    CONFORMIDADE_DIAS_PADRAO = int(os.getenv('CONFORMIDADE_DIAS_PADRAO', 30)) # Horizonte padrão para treinamentos a vencer
+    CONFORMIDADE_POR_PAGINA = int(os.getenv('CONFORMIDADE_POR_PAGINA', 50)) # Registros por página
+    CONFORMIDADE_POR_PAGINA_MAX = int(os.getenv('CONFORMIDADE_POR_PAGINA_MAX', 500)) # Limite máximo aceito via parâmetro
+
+    # Dashboard (resumos em TBRESUMO_DEPARTAMENTO)
+    DASHBOARD_CACHE_TTL = int(os.getenv('DASHBOARD_CACHE_TTL', 60)) # Segundos em que /dashboard/dados é servido da memória
+
+    # Arquivos estáticos com hash no nome (/assets, asset_url nos templates)
+    ASSETS_DIRETORIO = os.getenv('ASSETS_DIRETORIO') # Arquivos gerados e manifesto (padrão: instance/assets)
+    ASSETS_CONSTRUIR_NA_INICIALIZACAO = _env_bool('ASSETS_CONSTRUIR_NA_INICIALIZACAO', True) # Regera se static/ mudou (ou use flask assets construir)
+    ASSETS_MAX_AGE = int(os.getenv('ASSETS_MAX_AGE', 31536000)) # Segundos de cache no navegador (imutável)
+
+    # Importação de planilhas (CSV/XLSX)
+    IMPORTACAO_TAMANHO_LOTE = int(os.getenv('IMPORTACAO_TAMANHO_LOTE', 1000)) # Linhas inseridas por transação
+    IMPORTACAO_MAX_REJEICOES = int(os.getenv('IMPORTACAO_MAX_REJEICOES', 500)) # Rejeições detalhadas no resultado
+
+    # Tarefas em segundo plano (exportações e importações)
+    TAREFAS_DIRETORIO = os.getenv('TAREFAS_DIRETORIO') # Estado e resultados das tarefas (padrão: instance/tarefas)
+    TAREFAS_CONCORRENCIA = int(os.getenv('TAREFAS_CONCORRENCIA', 2)) # Tarefas executadas ao mesmo tempo por processo
+    TAREFAS_FILA_MAX = int(os.getenv('TAREFAS_FILA_MAX', 10)) # Tarefas aguardando antes de responder 503 (o total em andamento é somado entre os processos)
+    TAREFAS_RETENCAO_HORAS = int(os.getenv('TAREFAS_RETENCAO_HORAS', 24)) # Tempo até remover estado e arquivo de resultado
@@ -0,0 +1,15 @@
+from app.extensions import db
+
+class ResumoDepartamento(db.Model):
+    __tablename__ = 'TBRESUMO_DEPARTAMENTO'
+    ID_DEPARTAMENTO = db.Column(db.Integer, db.ForeignKey('TBDEPARTAMENTO.ID_DEPARTAMENTO'), primary_key=True, autoincrement=False)
+    ID_CENTRODECUSTO = db.Column(db.Integer, nullable=True)
+    TOTAL_EXIGIDOS = db.Column(db.Integer, nullable=False, default=0)  # Treinamentos exigidos pelos cargos dos colaboradores ativos
+    TOTAL_CUMPRIDOS = db.Column(db.Integer, nullable=False, default=0)  # Exigidos com conclusão válida
+    VENCENDO_MES = db.Column(db.Integer, nullable=False, default=0)  # Treinamentos que vencem no mês corrente
+    HORAS_TREINADAS = db.Column(db.Integer, nullable=False, default=0)  # Soma de CARGA_HORARIA concluída no ano corrente
+    PENDENTE = db.Column(db.Boolean, nullable=False, default=False)  # Marcado quando os treinamentos do departamento mudam
+    DATA_ATUALIZACAO = db.Column(db.DateTime, nullable=True)
+
+    def __repr__(self):
+        return f'<ResumoDepartamento {self.ID_DEPARTAMENTO}>'
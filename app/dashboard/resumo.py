@@ -0,0 +1,295 @@
+import calendar
+import hashlib
+import json
+import threading
+import time
+from datetime import date, datetime
+from itertools import chain
+from sqlalchemy import select, func, case, exists, update, delete, insert, or_, event, inspect
+from sqlalchemy.orm import Session
+from app.extensions import db
+from app.centrodecusto.models import CentroCusto
+from app.colaborador.models import Colaborador
+from app.dashboard.models import ResumoDepartamento
+from app.departamento.models import Departamento
+from app.treinamento.models import Treinamento
+from app.treina_cargo.models import TreinaCargo
+from app.treina_colaborador.conformidade import ultimas_conclusoes, ultima_com_validade, ultima_valida
+from app.treina_colaborador.models import TreinaColaborador
+from app.tarefas.gerenciador import gerenciador_tarefas, FilaTarefasCheia
+
+# Quantidade máxima de IDs por cláusula IN (o SQL Server aceita até 2100 parâmetros por comando)
+TAMANHO_LOTE_IDS = 1000
+
+
+def _em_lotes(ids, tamanho=TAMANHO_LOTE_IDS):
+    ids = list(ids)
+    for inicio in range(0, len(ids), tamanho):
+        yield ids[inicio:inicio + tamanho]
+
+
+def marcar_pendentes(conexao, ids_departamento=(), ids_colaborador=(), ids_cargo=(), todos=False):
+    """
+    Marca como PENDENTE os resumos afetados por uma alteração, para que sejam recalculados
+    na próxima leitura do dashboard. Os departamentos são resolvidos no próprio banco a partir
+    dos colaboradores ou cargos alterados.
+    """
+    tabela = ResumoDepartamento.__table__
+    if todos:
+        conexao.execute(update(tabela).values(PENDENTE=True))
+        return
+
+    condicoes = [tabela.c.ID_DEPARTAMENTO.in_(lote) for lote in _em_lotes(ids_departamento)]
+    condicoes += [tabela.c.ID_DEPARTAMENTO.in_(
+        select(Colaborador.ID_DEPARTAMENTO).where(Colaborador.ID_COLABORADOR.in_(lote))
+    ) for lote in _em_lotes(ids_colaborador)]
+    condicoes += [tabela.c.ID_DEPARTAMENTO.in_(
+        select(Colaborador.ID_DEPARTAMENTO).where(Colaborador.ID_CARGO.in_(lote))
+    ) for lote in _em_lotes(ids_cargo)]
+
+    for condicao in condicoes:
+        conexao.execute(update(tabela).where(condicao, tabela.c.PENDENTE == False).values(PENDENTE=True))
+
+
+@event.listens_for(Session, 'after_flush')
+def _detectar_alteracoes(session, contexto):
+    """ Marca os resumos afetados pelos treinamentos, colaboradores e requisitos gravados no flush """
+    departamentos, colaboradores, cargos = set(), set(), set()
+    todos = False
+
+    for objeto in chain(session.new, session.dirty, session.deleted):
+        if isinstance(objeto, TreinaColaborador):
+            colaboradores.add(objeto.ID_COLABORADOR)
+        elif isinstance(objeto, TreinaCargo):
+            cargos.add(objeto.ID_CARGO)
+        elif isinstance(objeto, Colaborador):
+            # Troca de departamento ou cargo afeta o departamento antigo e o novo
+            departamentos.add(objeto.ID_DEPARTAMENTO)
+            departamentos.update(inspect(objeto).attrs.ID_DEPARTAMENTO.history.deleted)
+        elif isinstance(objeto, (Treinamento, Departamento)):
+            # CARGA_HORARIA ou centro de custo alterados afetam todos os resumos
+            todos = True
+
+    if todos or departamentos or colaboradores or cargos:
+        marcar_pendentes(session.connection(), departamentos - {None}, colaboradores - {None},
+                         cargos - {None}, todos)
+
+
+def _periodo(hoje):
+    """ Retorna o primeiro e o último dia do mês e o primeiro dia do ano da data de referência """
+    ultimo_dia = calendar.monthrange(hoje.year, hoje.month)[1]
+    return hoje.replace(day=1), hoje.replace(day=ultimo_dia), date(hoje.year, 1, 1)
+
+
+def _recalcular(ids, hoje):
+    """ Recalcula, com consultas agregadas no banco, os resumos dos departamentos informados """
+    inicio_mes, fim_mes, inicio_ano = _periodo(hoje)
+
+    # Última conclusão de cada colaborador em cada treinamento (a numeração por ROW_NUMBER()
+    # percorre apenas os colaboradores dos departamentos recalculados)
+    ultimas = ultimas_conclusoes(TreinaColaborador.ID_COLABORADOR.in_(
+        select(Colaborador.ID_COLABORADOR).where(Colaborador.ID_DEPARTAMENTO.in_(ids))))
+
+    # Exigidos x cumpridos: um par por colaborador ativo e treinamento exigido pelo seu cargo,
+    # cumprido quando a última conclusão está válida (o mesmo critério da análise de lacunas)
+    concluido = exists().where(
+        ultimas.c.ID_COLABORADOR == Colaborador.ID_COLABORADOR,
+        ultimas.c.ID_TREINAMENTO == TreinaCargo.ID_TREINAMENTO,
+        ultima_valida(ultimas, hoje)
+    )
+    exigidos = {linha[0]: linha[1:] for linha in db.session.execute(
+        select(Colaborador.ID_DEPARTAMENTO, func.count(), func.sum(case((concluido, 1), else_=0)))
+        .join(TreinaCargo, TreinaCargo.ID_CARGO == Colaborador.ID_CARGO)
+        .where(Colaborador.STATUS == True, Colaborador.ID_DEPARTAMENTO.in_(ids))
+        .group_by(Colaborador.ID_DEPARTAMENTO)
+    )}
+
+    # Vencendo no mês: última conclusão de cada treinamento com validade dentro do mês corrente
+    vencendo = dict(db.session.execute(
+        select(Colaborador.ID_DEPARTAMENTO, func.count())
+        .select_from(ultimas)
+        .join(Colaborador, Colaborador.ID_COLABORADOR == ultimas.c.ID_COLABORADOR)
+        .where(ultima_com_validade(ultimas), Colaborador.STATUS == True,
+               ultimas.c.DATA_VALIDADE.between(inicio_mes, fim_mes), Colaborador.ID_DEPARTAMENTO.in_(ids))
+        .group_by(Colaborador.ID_DEPARTAMENTO)
+    ).all())
+
+    # Horas treinadas no ano corrente
+    horas = dict(db.session.execute(
+        select(Colaborador.ID_DEPARTAMENTO, func.sum(Treinamento.CARGA_HORARIA))
+        .select_from(TreinaColaborador)
+        .join(Colaborador, Colaborador.ID_COLABORADOR == TreinaColaborador.ID_COLABORADOR)
+        .join(Treinamento, Treinamento.ID_TREINAMENTO == TreinaColaborador.ID_TREINAMENTO)
+        .where(TreinaColaborador.DATA_TREINAMENTO.between(inicio_ano, hoje), Colaborador.ID_DEPARTAMENTO.in_(ids))
+        .group_by(Colaborador.ID_DEPARTAMENTO)
+    ).all())
+
+    centros = db.session.execute(
+        select(Departamento.ID_DEPARTAMENTO, Departamento.ID_CENTRODECUSTO).where(Departamento.ID_DEPARTAMENTO.in_(ids))
+    ).all()
+
+    agora = datetime.now()
+    linhas = [{
+        'ID_DEPARTAMENTO': id_departamento,
+        'ID_CENTRODECUSTO': id_centro,
+        'TOTAL_EXIGIDOS': exigidos.get(id_departamento, (0, 0))[0],
+        'TOTAL_CUMPRIDOS': exigidos.get(id_departamento, (0, 0))[1] or 0,
+        'VENCENDO_MES': vencendo.get(id_departamento, 0),
+        'HORAS_TREINADAS': horas.get(id_departamento) or 0,
+        'PENDENTE': False,
+        'DATA_ATUALIZACAO': agora
+    } for id_departamento, id_centro in centros]
+
+    tabela = ResumoDepartamento.__table__
+    db.session.execute(delete(tabela).where(tabela.c.ID_DEPARTAMENTO.in_(ids)))
+    if linhas:
+        db.session.execute(insert(tabela), linhas)
+
+
+def atualizar_resumo(todos=False, hoje=None, dias_anteriores=True):
+    """
+    Atualiza incrementalmente TBRESUMO_DEPARTAMENTO: recalcula apenas os departamentos marcados
+    como pendentes, os que ainda não têm resumo e, com dias_anteriores, os calculados antes do dia
+    corrente (TOTAL_CUMPRIDOS, VENCENDO_MES e HORAS_TREINADAS dependem da data de referência).
+    Com todos=True recalcula todos os departamentos. Retorna a quantidade recalculada.
+    """
+    hoje = hoje or date.today()
+    inicio_dia = datetime.combine(hoje, datetime.min.time())
+    resumo = ResumoDepartamento
+
+    consulta = select(Departamento.ID_DEPARTAMENTO)
+    if not todos:
+        condicoes = [resumo.ID_DEPARTAMENTO.is_(None), resumo.PENDENTE == True]
+        if dias_anteriores:
+            condicoes.append(resumo.DATA_ATUALIZACAO < inicio_dia)
+        consulta = consulta.outerjoin(resumo, resumo.ID_DEPARTAMENTO == Departamento.ID_DEPARTAMENTO).where(
+            or_(*condicoes))
+    ids = db.session.execute(consulta).scalars().all()
+
+    if not ids:
+        return 0
+
+    for lote in _em_lotes(sorted(ids)):
+        _recalcular(lote, hoje)
+    db.session.commit()
+    return len(ids)
+
+
+def _tarefa_virada_dia(tarefa):
+    """ Recalcula em segundo plano os resumos calculados em dias anteriores (ver agendar_virada_dia) """
+    quantidade = atualizar_resumo()
+    cache_dashboard.invalidar()
+    return {'departamentos': quantidade}
+
+
+def agendar_virada_dia(hoje):
+    """
+    Agenda, no máximo uma vez por dia em cada processo, o recálculo dos resumos do dia anterior
+    em segundo plano. O ideal é executar `flask dashboard atualizar` diariamente após a meia-noite;
+    este agendamento cobre o caso de a rotina não ter sido executada, sem atrasar a requisição.
+    """
+    global _virada_agendada_em
+    with _lock_virada:
+        if _virada_agendada_em == hoje:
+            return
+        _virada_agendada_em = hoje
+    try:
+        gerenciador_tarefas.submeter('dashboard_virada_dia', None, _tarefa_virada_dia)
+    except FilaTarefasCheia:
+        _virada_agendada_em = None  # Tenta novamente na próxima leitura do dashboard
+
+
+_virada_agendada_em = None
+_lock_virada = threading.Lock()
+
+
+def dados_dashboard():
+    """
+    Monta os dados do dashboard a partir de TBRESUMO_DEPARTAMENTO, após atualizar os resumos pendentes
+    (alterados desde a última leitura). Os resumos de dias anteriores são servidos como estão e
+    recalculados em segundo plano (agendar_virada_dia), para não pesar na requisição.
+    O custo depende da quantidade de departamentos, não do volume de treinamentos registrados.
+    """
+    hoje = date.today()
+    atualizar_resumo(hoje=hoje, dias_anteriores=False)
+
+    resumo = ResumoDepartamento
+    linhas = db.session.execute(
+        select(resumo.ID_DEPARTAMENTO, Departamento.NOME_DEPARTAMENTO, resumo.ID_CENTRODECUSTO,
+               CentroCusto.NOME_CENTRODECUSTO, resumo.TOTAL_EXIGIDOS, resumo.TOTAL_CUMPRIDOS,
+               resumo.VENCENDO_MES, resumo.HORAS_TREINADAS, resumo.DATA_ATUALIZACAO)
+        .join(Departamento, Departamento.ID_DEPARTAMENTO == resumo.ID_DEPARTAMENTO)
+        .outerjoin(CentroCusto, CentroCusto.ID_CENTRODECUSTO == resumo.ID_CENTRODECUSTO)
+        .order_by(Departamento.NOME_DEPARTAMENTO)
+    ).all()
+
+    def percentual(cumpridos, exigidos):
+        return round(100 * cumpridos / exigidos, 2) if exigidos else None
+
+    departamentos = []
+    centros = {}
+    for linha in linhas:
+        departamentos.append({
+            'ID_DEPARTAMENTO': linha.ID_DEPARTAMENTO,
+            'NOME_DEPARTAMENTO': linha.NOME_DEPARTAMENTO,
+            'TOTAL_EXIGIDOS': linha.TOTAL_EXIGIDOS,
+            'TOTAL_CUMPRIDOS': linha.TOTAL_CUMPRIDOS,
+            'PERCENTUAL_CONFORMIDADE': percentual(linha.TOTAL_CUMPRIDOS, linha.TOTAL_EXIGIDOS),
+            'VENCENDO_MES': linha.VENCENDO_MES
+        })
+        centro = centros.setdefault(linha.ID_CENTRODECUSTO, {
+            'ID_CENTRODECUSTO': linha.ID_CENTRODECUSTO,
+            'NOME_CENTRODECUSTO': linha.NOME_CENTRODECUSTO or 'Sem centro de custo',
+            'HORAS_TREINADAS': 0
+        })
+        centro['HORAS_TREINADAS'] += linha.HORAS_TREINADAS
+
+    total_exigidos = sum(item['TOTAL_EXIGIDOS'] for item in departamentos)
+    total_cumpridos = sum(item['TOTAL_CUMPRIDOS'] for item in departamentos)
+    atualizacoes = [linha.DATA_ATUALIZACAO for linha in linhas if linha.DATA_ATUALIZACAO]
+    if atualizacoes and min(atualizacoes) < datetime.combine(hoje, datetime.min.time()):
+        agendar_virada_dia(hoje)
+    return {
+        'total_exigidos': total_exigidos,
+        'total_cumpridos': total_cumpridos,
+        'percentual_conformidade': percentual(total_cumpridos, total_exigidos),
+        'vencendo_mes': sum(item['VENCENDO_MES'] for item in departamentos),
+        'horas_treinadas': sum(centro['HORAS_TREINADAS'] for centro in centros.values()),
+        'atualizado_em': max(atualizacoes).isoformat() if atualizacoes else None,
+        'departamentos': departamentos,
+        'centros_custo': sorted(centros.values(), key=lambda centro: centro['NOME_CENTRODECUSTO'])
+    }
+
+
+class CacheDashboard:
+    """
+    Guarda em memória a última resposta do dashboard por DASHBOARD_CACHE_TTL segundos.
+    Dentro do TTL nenhuma consulta é feita; a resposta acompanha um ETag para revalidação no navegador.
+    """
+
+    def __init__(self):
+        self.ttl = 60
+        self._dados = None
+        self._etag = None
+        self._expira_em = 0
+        self._lock = threading.Lock()
+
+    def init_app(self, app):
+        self.ttl = app.config['DASHBOARD_CACHE_TTL']
+
+    def obter(self):
+        """ Retorna (dados, etag), recalculando quando o cache expirou """
+        with self._lock:
+            if self._dados is None or time.monotonic() >= self._expira_em:
+                self._dados = dados_dashboard()
+                conteudo = json.dumps(self._dados, sort_keys=True, default=str).encode('utf-8')
+                self._etag = hashlib.sha1(conteudo).hexdigest()  # Sem aspas, como em request.if_none_match
+                self._expira_em = time.monotonic() + self.ttl
+            return self._dados, self._etag
+
+    def invalidar(self):
+        with self._lock:
+            self._dados = None
+
+
+cache_dashboard = CacheDashboard()
@@ -0,0 +1,44 @@
+import click
+from flask import render_template, request, jsonify, current_app
+from flask_login import login_required
+from app.dashboard import bp
+from app.dashboard.resumo import atualizar_resumo, cache_dashboard
+
+
+@bp.route('/', methods=['GET'])
+@login_required
+def index():
+    """ Página do dashboard; os gráficos são carregados de /dashboard/dados """
+    return render_template('dashboard/Index.html')
+
+
+@bp.route('/dados', methods=['GET'])
+@login_required
+def dados():
+    """
+    Retorna, em JSON, os indicadores do dashboard lidos de TBRESUMO_DEPARTAMENTO.
+    A resposta é mantida em cache por DASHBOARD_CACHE_TTL segundos e responde 304
+    quando o ETag enviado pelo navegador ainda é o atual.
+    """
+    dados_resumo, etag = cache_dashboard.obter()
+    if etag in request.if_none_match:
+        resposta = current_app.response_class(status=304)
+    else:
+        resposta = jsonify(dados_resumo)
+    resposta.set_etag(etag)
+    resposta.cache_control.private = True
+    resposta.cache_control.max_age = current_app.config['DASHBOARD_CACHE_TTL']
+    return resposta
+
+
+@bp.cli.command('atualizar')
+@click.option('--todos', is_flag=True, help='Recalcula todos os departamentos, não apenas os pendentes.')
+def atualizar(todos):
+    """
+    Atualiza os resumos do dashboard (uso: flask dashboard atualizar [--todos]).
+    Deve ser agendado diariamente após a meia-noite: recalcula os resumos do dia anterior,
+    que a rota /dashboard/dados não recalcula durante a requisição.
+    """
+    quantidade = atualizar_resumo(todos=todos)
+    cache_dashboard.invalidar()
+    click.echo(f'{quantidade} departamento(s) recalculado(s).')
@@ -0,0 +1,10 @@
+from app.extensions import db
+
+class Departamento(db.Model):
+    __tablename__ = 'TBDEPARTAMENTO'
+    ID_DEPARTAMENTO = db.Column(db.Integer, primary_key=True, autoincrement=True)
+    NOME_DEPARTAMENTO = db.Column(db.String(50), nullable=False)
+    ID_CENTRODECUSTO = db.Column(db.Integer, db.ForeignKey('TBCENTROCUSTO.ID_CENTRODECUSTO'), nullable=True)
+
+    def __repr__(self):
+        return f'<Departamento {self.NOME_DEPARTAMENTO}>'
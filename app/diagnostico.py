@@ -0,0 +1,245 @@
+import os
+import subprocess
+import sys
+import threading
+import time
+from contextlib import contextmanager
+import click
+from flask import g, request, current_app, has_request_context
+from flask.cli import AppGroup
+from sqlalchemy import event, exc
+from sqlalchemy.engine import Engine
+from sqlalchemy.pool import QueuePool
+
+
+class LimiteQueriesExcedido(AssertionError):
+    """ Lançada (em modo de testes) quando uma requisição executa mais queries que o permitido """
+
+
+# Contadores ativos abertos por contar_queries (fora do ciclo de requisição)
+_contadores_ativos = []
+
+
+@event.listens_for(Engine, 'before_cursor_execute')
+def _registrar_query(conn, cursor, statement, parameters, context, executemany):
+    """
+    Conta cada comando SQL enviado ao banco.
+    Dentro de uma requisição o total fica em g; fora dela, nos contadores de contar_queries.
+    """
+    if has_request_context():
+        g.total_queries = g.get('total_queries', 0) + 1
+    for contador in _contadores_ativos:
+        contador.append(statement)
+
+
+@contextmanager
+def contar_queries():
+    """
+    Gerenciador de contexto que registra os comandos SQL executados no bloco.
+    Exemplo:
+        with contar_queries() as queries:
+            client.get('/logs/logs')
+        assert len(queries) <= 4, queries
+    """
+    queries = []
+    _contadores_ativos.append(queries)
+    try:
+        yield queries
+    finally:
+        _contadores_ativos.remove(queries)
+
+
+def limite_queries(maximo):
+    """
+    Decorador que define a quantidade máxima de queries aceita por uma rota.
+    O limite só é verificado quando LIMITE_QUERIES_ATIVO estiver habilitado,
+    servindo para detectar regressões como N+1 em ambientes de teste/CI.
+    Deve ser aplicado logo abaixo de @bp.route, para marcar a função registrada como view.
+    """
+    def decorador(f):
+        f.limite_queries = maximo
+        return f
+    return decorador
+
+
+class PoolInstrumentado(QueuePool):
+    """
+    QueuePool que mede o tempo de espera por uma conexão livre (checkout),
+    os eventos de overflow (conexões abertas além de pool_size) e os timeouts do pool.
+    Os valores são expostos em /health/db para dimensionar o pool sob carga.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._lock_estatisticas = threading.Lock()
+        self.checkouts = 0
+        self.espera_total = 0.0
+        self.espera_maxima = 0.0
+        self.eventos_overflow = 0
+        self.timeouts = 0
+
+    def _do_get(self):
+        inicio = time.perf_counter()
+        overflow_antes = self.overflow()
+        try:
+            conexao = super()._do_get()
+        except exc.TimeoutError:
+            with self._lock_estatisticas:
+                self.timeouts += 1
+            raise
+
+        espera = time.perf_counter() - inicio
+        with self._lock_estatisticas:
+            self.checkouts += 1
+            self.espera_total += espera
+            self.espera_maxima = max(self.espera_maxima, espera)
+            if self.overflow() > overflow_antes and self.overflow() > 0:
+                self.eventos_overflow += 1
+        return conexao
+
+    def estatisticas(self):
+        """ Retorna o estado atual do pool e os contadores acumulados """
+        with self._lock_estatisticas:
+            return {
+                'tamanho': self.size(),
+                'em_uso': self.checkedout(),
+                'ociosas': self.checkedin(),
+                'overflow': self.overflow(),
+                'checkouts': self.checkouts,
+                'espera_media_ms': round(1000 * self.espera_total / self.checkouts, 3) if self.checkouts else 0.0,
+                'espera_maxima_ms': round(1000 * self.espera_maxima, 3),
+                'eventos_overflow': self.eventos_overflow,
+                'timeouts': self.timeouts,
+            }
+
+
+def configurar_pool(app):
+    """
+    Usa o PoolInstrumentado no engine principal quando o banco utiliza pool de conexões
+    (SQL Server). Deve ser chamado antes de db.init_app, que cria o engine.
+    """
+    opcoes = dict(app.config.get('SQLALCHEMY_ENGINE_OPTIONS', {}))  # Cópia, para não alterar a classe Config
+    if 'pool_size' in opcoes:
+        opcoes.setdefault('poolclass', PoolInstrumentado)
+    app.config['SQLALCHEMY_ENGINE_OPTIONS'] = opcoes
+
+
+def init_app(app):
+    """ Registra a verificação do limite de queries por requisição e os comandos de diagnóstico na aplicação """
+    app.cli.add_command(diagnostico_cli)
+
+    @app.teardown_request
+    def verificar_limite_queries(exc):
+        # Executado após o envio completo da resposta, inclusive respostas em streaming
+        if not app.config.get('LIMITE_QUERIES_ATIVO') or request.endpoint is None:
+            return
+
+        view = app.view_functions.get(request.endpoint)
+        maximo = getattr(view, 'limite_queries', None)
+        total = g.get('total_queries', 0)
+        if maximo is None or total <= maximo:
+            return
+
+        mensagem = f'{request.endpoint} executou {total} queries (limite: {maximo})'
+        current_app.logger.error('Limite de queries excedido: %s', mensagem)
+        if app.testing:
+            raise LimiteQueriesExcedido(mensagem)
+
+
+def memoria_rss():
+    """
+    Memória residente (RSS) atual do processo, em bytes, ou None se não puder ser obtida.
+    Usa o psutil, se instalado (Windows/IIS); caso contrário, /proc/self/statm (Linux).
+    """
+    try:
+        import psutil  # Dependência opcional
+        return psutil.Process().memory_info().rss
+    except ImportError:
+        pass
+    try:
+        with open('/proc/self/statm') as arquivo:
+            return int(arquivo.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError, AttributeError):
+        return None
+
+
+def registrar_inicializacao(app, inicio_importacao, inicio_create_app):
+    """
+    Registra o custo de inicialização do processo: tempo de importação do pacote app,
+    tempo de create_app() e RSS ao final; na primeira requisição, o tempo até ela ser atendida
+    e o RSS nesse momento. Os valores são registrados no log e expostos em /health/inicializacao.
+    """
+    fim = time.perf_counter()
+    dados = {
+        'importacao_ms': round(1000 * (inicio_create_app - inicio_importacao), 1),
+        'create_app_ms': round(1000 * (fim - inicio_create_app), 1),
+        'rss_inicial_bytes': memoria_rss(),
+        'primeira_requisicao_ms': None,
+        'rss_primeira_requisicao_bytes': None,
+    }
+    app.extensions['diagnostico_inicializacao'] = dados
+    app.logger.info('Inicialização: importação %.1f ms, create_app %.1f ms, RSS %s bytes',
+                    dados['importacao_ms'], dados['create_app_ms'], dados['rss_inicial_bytes'])
+
+    lock = threading.Lock()
+
+    @app.before_request
+    def registrar_primeira_requisicao():
+        if dados['primeira_requisicao_ms'] is not None:
+            return
+        with lock:
+            if dados['primeira_requisicao_ms'] is None:
+                dados['primeira_requisicao_ms'] = round(1000 * (time.perf_counter() - inicio_importacao), 1)
+                dados['rss_primeira_requisicao_bytes'] = memoria_rss()
+                app.logger.info('Primeira requisição após %.1f ms do início da importação, RSS %s bytes',
+                                dados['primeira_requisicao_ms'], dados['rss_primeira_requisicao_bytes'])
+
+
+def relatorio_importacoes(saida_importtime):
+    """
+    Interpreta a saída de `python -X importtime` (stderr) e retorna uma lista de dicts
+    {modulo, proprio_us, acumulado_us, nivel}, na ordem em que os módulos terminaram de ser importados.
+    """
+    modulos = []
+    for linha in saida_importtime.splitlines():
+        if not linha.startswith('import time:') or 'self [us]' in linha:
+            continue
+        try:
+            proprio, acumulado, nome = linha[len('import time:'):].split('|', 2)
+            modulos.append({
+                'modulo': nome.strip(),
+                'proprio_us': int(proprio),
+                'acumulado_us': int(acumulado),
+                'nivel': (len(nome) - len(nome.lstrip())) // 2,
+            })
+        except ValueError:
+            continue
+    return modulos
+
+
+diagnostico_cli = AppGroup('diagnostico', help='Diagnóstico de desempenho da aplicação.')
+
+
+@diagnostico_cli.command('importacoes')
+@click.option('--modulo', default='run', show_default=True, help='Módulo importado (o mesmo carregado pelo wfastcgi).')
+@click.option('--limite', default=25, show_default=True, help='Quantidade de módulos listados.')
+@click.option('--ordem', type=click.Choice(['acumulado', 'proprio']), default='acumulado', show_default=True)
+def importacoes(modulo, limite, ordem):
+    """
+    Mede o custo de importação de cada módulo em um processo novo (python -X importtime),
+    como um worker recém-criado pelo IIS, e lista os mais caros.
+    """
+    processo = subprocess.run([sys.executable, '-X', 'importtime', '-c', f'import {modulo}'],
+                              cwd=os.path.dirname(current_app.root_path), capture_output=True, text=True)
+    if processo.returncode != 0:
+        raise click.ClickException(processo.stderr.strip().splitlines()[-1] if processo.stderr.strip()
+                                   else f'Falha ao importar {modulo}')
+
+    modulos = relatorio_importacoes(processo.stderr)
+    total = sum(item['acumulado_us'] for item in modulos if item['nivel'] == 0)
+    chave = 'acumulado_us' if ordem == 'acumulado' else 'proprio_us'
+
+    click.echo(f"{'acumulado (ms)':>15} {'próprio (ms)':>13}  módulo")
+    for item in sorted(modulos, key=lambda item: item[chave], reverse=True)[:limite]:
+        click.echo(f"{item['acumulado_us'] / 1000:15.1f} {item['proprio_us'] / 1000:13.1f}  {item['modulo']}")
+    click.echo(f'Total: {total / 1000:.1f} ms em {len(modulos)} módulo(s)')
@@ -0,0 +1,5 @@
+from flask import Blueprint
+
+bp = Blueprint('importacao', __name__)
+
+from app.importacao import routes
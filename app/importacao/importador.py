@@ -0,0 +1,327 @@
+import re
+from abc import ABC, abstractmethod
+from datetime import date, datetime
+from decimal import Decimal, InvalidOperation
+from sqlalchemy import select, insert
+from sqlalchemy.exc import SQLAlchemyError
+from app.extensions import db
+from app.cargo.models import Cargo
+from app.colaborador.models import Colaborador
+from app.dashboard.resumo import marcar_pendentes
+from app.departamento.models import Departamento
+from app.importacao.leitores import ler_planilha
+from app.logs.routes import registrar_log
+from app.treinamento.models import Treinamento
+from app.treina_colaborador.conformidade import calcular_data_validade
+from app.treina_colaborador.models import TreinaColaborador
+
+# Valores aceitos nas colunas booleanas
+VERDADEIROS = {'1', 'S', 'SIM', 'TRUE', 'VERDADEIRO', 'ATIVO', 'X'}
+FALSOS = {'0', 'N', 'NAO', 'NÃO', 'FALSE', 'FALSO', 'INATIVO'}
+
+# Formatos de data aceitos em colunas de texto
+FORMATOS_DATA = ('%d/%m/%Y', '%Y-%m-%d', '%d-%m-%Y')
+
+
+class LinhaInvalida(ValueError):
+    """ Lançada quando uma linha da planilha não pode ser importada """
+
+
+def _texto(linha, coluna, obrigatorio=False, tamanho=None):
+    valor = linha.get(coluna)
+    valor = str(valor).strip() if valor is not None else ''
+    if not valor:
+        if obrigatorio:
+            raise LinhaInvalida(f'{coluna} não informado')
+        return None
+    if tamanho and len(valor) > tamanho:
+        raise LinhaInvalida(f'{coluna} excede {tamanho} caracteres')
+    return valor
+
+
+def _inteiro(linha, coluna, obrigatorio=False):
+    valor = _texto(linha, coluna, obrigatorio)
+    if valor is None:
+        return None
+    try:
+        numero = Decimal(valor)  # O Excel entrega números inteiros como 123.0
+    except InvalidOperation:
+        raise LinhaInvalida(f'{coluna} inválido: {valor}')
+    if not numero.is_finite() or numero != numero.to_integral_value():
+        raise LinhaInvalida(f'{coluna} deve ser um número inteiro: {valor}')
+    return int(numero)
+
+
+def _data(linha, coluna, obrigatorio=False):
+    valor = linha.get(coluna)
+    if isinstance(valor, datetime):
+        return valor.date()
+    if isinstance(valor, date):
+        return valor
+    valor = _texto(linha, coluna, obrigatorio)
+    if valor is None:
+        return None
+    for formato in FORMATOS_DATA:
+        try:
+            return datetime.strptime(valor, formato).date()
+        except ValueError:
+            continue
+    raise LinhaInvalida(f'{coluna} inválida: {valor}')
+
+
+def _booleano(linha, coluna, padrao=None):
+    valor = _texto(linha, coluna)
+    if valor is None:
+        return padrao
+    valor = valor.upper()
+    if valor in VERDADEIROS:
+        return True
+    if valor in FALSOS:
+        return False
+    raise LinhaInvalida(f'{coluna} inválido: {valor}')
+
+
+def _digitos(valor):
+    return re.sub(r'\D', '', str(valor)) if valor is not None else ''
+
+
+def _chave_nome(valor):
+    return str(valor).strip().upper() if valor is not None else ''
+
+
+class Importador(ABC):
+    """
+    Importação em lote de planilhas (CSV/XLSX).
+    O arquivo é lido em lotes; as referências (IDs por CPF, matrícula, nome etc.) são resolvidas
+    em dicionários carregados uma única vez, e cada lote é inserido com um único executemany
+    (fast_executemany no pyodbc) em sua própria transação, com um registro de auditoria por lote.
+    Linhas inválidas são rejeitadas individualmente sem interromper a importação.
+    """
+
+    tabela = None    # Nome da tabela de destino (auditoria)
+    modelo = None    # Modelo SQLAlchemy de destino
+
+    def __init__(self, usuario_id, tamanho_lote=1000, max_rejeitadas=500):
+        self.usuario_id = usuario_id
+        self.tamanho_lote = tamanho_lote
+        self.max_rejeitadas = max_rejeitadas
+
+    def carregar_referencias(self):
+        """ Carrega os dicionários de referência usados por converter() """
+
+    @abstractmethod
+    def converter(self, linha):
+        """ Valida a linha (dict coluna -> valor) e retorna o dict a inserir; lança LinhaInvalida """
+
+    def apos_lote(self, registros):
+        """ Executado na transação do lote, após a inserção dos registros """
+
+    def executar(self, arquivo, nome_arquivo, progresso=None):
+        """
+        Importa o arquivo e retorna o resumo: linhas processadas, inseridas, rejeitadas
+        e a lista das primeiras rejeições (linha e motivo).
+        progresso, se informado, é chamado após cada lote com o resumo parcial.
+        """
+        lotes = ler_planilha(arquivo, nome_arquivo, self.tamanho_lote)
+        self.carregar_referencias()
+        resultado = {'arquivo': nome_arquivo, 'tabela': self.tabela, 'lotes': 0,
+                     'processadas': 0, 'inseridas': 0, 'rejeitadas': 0, 'rejeicoes': []}
+
+        for numero_lote, lote in enumerate(lotes, start=1):
+            registros = []
+            for numero_linha, linha in lote:
+                try:
+                    registros.append(self.converter(linha))
+                except LinhaInvalida as erro:
+                    self._rejeitar(resultado, numero_linha, str(erro))
+
+            if registros:
+                try:
+                    self._gravar_lote(registros, nome_arquivo, numero_lote, lote[0][0], lote[-1][0])
+                    resultado['inseridas'] += len(registros)
+                except SQLAlchemyError as erro:
+                    db.session.rollback()
+                    self.descartar_lote(registros)
+                    motivo = f'Lote {numero_lote} não gravado: {erro.__class__.__name__}'
+                    for numero_linha, _ in lote:
+                        self._rejeitar(resultado, numero_linha, motivo)
+
+            resultado['lotes'] = numero_lote
+            resultado['processadas'] += len(lote)
+            if progresso:
+                progresso(resultado)
+
+        return resultado
+
+    def _rejeitar(self, resultado, numero_linha, motivo):
+        resultado['rejeitadas'] += 1
+        if len(resultado['rejeicoes']) < self.max_rejeitadas:
+            resultado['rejeicoes'].append({'linha': numero_linha, 'motivo': motivo})
+
+    def _gravar_lote(self, registros, nome_arquivo, numero_lote, primeira_linha, ultima_linha):
+        db.session.execute(insert(self.modelo.__table__), registros)
+        self.apos_lote(registros)
+        # Um único registro de auditoria resume o lote (ID_REGISTRO 0: vários registros)
+        registrar_log(self.usuario_id, 'INSERT', self.tabela, 0, None, {
+            'IMPORTACAO': nome_arquivo,
+            'LOTE': numero_lote,
+            'LINHAS': f'{primeira_linha}-{ultima_linha}',
+            'REGISTROS': len(registros)
+        })
+        db.session.commit()
+
+    def descartar_lote(self, registros):
+        """ Desfaz, nas referências em memória, os registros de um lote que não foi gravado """
+
+
+class ImportadorColaboradores(Importador):
+    """
+    Importa colaboradores (TBCOLABORADOR).
+    Colunas: CPF, MATRICULA, NOME_COLABORADOR, CARGO (nome) ou ID_CARGO,
+    DEPARTAMENTO (nome) ou ID_DEPARTAMENTO, e opcionalmente DATA_ADMISSAO, STATUS,
+    REGIME_TRABALHO e CARGO_GESTAO. CPF e matrícula já cadastrados são rejeitados.
+    """
+
+    tabela = 'TBCOLABORADOR'
+    modelo = Colaborador
+
+    def carregar_referencias(self):
+        self.cargos = {_chave_nome(nome): id_cargo for id_cargo, nome in
+                       db.session.execute(select(Cargo.ID_CARGO, Cargo.NOME_CARGO))}
+        self.departamentos = {_chave_nome(nome): id_departamento for id_departamento, nome in
+                              db.session.execute(select(Departamento.ID_DEPARTAMENTO, Departamento.NOME_DEPARTAMENTO))}
+        self.ids_cargo = set(self.cargos.values())
+        self.ids_departamento = set(self.departamentos.values())
+
+        self.cpfs, self.matriculas = set(), set()
+        for cpf, matricula in db.session.execute(select(Colaborador.CPF, Colaborador.MATRICULA)):
+            self.cpfs.add(_digitos(cpf))
+            self.matriculas.add(matricula)
+
+    def _resolver(self, linha, coluna_nome, coluna_id, nomes, ids):
+        id_referencia = _inteiro(linha, coluna_id)
+        if id_referencia is not None:
+            if id_referencia not in ids:
+                raise LinhaInvalida(f'{coluna_id} não encontrado: {id_referencia}')
+            return id_referencia
+        nome = _texto(linha, coluna_nome, obrigatorio=True)
+        if _chave_nome(nome) not in nomes:
+            raise LinhaInvalida(f'{coluna_nome} não encontrado: {nome}')
+        return nomes[_chave_nome(nome)]
+
+    def converter(self, linha):
+        cpf = _texto(linha, 'CPF', obrigatorio=True, tamanho=14)
+        if len(_digitos(cpf)) != 11:
+            raise LinhaInvalida(f'CPF inválido: {cpf}')
+        matricula = _inteiro(linha, 'MATRICULA', obrigatorio=True)
+        if _digitos(cpf) in self.cpfs:
+            raise LinhaInvalida(f'CPF já cadastrado: {cpf}')
+        if matricula in self.matriculas:
+            raise LinhaInvalida(f'Matrícula já cadastrada: {matricula}')
+
+        registro = {
+            'CPF': cpf,
+            'MATRICULA': matricula,
+            'NOME_COLABORADOR': _texto(linha, 'NOME_COLABORADOR', obrigatorio=True, tamanho=50),
+            'DATA_ADMISSAO': _data(linha, 'DATA_ADMISSAO'),
+            'STATUS': _booleano(linha, 'STATUS', padrao=True),
+            'REGIME_TRABALHO': _texto(linha, 'REGIME_TRABALHO', tamanho=50),
+            'CARGO_GESTAO': _booleano(linha, 'CARGO_GESTAO'),
+            'ID_CARGO': self._resolver(linha, 'CARGO', 'ID_CARGO', self.cargos, self.ids_cargo),
+            'ID_DEPARTAMENTO': self._resolver(linha, 'DEPARTAMENTO', 'ID_DEPARTAMENTO',
+                                              self.departamentos, self.ids_departamento)
+        }
+        # Evita duplicidades dentro do próprio arquivo
+        self.cpfs.add(_digitos(cpf))
+        self.matriculas.add(matricula)
+        return registro
+
+    def apos_lote(self, registros):
+        marcar_pendentes(db.session.connection(), ids_departamento={r['ID_DEPARTAMENTO'] for r in registros})
+
+    def descartar_lote(self, registros):
+        for registro in registros:
+            self.cpfs.discard(_digitos(registro['CPF']))
+            self.matriculas.discard(registro['MATRICULA'])
+
+
+class ImportadorTreinamentos(Importador):
+    """
+    Importa conclusões de treinamentos (TBTREINA_COLABORADOR).
+    Colunas: MATRICULA ou CPF do colaborador, TREINAMENTO (nome) ou ID_TREINAMENTO, DATA_TREINAMENTO,
+    e opcionalmente VALIDADE_TREINAMENTO, DATA_VALIDADE, STATUS, NECESSIDADE e TIPO_TREINAMENTO.
+    Sem DATA_VALIDADE, o vencimento é calculado pela FREQUENCIA do treinamento.
+    """
+
+    tabela = 'TBTREINA_COLABORADOR'
+    modelo = TreinaColaborador
+
+    def carregar_referencias(self):
+        self.por_matricula, self.por_cpf = {}, {}
+        for id_colaborador, matricula, cpf in db.session.execute(
+                select(Colaborador.ID_COLABORADOR, Colaborador.MATRICULA, Colaborador.CPF)):
+            self.por_matricula[matricula] = id_colaborador
+            self.por_cpf[_digitos(cpf)] = id_colaborador
+
+        self.treinamentos = {}       # ID_TREINAMENTO -> FREQUENCIA
+        self.treinamentos_nome = {}  # nome -> ID_TREINAMENTO
+        for id_treinamento, nome, frequencia in db.session.execute(
+                select(Treinamento.ID_TREINAMENTO, Treinamento.NOME_TREINAMENTO, Treinamento.FREQUENCIA)):
+            self.treinamentos[id_treinamento] = frequencia
+            self.treinamentos_nome[_chave_nome(nome)] = id_treinamento
+
+    def _colaborador(self, linha):
+        matricula = _inteiro(linha, 'MATRICULA')
+        if matricula is not None:
+            if matricula not in self.por_matricula:
+                raise LinhaInvalida(f'Matrícula não encontrada: {matricula}')
+            return self.por_matricula[matricula]
+        cpf = _texto(linha, 'CPF')
+        if cpf is None:
+            raise LinhaInvalida('MATRICULA ou CPF não informado')
+        if _digitos(cpf) not in self.por_cpf:
+            raise LinhaInvalida(f'CPF não encontrado: {cpf}')
+        return self.por_cpf[_digitos(cpf)]
+
+    def _treinamento(self, linha):
+        id_treinamento = _inteiro(linha, 'ID_TREINAMENTO')
+        if id_treinamento is not None:
+            if id_treinamento not in self.treinamentos:
+                raise LinhaInvalida(f'ID_TREINAMENTO não encontrado: {id_treinamento}')
+            return id_treinamento
+        nome = _texto(linha, 'TREINAMENTO', obrigatorio=True)
+        if _chave_nome(nome) not in self.treinamentos_nome:
+            raise LinhaInvalida(f'Treinamento não encontrado: {nome}')
+        return self.treinamentos_nome[_chave_nome(nome)]
+
+    def converter(self, linha):
+        id_treinamento = self._treinamento(linha)
+        frequencia = self.treinamentos[id_treinamento]
+        data_treinamento = _data(linha, 'DATA_TREINAMENTO', obrigatorio=True)
+        data_validade = _data(linha, 'DATA_VALIDADE')
+        validade = _booleano(linha, 'VALIDADE_TREINAMENTO', padrao=bool(frequencia or data_validade))
+
+        # O before_insert do modelo não é executado em inserções em lote: o vencimento é calculado aqui
+        if validade and data_validade is None:
+            data_validade = calcular_data_validade(data_treinamento, frequencia)
+
+        return {
+            'ID_COLABORADOR': self._colaborador(linha),
+            'ID_TREINAMENTO': id_treinamento,
+            'DATA_TREINAMENTO': data_treinamento,
+            'VALIDADE_TREINAMENTO': validade,
+            'DATA_VALIDADE': data_validade,
+            'STATUS': _texto(linha, 'STATUS', tamanho=50),
+            'NECESSIDADE': _texto(linha, 'NECESSIDADE', tamanho=50),
+            'TIPO_TREINAMENTO': _texto(linha, 'TIPO_TREINAMENTO', tamanho=50)
+        }
+
+    def apos_lote(self, registros):
+        marcar_pendentes(db.session.connection(), ids_colaborador={r['ID_COLABORADOR'] for r in registros})
+
+
+# Importadores disponíveis: tipo (URL/CLI) -> classe
+IMPORTADORES = {
+    'colaboradores': ImportadorColaboradores,
+    'treinamentos': ImportadorTreinamentos,
+}
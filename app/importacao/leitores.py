@@ -0,0 +1,101 @@
+import codecs
+import csv
+import io
+import os
+
+# Separadores aceitos em arquivos CSV (detectados pela linha de cabeçalho)
+SEPARADORES_CSV = ';,\t'
+
+# Codificações aceitas em arquivos CSV, na ordem em que são testadas: UTF-8 (com ou sem BOM) e a
+# do Excel em português no Windows, que grava "CSV (separado por vírgulas)" em cp1252
+CODIFICACOES_CSV = ('utf-8-sig', 'cp1252')
+
+# Tamanho dos blocos lidos na detecção da codificação
+TAMANHO_BLOCO = 64 * 1024
+
+
+def _normalizar_cabecalho(cabecalho):
+    """ Padroniza os nomes das colunas: sem espaços nas pontas, maiúsculos e com _ no lugar de espaços """
+    return [str(coluna or '').strip().upper().replace(' ', '_') for coluna in cabecalho]
+
+
+def _em_lotes(linhas, cabecalho, tamanho_lote):
+    """ Agrupa as linhas em lotes de (número da linha no arquivo, dict coluna -> valor) """
+    lote = []
+    for numero, valores in enumerate(linhas, start=2):  # A linha 1 é o cabeçalho
+        if not any(valor not in (None, '') for valor in valores):
+            continue  # Linha em branco
+        lote.append((numero, dict(zip(cabecalho, valores))))
+        if len(lote) >= tamanho_lote:
+            yield lote
+            lote = []
+    if lote:
+        yield lote
+
+
+def detectar_codificacao(arquivo):
+    """
+    Retorna a primeira codificação de CODIFICACOES_CSV que decodifica o arquivo inteiro, lido em blocos
+    (sem carregá-lo na memória), e volta ao início do arquivo. Lança ValueError se nenhuma servir.
+    """
+    for codificacao in CODIFICACOES_CSV:
+        decodificador = codecs.getincrementaldecoder(codificacao)()
+        arquivo.seek(0)
+        try:
+            for bloco in iter(lambda: arquivo.read(TAMANHO_BLOCO), b''):
+                decodificador.decode(bloco)
+            decodificador.decode(b'', final=True)
+        except UnicodeDecodeError:
+            continue
+        arquivo.seek(0)
+        return codificacao
+    arquivo.seek(0)
+    raise ValueError('Codificação do arquivo CSV não reconhecida. Salve o arquivo em UTF-8.')
+
+
+def ler_csv(arquivo, tamanho_lote):
+    """
+    Lê um CSV (UTF-8 ou cp1252) em lotes, sem carregar o arquivo inteiro na memória.
+    A codificação é detectada antes da leitura (ValueError se não reconhecida)
+    e o separador (; , ou tabulação), pelo cabeçalho.
+    """
+    return _ler_csv(arquivo, detectar_codificacao(arquivo), tamanho_lote)
+
+
+def _ler_csv(arquivo, codificacao, tamanho_lote):
+    texto = io.TextIOWrapper(arquivo, encoding=codificacao, newline='')
+    primeira_linha = texto.readline()
+    separador = max(SEPARADORES_CSV, key=primeira_linha.count)
+    cabecalho = _normalizar_cabecalho(next(csv.reader([primeira_linha], delimiter=separador), []))
+    yield from _em_lotes(csv.reader(texto, delimiter=separador), cabecalho, tamanho_lote)
+
+
+def ler_xlsx(arquivo, tamanho_lote):
+    """
+    Lê a primeira planilha de um arquivo XLSX em lotes, no modo somente leitura do openpyxl
+    (as linhas são lidas sob demanda, sem montar a planilha inteira na memória).
+    """
+    from openpyxl import load_workbook  # Dependência necessária apenas para importar XLSX
+
+    pasta = load_workbook(arquivo, read_only=True, data_only=True)
+    try:
+        linhas = pasta.worksheets[0].iter_rows(values_only=True)
+        cabecalho = _normalizar_cabecalho(next(linhas, ()))
+        yield from _em_lotes(linhas, cabecalho, tamanho_lote)
+    finally:
+        pasta.close()
+
+
+# Leitores por extensão de arquivo
+LEITORES = {
+    '.csv': ler_csv,
+    '.xlsx': ler_xlsx,
+}
+
+
+def ler_planilha(arquivo, nome_arquivo, tamanho_lote):
+    """ Retorna o gerador de lotes adequado à extensão do arquivo (ValueError se não suportada) """
+    extensao = os.path.splitext(nome_arquivo or '')[1].lower()
+    if extensao not in LEITORES:
+        raise ValueError(f"Formato de arquivo não suportado: '{extensao}'. Use CSV ou XLSX.")
+    return LEITORES[extensao](arquivo, tamanho_lote)
@@ -0,0 +1,93 @@
+import os
+import tempfile
+import click
+from flask import request, jsonify, current_app
+from flask_login import login_required, current_user
+from app.autenticacao.permissoes import requires_permission, IMPORTAR_DADOS
+from app.importacao import bp
+from app.importacao.importador import IMPORTADORES
+from app.importacao.leitores import LEITORES, detectar_codificacao
+from app.tarefas.gerenciador import gerenciador_tarefas, FilaTarefasCheia
+from app.tarefas.routes import resposta_tarefa
+
+
+def _criar_importador(tipo, usuario_id):
+    return IMPORTADORES[tipo](
+        usuario_id,
+        tamanho_lote=current_app.config['IMPORTACAO_TAMANHO_LOTE'],
+        max_rejeitadas=current_app.config['IMPORTACAO_MAX_REJEICOES']
+    )
+
+
+@bp.route('/<tipo>', methods=['POST'])
+@login_required
+@requires_permission(IMPORTAR_DADOS)
+def importar(tipo):
+    """
+    Agenda a importação de uma planilha CSV ou XLSX (campo 'arquivo') de colaboradores ou de
+    treinamentos realizados. O arquivo é salvo no diretório de tarefas e importado em segundo plano;
+    a resposta (202) traz a tarefa, cujo resultado final informa as linhas inseridas e rejeitadas.
+    """
+    if tipo not in IMPORTADORES:
+        return jsonify({"erro": "Tipo de importação inválido. Use colaboradores ou treinamentos."}), 400
+
+    arquivo = request.files.get('arquivo')
+    if not arquivo or not arquivo.filename:
+        return jsonify({"erro": "Nenhum arquivo enviado."}), 400
+
+    extensao = os.path.splitext(arquivo.filename)[1].lower()
+    if extensao not in LEITORES:
+        return jsonify({"erro": "Formato de arquivo não suportado. Use CSV ou XLSX."}), 400
+
+    descritor, caminho = tempfile.mkstemp(suffix=extensao, dir=gerenciador_tarefas.diretorio)
+    with os.fdopen(descritor, 'wb') as destino:
+        arquivo.save(destino)
+
+    # Um CSV em codificação desconhecida é recusado aqui, antes de agendar a importação
+    if extensao == '.csv':
+        try:
+            with open(caminho, 'rb') as salvo:
+                detectar_codificacao(salvo)
+        except ValueError as erro:
+            os.remove(caminho)
+            return jsonify({"erro": str(erro)}), 400
+
+    try:
+        id_tarefa = gerenciador_tarefas.submeter(f'importacao_{tipo}', current_user.ID_USUARIO, _tarefa_importar,
+                                                 tipo, current_user.ID_USUARIO, caminho, arquivo.filename)
+    except FilaTarefasCheia as erro:
+        os.remove(caminho)
+        return jsonify({"erro": str(erro)}), 503, {'Retry-After': '30'}
+
+    return resposta_tarefa(id_tarefa, 202)
+
+
+def _tarefa_importar(tarefa, tipo, usuario_id, caminho, nome_arquivo):
+    """ Executa a importação em segundo plano, informando o progresso a cada lote """
+    def progresso(parcial):
+        tarefa.progresso(processadas=parcial['processadas'], inseridas=parcial['inseridas'],
+                         rejeitadas=parcial['rejeitadas'])
+
+    try:
+        with open(caminho, 'rb') as entrada:
+            return _criar_importador(tipo, usuario_id).executar(entrada, nome_arquivo, progresso)
+    finally:
+        os.remove(caminho)
+
+
+@bp.cli.command('executar')
+@click.argument('tipo', type=click.Choice(sorted(IMPORTADORES)))
+@click.argument('caminho', type=click.Path(exists=True, dir_okay=False))
+@click.option('--usuario', 'usuario_id', type=int, required=True, help='ID do usuário registrado na auditoria.')
+def executar(tipo, caminho, usuario_id):
+    """ Importa uma planilha pela linha de comando (uso: flask importacao executar treinamentos arquivo.xlsx --usuario 1) """
+    def progresso(parcial):
+        click.echo(f"Lote {parcial['lotes']}: {parcial['processadas']} linha(s) processada(s), "
+                   f"{parcial['inseridas']} inserida(s), {parcial['rejeitadas']} rejeitada(s)")
+
+    with open(caminho, 'rb') as arquivo:
+        resultado = _criar_importador(tipo, usuario_id).executar(arquivo, caminho, progresso)
+
+    for rejeicao in resultado['rejeicoes']:
+        click.echo(f"Linha {rejeicao['linha']}: {rejeicao['motivo']}", err=True)
+    click.echo(f"Concluído: {resultado['inseridas']} inserida(s), {resultado['rejeitadas']} rejeitada(s).")
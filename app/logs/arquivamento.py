@@ -0,0 +1,230 @@
+import gzip
+import json
+import os
+from collections import defaultdict
+from datetime import date, datetime, time, timedelta
+from flask import current_app
+from sqlalchemy import select, delete
+from app.extensions import db
+from app.autenticacao.models import User
+from app.logs.models import Log, LogCampo, LogArquivo
+
+FORMATO_DATA_FILTRO = '%Y-%m-%d'
+
+
+def diretorio_arquivo():
+    """ Diretório raiz dos arquivos de logs arquivados (LOGS_ARQUIVO_DIRETORIO ou instance/arquivo_logs) """
+    return current_app.config['LOGS_ARQUIVO_DIRETORIO'] or os.path.join(current_app.instance_path, 'arquivo_logs')
+
+
+def _caminho_relativo(dia):
+    """ Arquivos particionados por data: AAAA/MM/logs-AAAA-MM-DD.jsonl.gz """
+    return f'{dia:%Y}/{dia:%m}/logs-{dia:%Y-%m-%d}.jsonl.gz'
+
+
+def _acrescentar(caminho, registros):
+    """
+    Acrescenta os registros (um JSON por linha) ao arquivo gzip do dia.
+    Cada lote vira um novo membro gzip no fim do arquivo, lido normalmente pelo módulo gzip.
+    O arquivo é sincronizado em disco antes que os logs sejam removidos do banco.
+    """
+    os.makedirs(os.path.dirname(caminho), exist_ok=True)
+    with open(caminho, 'ab') as arquivo:
+        with gzip.GzipFile(fileobj=arquivo, mode='wb') as compactado:
+            for registro in registros:
+                compactado.write(json.dumps(registro, ensure_ascii=False).encode('utf-8') + b'\n')
+        arquivo.flush()
+        os.fsync(arquivo.fileno())
+
+
+def _abrir(caminho_relativo):
+    """ Abre um arquivo arquivado para leitura em texto, ou None se ele não existir """
+    caminho = os.path.join(diretorio_arquivo(), caminho_relativo)
+    if not os.path.exists(caminho):
+        current_app.logger.warning('Arquivo de logs não encontrado: %s', caminho)
+        return None
+    return gzip.open(caminho, 'rt', encoding='utf-8')
+
+
+def _ler(caminho_relativo):
+    """ Percorre os registros de um arquivo arquivado, linha a linha (arquivos ausentes são ignorados) """
+    arquivo = _abrir(caminho_relativo)
+    if arquivo is None:
+        return
+    with arquivo:
+        for linha in arquivo:
+            if linha.strip():
+                yield json.loads(linha)
+
+
+def _procurar(caminho_relativo, id_log):
+    """
+    Procura um log em um arquivo arquivado, descompactando-o linha a linha até encontrá-lo.
+    Como _acrescentar grava ID_LOG como primeira chave, apenas a linha do log é decodificada.
+    """
+    arquivo = _abrir(caminho_relativo)
+    if arquivo is None:
+        return None
+    prefixo = json.dumps({'ID_LOG': id_log})[:-1] + ','
+    with arquivo:
+        for linha in arquivo:
+            if linha.startswith(prefixo):
+                return json.loads(linha)
+    return None
+
+
+def arquivar_logs(dias, tamanho_lote, progresso=None):
+    """
+    Move para arquivos gzip JSONL, particionados por dia, os logs com DATA_HORA anterior a `dias` dias.
+    Os logs são processados em lotes pequenos, cada um em sua própria transação curta
+    (grava o arquivo, registra o lote em TBLOG_ARQUIVO e remove os logs por ID_LOG),
+    para não manter bloqueios longos nem escalar o bloqueio para a tabela inteira.
+    Retorna a quantidade de logs arquivados.
+    """
+    limite = datetime.combine(date.today() - timedelta(days=dias), time.min)
+    raiz = diretorio_arquivo()
+    total = 0
+
+    while True:
+        linhas = db.session.execute(
+            select(Log.ID_LOG, Log.ID_USUARIO, User.NOME_USUARIO, Log.ACAO, Log.TABELA, Log.ID_REGISTRO,
+                   Log.DADOS_ANTERIORES, Log.DADOS_NOVOS, Log.DADOS_ALTERACOES, Log.DATA_HORA)
+            .outerjoin(User, User.ID_USUARIO == Log.ID_USUARIO)
+            .where(Log.DATA_HORA < limite)
+            .order_by(Log.DATA_HORA, Log.ID_LOG)
+            .limit(tamanho_lote)
+        ).all()
+        if not linhas:
+            break
+
+        ids = [linha.ID_LOG for linha in linhas]
+        campos = defaultdict(list)
+        for id_log, campo in db.session.execute(select(LogCampo.ID_LOG, LogCampo.CAMPO).where(LogCampo.ID_LOG.in_(ids))):
+            campos[id_log].append(campo)
+
+        por_dia = defaultdict(list)
+        for linha in linhas:
+            por_dia[linha.DATA_HORA.date()].append({
+                'ID_LOG': linha.ID_LOG,
+                'ID_USUARIO': linha.ID_USUARIO,
+                'USUARIO': linha.NOME_USUARIO,
+                'ACAO': linha.ACAO,
+                'TABELA': linha.TABELA,
+                'ID_REGISTRO': linha.ID_REGISTRO,
+                'DADOS_ANTERIORES': linha.DADOS_ANTERIORES,
+                'DADOS_NOVOS': linha.DADOS_NOVOS,
+                'DADOS_ALTERACOES': linha.DADOS_ALTERACOES,
+                'CAMPOS': campos.get(linha.ID_LOG, []),
+                'DATA_HORA': linha.DATA_HORA.isoformat()
+            })
+
+        try:
+            for dia, registros in por_dia.items():
+                relativo = _caminho_relativo(dia)
+                _acrescentar(os.path.join(raiz, relativo), registros)
+                db.session.add(LogArquivo(
+                    DATA=dia,
+                    ARQUIVO=relativo,
+                    ID_LOG_INICIAL=min(registro['ID_LOG'] for registro in registros),
+                    ID_LOG_FINAL=max(registro['ID_LOG'] for registro in registros),
+                    QUANTIDADE=len(registros),
+                    DATA_ARQUIVAMENTO=datetime.now()
+                ))
+
+            db.session.execute(delete(LogCampo.__table__).where(LogCampo.__table__.c.ID_LOG.in_(ids)))
+            db.session.execute(delete(Log.__table__).where(Log.__table__.c.ID_LOG.in_(ids)))
+            db.session.commit()
+        except Exception:
+            # Se o arquivo já foi gravado, os logs permanecem no banco e serão arquivados de novo;
+            # a leitura ignora registros repetidos (mesmo ID_LOG)
+            db.session.rollback()
+            raise
+
+        total += len(ids)
+        if progresso:
+            progresso(total)
+
+    return total
+
+
+def buscar_arquivado(id_log):
+    """ Procura um log arquivado pelo ID (dict com as colunas do log) ou None """
+    arquivos = db.session.execute(
+        select(LogArquivo.ARQUIVO).distinct()
+        .where(LogArquivo.ID_LOG_INICIAL <= id_log, LogArquivo.ID_LOG_FINAL >= id_log)
+    ).scalars().all()
+
+    for arquivo in arquivos:
+        registro = _procurar(arquivo, id_log)
+        if registro is not None:
+            return registro
+    return None
+
+
+def _criterios(args):
+    """ Converte os filtros da listagem (mesmos parâmetros de _filtrar_logs) em critérios para os arquivos """
+    try:
+        criterios = {
+            'ID_USUARIO': int(args['usuario_id']) if args.get('usuario_id') else None,
+            'ACAO': (args.get('acao') or '').strip().upper() or None,
+            'TABELA': (args.get('tabela') or '').strip().upper() or None,
+            'ID_REGISTRO': int(args['id_registro']) if (args.get('id_registro') or '').strip() else None,
+            'CAMPO': (args.get('campo') or '').strip().upper() or None,
+        }
+        data_inicio = datetime.strptime(args['data_inicio'], FORMATO_DATA_FILTRO) if args.get('data_inicio') else None
+        data_fim = datetime.strptime(args['data_fim'], FORMATO_DATA_FILTRO) if args.get('data_fim') else None
+    except ValueError:
+        raise ValueError("Filtro inválido para a consulta de logs arquivados")
+    return criterios, data_inicio, data_fim
+
+
+def _atende(registro, criterios, data_inicio, data_fim):
+    for coluna in ('ID_USUARIO', 'ACAO', 'TABELA', 'ID_REGISTRO'):
+        if criterios[coluna] is not None and registro[coluna] != criterios[coluna]:
+            return False
+    if criterios['CAMPO'] and criterios['CAMPO'] not in registro.get('CAMPOS', ()):
+        return False
+    data_hora = datetime.fromisoformat(registro['DATA_HORA'])
+    if data_inicio and data_hora < data_inicio:
+        return False
+    if data_fim and data_hora > datetime.combine(data_fim, datetime.max.time()):
+        return False
+    return True
+
+
+def _data_hora(texto, formatar):
+    data_hora = datetime.fromisoformat(texto)
+    return data_hora.strftime('%d/%m/%Y %H:%M:%S') if formatar else data_hora
+
+
+def iterar_linhas_arquivadas(args, formatar_data=True):
+    """
+    Percorre os logs arquivados que atendem aos filtros, do mais recente para o mais antigo,
+    no mesmo formato de exportacao.iterar_linhas (inclusive formatar_data). Os arquivos são lidos um dia por vez.
+    Só há leitura de arquivos quando um intervalo de datas é informado: sem datas, a exportação
+    cobre apenas os logs ainda mantidos em TBLOG.
+    """
+    criterios, data_inicio, data_fim = _criterios(args)
+    if not data_inicio and not data_fim:
+        return
+
+    consulta = select(LogArquivo.DATA, LogArquivo.ARQUIVO).distinct().order_by(LogArquivo.DATA.desc())
+    if data_inicio:
+        consulta = consulta.where(LogArquivo.DATA >= data_inicio.date())
+    if data_fim:
+        consulta = consulta.where(LogArquivo.DATA <= data_fim.date())
+
+    for _, arquivo in db.session.execute(consulta).all():
+        registros = {registro['ID_LOG']: registro for registro in _ler(arquivo)
+                     if _atende(registro, criterios, data_inicio, data_fim)}
+        for registro in sorted(registros.values(), key=lambda r: (r['DATA_HORA'], r['ID_LOG']), reverse=True):
+            yield [
+                registro['ID_LOG'],
+                registro['USUARIO'],
+                registro['ACAO'],
+                registro['TABELA'],
+                registro['ID_REGISTRO'],
+                registro['DADOS_ANTERIORES'],
+                registro['DADOS_NOVOS'],
+                _data_hora(registro['DATA_HORA'], formatar_data)
+            ]
@@ -0,0 +1,151 @@
+import atexit
+import logging
+import queue
+import threading
+import time
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+from app.extensions import db
+from app.logs.models import Log, LogCampo
+
+logger = logging.getLogger(__name__)
+
+MODO_TRANSACIONAL = 'transacional'  # O log é gravado na mesma transação da alteração auditada
+MODO_ASSINCRONO = 'assincrono'      # O log é gravado em lote por uma thread em segundo plano
+
+# Políticas aplicadas quando a fila do modo assíncrono está cheia
+POLITICA_BLOQUEAR = 'bloquear'    # Aguarda espaço na fila e, esgotado o tempo, grava em transação própria
+POLITICA_SINCRONO = 'sincrono'    # Grava imediatamente na transação da requisição
+POLITICA_DESCARTAR = 'descartar'  # Descarta o log e registra um aviso
+
+
+def criar_log(dados):
+    """ Monta o Log a partir do dicionário de registrar_log, com os campos alterados (chave CAMPOS) """
+    dados = dict(dados)
+    campos = dados.pop('CAMPOS', ())
+    log = Log(**dados)
+    log.campos = [LogCampo(CAMPO=campo[:100]) for campo in dict.fromkeys(campos)]
+    return log
+
+
+class GravadorAuditoria:
+    """
+    Pipeline de gravação dos registros de TBLOG.
+
+    No modo transacional, cada log é adicionado à sessão da requisição e confirmado
+    pelo mesmo commit da alteração: um único round trip e log atômico com a mudança.
+
+    No modo assíncrono, os logs ficam pendentes na sessão até o commit da alteração
+    (descartados em caso de rollback) e então seguem para uma fila limitada, consumida
+    por uma thread que os insere em lotes. A fila é esvaziada no encerramento do processo.
+    """
+
+    def __init__(self):
+        self.app = None
+        self.modo = MODO_TRANSACIONAL
+        self.fila = None
+        self.thread = None
+        self.parar = threading.Event()
+        self.descartados = 0
+
+    def init_app(self, app):
+        self.app = app
+        self.modo = app.config['AUDITORIA_MODO']
+        self.politica = app.config['AUDITORIA_POLITICA_FILA_CHEIA']
+        self.tamanho_lote = app.config['AUDITORIA_TAMANHO_LOTE']
+        self.intervalo = app.config['AUDITORIA_INTERVALO_GRAVACAO']
+        self.timeout_fila = app.config['AUDITORIA_TIMEOUT_FILA']
+        app.extensions['auditoria'] = self
+
+        if self.modo == MODO_ASSINCRONO and self.thread is None:
+            self.fila = queue.Queue(maxsize=app.config['AUDITORIA_TAMANHO_FILA'])
+            self.thread = threading.Thread(target=self._consumir, name='gravador-auditoria', daemon=True)
+            self.thread.start()
+            atexit.register(self.encerrar)
+
+    def registrar(self, dados):
+        """
+        Registra um log (dicionário com as colunas de TBLOG).
+        Em ambos os modos nada é confirmado aqui: o log acompanha o commit da sessão atual.
+        """
+        if self.modo == MODO_ASSINCRONO and self.thread is not None:
+            db.session.info.setdefault('auditoria_pendente', []).append(dados)
+        else:
+            db.session.add(criar_log(dados))
+
+    def _enfileirar(self, pendentes):
+        """
+        Envia à fila os logs cujas alterações já foram confirmadas, aplicando a política de fila cheia.
+        Na política bloquear, AUDITORIA_TIMEOUT_FILA é o prazo do conjunto de pendentes, não de cada log;
+        ao encontrar a fila cheia (bloquear ou sincrono), os logs restantes são gravados de uma vez.
+        """
+        prazo = time.monotonic() + self.timeout_fila
+        for posicao, dados in enumerate(pendentes):
+            try:
+                if self.politica == POLITICA_BLOQUEAR:
+                    self.fila.put(dados, timeout=max(prazo - time.monotonic(), 0))
+                else:
+                    self.fila.put_nowait(dados)
+            except queue.Full:
+                if self.politica == POLITICA_DESCARTAR:
+                    self.descartados += 1
+                    logger.warning('Fila de auditoria cheia; log descartado: %s', dados)
+                else:
+                    # Sem espaço na fila: grava os logs restantes diretamente, em uma transação própria
+                    self._gravar(pendentes[posicao:])
+                    return
+
+    def _consumir(self):
+        """ Laço da thread de gravação: agrupa os logs da fila em lotes e os insere """
+        while not (self.parar.is_set() and self.fila.empty()):
+            try:
+                lote = [self.fila.get(timeout=self.intervalo)]
+            except queue.Empty:
+                continue
+
+            while len(lote) < self.tamanho_lote:
+                try:
+                    lote.append(self.fila.get_nowait())
+                except queue.Empty:
+                    break
+
+            self._gravar(lote)
+
+    def _gravar(self, lote):
+        """
+        Insere um lote de logs e seus campos alterados com um único commit.
+        O SQLAlchemy agrupa os INSERTs do lote (insertmanyvalues, com OUTPUT para obter os IDs
+        usados em TBLOG_CAMPO), mantendo poucos round trips por lote.
+        """
+        with self.app.app_context():
+            try:
+                db.session.add_all([criar_log(dados) for dados in lote])
+                db.session.commit()
+            except Exception:
+                db.session.rollback()
+                logger.exception('Erro ao gravar lote de %d logs de auditoria', len(lote))
+
+    def encerrar(self, timeout=10):
+        """ Interrompe a thread de gravação após esvaziar a fila (chamado no encerramento do processo) """
+        if self.thread is None:
+            return
+        self.parar.set()
+        self.thread.join(timeout)
+        self.thread = None
+
+
+gravador_auditoria = GravadorAuditoria()
+
+
+@event.listens_for(Session, 'after_commit')
+def _enviar_logs_pendentes(session):
+    """ Após o commit da alteração, libera os logs pendentes para a thread de gravação """
+    pendentes = session.info.pop('auditoria_pendente', None)
+    if pendentes:
+        gravador_auditoria._enfileirar(pendentes)
+
+
+@event.listens_for(Session, 'after_rollback')
+def _descartar_logs_pendentes(session):
+    """ Se a alteração foi desfeita, os logs correspondentes também são descartados """
+    session.info.pop('auditoria_pendente', None)
@@ -0,0 +1,126 @@
+import csv
+import importlib
+import io
+from app.extensions import db
+from app.colunar import escrever_parquet, MIMETYPE_PARQUET
+from app.logs.models import Log
+from app.autenticacao.models import User
+
+# Colunas exportadas, na ordem em que aparecem nos arquivos
+COLUNAS = ["ID_LOG", "USUARIO", "ACAO", "TABELA", "ID_REGISTRO", "DADOS_ANTERIORES", "DADOS_NOVOS", "DATA_HORA"]
+
+# Tipos das colunas no Parquet (os payloads JSON são mantidos como texto)
+TIPOS_PARQUET = ["inteiro", "texto", "texto", "texto", "inteiro", "texto", "texto", "data_hora"]
+
+LINHAS_POR_BLOCO_CSV = 500  # Quantidade de linhas acumuladas antes de enviar um bloco do CSV ao cliente
+
+
+class Exportador:
+    """
+    Formato de exportação registrado em EXPORTADORES: mimetype, extensão do arquivo e o motor
+    que grava as linhas, indicado como 'módulo:função'. O módulo do motor (e suas dependências,
+    como xlsxwriter, reportlab ou pyarrow) só é importado na primeira exportação do formato,
+    de modo que os processos da aplicação não pagam esse custo sem nunca exportar.
+    """
+
+    def __init__(self, mimetype, extensao, motor, data_nativa=False):
+        self.mimetype = mimetype
+        self.extensao = extensao
+        self.motor = motor
+        self.data_nativa = data_nativa  # Recebe DATA_HORA como datetime, sem formatação em texto
+        self._escrever = None
+
+    def escrever(self, linhas, destino):
+        """
+        Grava as linhas (na ordem de COLUNAS) no arquivo binário destino e retorna (mimetype, extensão)
+        do arquivo gerado: os do formato ou, se o motor mudar o contêiner (PDF grande dividido em ZIP), os dele.
+        """
+        if self._escrever is None:
+            modulo, funcao = self.motor.split(':')
+            self._escrever = getattr(importlib.import_module(modulo), funcao)
+        return self._escrever(linhas, destino) or (self.mimetype, self.extensao)
+
+
+# Formatos de exportação disponíveis
+EXPORTADORES = {
+    'csv': Exportador('text/csv', 'csv', 'app.logs.exportacao:escrever_csv'),
+    'excel': Exportador('application/vnd.openxmlformats-officedocument.spreadsheetml.sheet', 'xlsx',
+                        'app.logs.exportacao_excel:escrever_xlsx'),
+    'pdf': Exportador('application/pdf', 'pdf', 'app.logs.exportacao_pdf:escrever_pdf'),
+    'parquet': Exportador(MIMETYPE_PARQUET, 'parquet', 'app.logs.exportacao:escrever_parquet_logs', data_nativa=True),
+}
+
+
+def consulta_exportacao():
+    """
+    Monta a query base da exportação, trazendo apenas as colunas necessárias
+    e o nome do usuário na mesma consulta (sem carregar objetos ORM).
+    Os filtros da listagem devem ser aplicados sobre ela antes de chamar iterar_linhas.
+    """
+    return db.session.query(
+        Log.ID_LOG,
+        User.NOME_USUARIO.label('USUARIO'),
+        Log.ACAO,
+        Log.TABELA,
+        Log.ID_REGISTRO,
+        Log.DADOS_ANTERIORES,
+        Log.DADOS_NOVOS,
+        Log.DATA_HORA
+    ).join(User, Log.ID_USUARIO == User.ID_USUARIO)
+
+
+def iterar_linhas(query, tamanho_lote, formatar_data=True):
+    """
+    Percorre a query em lotes (yield_per), devolvendo uma lista de valores por log,
+    na ordem de COLUNAS. Apenas um lote fica em memória por vez.
+    Com formatar_data=False, DATA_HORA é mantida como datetime (formatos tipados, como Parquet).
+    """
+    query = query.order_by(Log.DATA_HORA.desc(), Log.ID_LOG.desc()).yield_per(tamanho_lote)
+    for linha in query:
+        yield [
+            linha.ID_LOG,
+            linha.USUARIO,
+            linha.ACAO,
+            linha.TABELA,
+            linha.ID_REGISTRO,
+            linha.DADOS_ANTERIORES,  # O JSON armazenado é exportado como texto, sem ser decodificado
+            linha.DADOS_NOVOS,
+            linha.DATA_HORA.strftime('%d/%m/%Y %H:%M:%S') if linha.DATA_HORA and formatar_data else linha.DATA_HORA
+        ]
+
+
+def gerar_csv(linhas):
+    """
+    Gera o CSV (separado por ';') em blocos de texto, para ser enviado como resposta em streaming.
+    """
+    buffer = io.StringIO()
+    escritor = csv.writer(buffer, delimiter=';')
+    escritor.writerow(COLUNAS)
+
+    for numero, linha in enumerate(linhas, start=1):
+        escritor.writerow(linha)
+        if numero % LINHAS_POR_BLOCO_CSV == 0:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate(0)
+
+    yield buffer.getvalue()
+
+
+def escrever_csv(linhas, destino):
+    """ Grava o CSV em um arquivo binário (exportações em segundo plano) """
+    for bloco in gerar_csv(linhas):
+        destino.write(bloco.encode('utf-8'))
+
+
+def escrever_parquet_logs(linhas, destino):
+    """ Grava os logs em Parquet, com os tipos de TIPOS_PARQUET (requer pyarrow; ver app/colunar.py) """
+    escrever_parquet(linhas, destino, list(zip(COLUNAS, TIPOS_PARQUET)))
+
+
+def obter_exportador(formato):
+    """ Retorna o Exportador do formato ou lança ValueError se o formato não for suportado """
+    try:
+        return EXPORTADORES[formato]
+    except KeyError:
+        raise ValueError(f"Formato não suportado: {formato}")
@@ -0,0 +1,32 @@
+import xlsxwriter
+from app.logs.exportacao import COLUNAS
+
+LIMITE_LINHAS_XLSX = 1048576  # Limite de linhas de uma planilha do Excel (incluindo o cabeçalho)
+LIMITE_CELULA_XLSX = 32767  # Tamanho máximo de texto aceito em uma célula do Excel
+
+
+def escrever_xlsx(linhas, destino):
+    """
+    Escreve as linhas em uma planilha XLSX no arquivo (ou objeto de arquivo) destino.
+    Usa o modo constant_memory do xlsxwriter, que grava cada linha em disco assim que
+    ela é concluída; quando o limite de linhas do Excel é atingido, uma nova aba é criada.
+    """
+    workbook = xlsxwriter.Workbook(destino, {'constant_memory': True})
+    numero_aba = 1
+    worksheet = workbook.add_worksheet("Logs")
+    worksheet.write_row(0, 0, COLUNAS)
+    linha_atual = 1
+
+    for linha in linhas:
+        if linha_atual >= LIMITE_LINHAS_XLSX:
+            numero_aba += 1
+            worksheet = workbook.add_worksheet(f"Logs ({numero_aba})")
+            worksheet.write_row(0, 0, COLUNAS)
+            linha_atual = 1
+
+        # Textos acima do limite do Excel seriam descartados pelo xlsxwriter; são truncados
+        valores = [valor[:LIMITE_CELULA_XLSX] if isinstance(valor, str) else valor for valor in linha]
+        worksheet.write_row(linha_atual, 0, valores)
+        linha_atual += 1
+
+    workbook.close()
@@ -0,0 +1,127 @@
+import shutil
+import tempfile
+import zipfile
+from itertools import chain, islice
+from flask import current_app
+from reportlab.pdfgen import canvas
+from reportlab.lib.pagesizes import A4
+from reportlab.lib.utils import simpleSplit
+
+# Layout do PDF (unidades em pontos)
+PDF_MARGEM = 36
+PDF_FONTE = "Helvetica"
+PDF_FONTE_NEGRITO = "Helvetica-Bold"
+PDF_TAMANHO_FONTE = 8
+PDF_ALTURA_LINHA = 10
+
+
+def _linhas_payload(texto, largura, max_linhas):
+    """
+    Quebra o JSON armazenado em linhas que cabem na largura da página (simpleSplit),
+    limitando a quantidade de linhas por campo. O texto é cortado antes da quebra
+    para que payloads muito grandes não custem tempo proporcional ao seu tamanho.
+    """
+    if not texto:
+        return ["N/A"]
+
+    limite_caracteres = max_linhas * 200
+    cortado = len(texto) > limite_caracteres
+    linhas = simpleSplit(texto[:limite_caracteres], PDF_FONTE, PDF_TAMANHO_FONTE, largura)
+
+    if cortado or len(linhas) > max_linhas:
+        linhas = linhas[:max_linhas]
+        linhas[-1] = linhas[-1][:-3] + "..."
+    return linhas
+
+
+def _escrever_documento(linhas, destino, max_linhas_payload, titulo):
+    """
+    Gera um PDF com os logs no arquivo destino. Cada log ocupa um bloco com seus dados e os payloads
+    DADOS_ANTERIORES/DADOS_NOVOS quebrados em linhas; as páginas são fechadas (showPage) à medida que enchem.
+    O canvas do reportlab mantém todas as páginas até o save(), por isso escrever_pdf limita os logs por documento.
+    """
+    pdf = canvas.Canvas(destino, pagesize=A4, pageCompression=1)
+    pdf.setTitle(titulo)
+    largura_pagina, altura_pagina = A4
+    largura_texto = largura_pagina - 2 * PDF_MARGEM
+    recuo = 12  # Recuo das linhas dos payloads em relação ao cabeçalho do log
+
+    def nova_pagina():
+        pdf.setFont(PDF_FONTE_NEGRITO, 12)
+        pdf.drawString(PDF_MARGEM, altura_pagina - PDF_MARGEM, titulo)
+        pdf.drawRightString(largura_pagina - PDF_MARGEM, altura_pagina - PDF_MARGEM, f"Página {pdf.getPageNumber()}")
+        return altura_pagina - PDF_MARGEM - 2 * PDF_ALTURA_LINHA
+
+    y = nova_pagina()
+    for id_log, usuario, acao, tabela, id_registro, anteriores, novos, data_hora in linhas:
+        cabecalho = f"#{id_log}  {data_hora or ''}  |  {usuario}  |  {acao}  |  {tabela}  |  Registro {id_registro}"
+        blocos = [
+            ("Dados anteriores:", _linhas_payload(anteriores, largura_texto - recuo, max_linhas_payload)),
+            ("Dados novos:", _linhas_payload(novos, largura_texto - recuo, max_linhas_payload)),
+        ]
+        altura_bloco = PDF_ALTURA_LINHA * (1 + sum(1 + len(texto) for _, texto in blocos)) + PDF_ALTURA_LINHA / 2
+
+        # Fecha a página atual se o bloco do log não couber no espaço restante
+        if y - altura_bloco < PDF_MARGEM:
+            pdf.showPage()
+            y = nova_pagina()
+
+        pdf.setFont(PDF_FONTE_NEGRITO, PDF_TAMANHO_FONTE)
+        pdf.drawString(PDF_MARGEM, y, cabecalho)
+        y -= PDF_ALTURA_LINHA
+
+        pdf.setFont(PDF_FONTE, PDF_TAMANHO_FONTE)
+        for titulo_bloco, texto in blocos:
+            pdf.drawString(PDF_MARGEM, y, titulo_bloco)
+            y -= PDF_ALTURA_LINHA
+            for linha in texto:
+                pdf.drawString(PDF_MARGEM + recuo, y, linha)
+                y -= PDF_ALTURA_LINHA
+
+        y -= PDF_ALTURA_LINHA / 2
+
+    pdf.showPage()
+    pdf.save()
+
+
+def escrever_pdf(linhas, destino, max_linhas_payload=None, max_logs_arquivo=None):
+    """
+    Gera o PDF dos logs no arquivo (ou objeto de arquivo) destino.
+    Cada documento recebe no máximo max_logs_arquivo logs (padrão: EXPORTACAO_PDF_MAX_LOGS_ARQUIVO), gravado
+    em arquivo temporário; se houver mais logs, as partes são reunidas em um ZIP (logs_001.pdf, logs_002.pdf...).
+    Assim a memória usada não depende da quantidade de logs exportados.
+    max_linhas_payload: linhas exibidas por payload (padrão: EXPORTACAO_PDF_MAX_LINHAS_DADOS).
+    Retorna (mimetype, extensão) quando o resultado é um ZIP; None para um único PDF.
+    """
+    if max_linhas_payload is None:
+        max_linhas_payload = current_app.config['EXPORTACAO_PDF_MAX_LINHAS_DADOS']
+    if max_logs_arquivo is None:
+        max_logs_arquivo = current_app.config['EXPORTACAO_PDF_MAX_LOGS_ARQUIVO']
+
+    linhas = iter(linhas)
+    primeira = next(linhas, None)
+    arquivo_zip = None
+    parte = 1
+    try:
+        while True:
+            inicio = [primeira] if primeira is not None else []  # Sem logs: um PDF apenas com o cabeçalho
+            with tempfile.TemporaryFile() as temporario:
+                _escrever_documento(chain(inicio, islice(linhas, max_logs_arquivo - 1)), temporario,
+                                    max_linhas_payload, "Logs do Sistema")
+                primeira = next(linhas, None)
+                temporario.seek(0)
+
+                if arquivo_zip is None and primeira is None:
+                    shutil.copyfileobj(temporario, destino)  # Todos os logs couberam em um único documento
+                    return None
+                if arquivo_zip is None:
+                    arquivo_zip = zipfile.ZipFile(destino, 'w', zipfile.ZIP_STORED)  # As páginas já são compactadas
+                with arquivo_zip.open(f'logs_{parte:03d}.pdf', 'w', force_zip64=True) as saida:
+                    shutil.copyfileobj(temporario, saida)
+
+            if primeira is None:
+                return 'application/zip', 'zip'
+            parte += 1
+    finally:
+        if arquivo_zip is not None:
+            arquivo_zip.close()
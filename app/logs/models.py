@@ -3,6 +3,12 @@ from datetime import datetime
 
 class Log(db.Model):
     __tablename__ = 'TBLOG'
+    __table_args__ = (
+        # Índice usado pela paginação keyset da listagem (ver scriptBD.sql)
+        db.Index('IX_TBLOG_DATA_HORA_ID_LOG', 'DATA_HORA', 'ID_LOG'),
+        # Índice do histórico de um registro (TABELA + ID_REGISTRO), em ordem cronológica
+        db.Index('IX_TBLOG_TABELA_ID_REGISTRO', 'TABELA', 'ID_REGISTRO', 'DATA_HORA'),
+    )
     
     ID_LOG = db.Column(db.Integer, primary_key=True)
     ID_USUARIO = db.Column(db.Integer, db.ForeignKey('TBUSUARIO.ID_USUARIO'), nullable=False)
@@ -11,9 +17,42 @@ class Log(db.Model):
     ID_REGISTRO = db.Column(db.Integer, nullable=False)
     DADOS_ANTERIORES = db.Column(db.Text)
     DADOS_NOVOS = db.Column(db.Text)
+    DADOS_ALTERACOES = db.Column(db.Text)  # Diff por campo {campo: [anterior, novo]}, calculado em registrar_log
     DATA_HORA = db.Column(db.DateTime, default=datetime.utcnow)
     
     usuario = db.relationship('User', backref='logs')
+    campos = db.relationship('LogCampo', cascade='all, delete-orphan')
+
+
+class LogCampo(db.Model):
+    """
+    Campos alterados por cada log, extraídos de DADOS_ALTERACOES na gravação.
+    A chave (CAMPO, ID_LOG) permite localizar por índice os logs em que um campo mudou.
+    """
+    __tablename__ = 'TBLOG_CAMPO'
+
+    CAMPO = db.Column(db.String(100), primary_key=True)
+    ID_LOG = db.Column(db.Integer, db.ForeignKey('TBLOG.ID_LOG'), primary_key=True)
+
+
+class LogArquivo(db.Model):
+    """
+    Catálogo dos logs arquivados (app/logs/arquivamento.py): uma linha por lote gravado em um
+    arquivo diário, com a faixa de ID_LOG, para localizar um log arquivado sem abrir todos os arquivos.
+    """
+    __tablename__ = 'TBLOG_ARQUIVO'
+    __table_args__ = (
+        db.Index('IX_TBLOG_ARQUIVO_ID_LOG', 'ID_LOG_INICIAL', 'ID_LOG_FINAL'),
+        db.Index('IX_TBLOG_ARQUIVO_DATA', 'DATA'),
+    )
+
+    ID_ARQUIVO = db.Column(db.Integer, primary_key=True, autoincrement=True)
+    DATA = db.Column(db.Date, nullable=False)  # Dia dos logs contidos no arquivo
+    ARQUIVO = db.Column(db.String(255), nullable=False)  # Caminho relativo ao diretório de arquivamento
+    ID_LOG_INICIAL = db.Column(db.Integer, nullable=False)
+    ID_LOG_FINAL = db.Column(db.Integer, nullable=False)
+    QUANTIDADE = db.Column(db.Integer, nullable=False)
+    DATA_ARQUIVAMENTO = db.Column(db.DateTime, nullable=False)
 
 # Importação no final para evitar circular import
 from app.autenticacao.models import User
@@ -1,44 +1,79 @@
-from flask import render_template, request, jsonify, Response, send_file
-from flask_login import login_required
+from flask import render_template, request, jsonify, Response, send_file, current_app, stream_with_context, abort
+from flask_login import login_required, current_user
+from sqlalchemy import and_, or_
+from sqlalchemy.orm import joinedload
 from app.extensions import db
+from app.diagnostico import limite_queries
 from app.logs import bp
-from app.logs.models import Log
+from app.logs.models import Log, LogCampo
+from app.logs.auditoria import gravador_auditoria
+from app.logs.arquivamento import arquivar_logs, buscar_arquivado, iterar_linhas_arquivadas
+from app.logs.exportacao import consulta_exportacao, iterar_linhas, gerar_csv, obter_exportador, EXPORTADORES
+from app.colunar import ParquetIndisponivel
+from app.tarefas.gerenciador import gerenciador_tarefas, FilaTarefasCheia
+from app.tarefas.routes import resposta_tarefa
 from app.autenticacao.models import User
 from datetime import datetime
-from io import BytesIO
-from reportlab.pdfgen import canvas
-from reportlab.lib.pagesizes import A4
-from reportlab.lib.utils import simpleSplit
+from itertools import chain
+import click
+from tempfile import SpooledTemporaryFile
+import base64
 import json
-import pandas as pd
 
-@bp.route('/logs', methods=['GET'])
-@login_required
-def listar_logs():
+# Versão do formato da resposta de detalhes_log (2: ALTERACOES no lugar de DADOS_ANTERIORES/DADOS_NOVOS).
+# Deve ser incrementada sempre que os campos retornados mudarem: faz parte do ETag e da URL usada pelo
+# static/js/logs.js, para que detalhes guardados pelo navegador (LOGS_DETALHES_MAX_AGE) não sejam reaproveitados
+FORMATO_DETALHES = 2
+
+def _consulta_logs():
     """
-    Exibe a página de logs com filtros opcionais.
-    Permite filtrar por usuário, ação realizada, e intervalo de datas.
+    Query base de logs que já carrega o nome do usuário no mesmo SELECT (JOIN),
+    evitando uma consulta extra a TBUSUARIO para cada log exibido (N+1).
     """
+    return db.session.query(Log).options(
+        joinedload(Log.usuario).load_only(User.ID_USUARIO, User.NOME_USUARIO)
+    )
 
-    # Obtendo parâmetros de filtragem da requisição
-    usuario_id = request.args.get('usuario_id')
-    acao = request.args.get('acao')
-    data_inicio = request.args.get('data_inicio')
-    data_fim = request.args.get('data_fim')
 
-    # Construindo a query base
-    query = db.session.query(Log)
+def _filtrar_logs(query, args):
+    """
+    Aplica à query os filtros de usuário, ação, tabela, registro, campo alterado e intervalo
+    de datas informados em args. Todos são comparações exatas, atendidas pelos índices de TBLOG
+    (TABELA + ID_REGISTRO) e de TBLOG_CAMPO (CAMPO).
+    Usado pela listagem, pela paginação via JSON e pelas exportações.
+    Lança ValueError com a mensagem de erro caso algum parâmetro seja inválido.
+    """
+    usuario_id = args.get('usuario_id')
+    acao = args.get('acao')
+    tabela = (args.get('tabela') or '').strip()
+    id_registro = (args.get('id_registro') or '').strip()
+    campo = (args.get('campo') or '').strip()
+    data_inicio = args.get('data_inicio')
+    data_fim = args.get('data_fim')
 
     # Aplicando filtros conforme os parâmetros fornecidos
     if usuario_id:
         try:
             usuario_id = int(usuario_id)  # Converte para inteiro para evitar erros de comparação
-            query = query.filter(Log.ID_USUARIO == usuario_id)
         except ValueError:
-            return jsonify({"erro": "ID de usuário inválido"}), 400
+            raise ValueError("ID de usuário inválido")
+        query = query.filter(Log.ID_USUARIO == usuario_id)
 
     if acao:
-        query = query.filter(Log.ACAO.ilike(f"%{acao}%"))  # Permite buscas parciais
+        query = query.filter(Log.ACAO == acao.upper())
+
+    if tabela:
+        query = query.filter(Log.TABELA == tabela.upper())
+
+    if id_registro:
+        try:
+            query = query.filter(Log.ID_REGISTRO == int(id_registro))
+        except ValueError:
+            raise ValueError("ID de registro inválido")
+
+    if campo:
+        # EXISTS sobre a chave (CAMPO, ID_LOG) de TBLOG_CAMPO
+        query = query.filter(Log.campos.any(LogCampo.CAMPO == campo.upper()))
 
     # Tratamento e conversão das datas
     formato_data = "%Y-%m-%d"
@@ -52,55 +87,198 @@ def listar_logs():
             data_fim = datetime.combine(data_fim, datetime.max.time())  # Final do dia
             query = query.filter(Log.DATA_HORA <= data_fim)
     except ValueError:
-        return jsonify({"erro": "Formato de data inválido. Use AAAA-MM-DD."}), 400
+        raise ValueError("Formato de data inválido. Use AAAA-MM-DD.")
 
-    # Obtém os logs filtrados, ordenados pela data mais recente primeiro
-    logs = query.order_by(Log.DATA_HORA.desc()).all()
-    usuarios = User.query.all()  # Obtém a lista de usuários para exibição no filtro
+    return query
 
-    return render_template('logs/index.html', logs=logs, usuarios=usuarios)
 
+def _codificar_cursor(log):
+    """ Gera o cursor opaco (DATA_HORA + ID_LOG) que aponta para o último log da página """
+    valor = f"{log.DATA_HORA.isoformat()}|{log.ID_LOG}"
+    return base64.urlsafe_b64encode(valor.encode('utf-8')).decode('ascii')
 
-@bp.route('/detalhes/<int:id>', methods=['GET'])
+
+def _decodificar_cursor(cursor):
+    """ Converte o cursor recebido de volta em (DATA_HORA, ID_LOG). Lança ValueError se inválido """
+    try:
+        valor = base64.urlsafe_b64decode(cursor.encode('ascii')).decode('utf-8')
+        data_hora, id_log = valor.split('|')
+        return datetime.fromisoformat(data_hora), int(id_log)
+    except (ValueError, UnicodeError):
+        raise ValueError("Cursor de paginação inválido")
+
+
+def _tamanho_pagina(args):
+    """ Lê o tamanho da página dos parâmetros, respeitando o padrão e o máximo configurados """
+    limite = args.get('limite', type=int) or current_app.config['LOGS_POR_PAGINA']
+    return max(1, min(limite, current_app.config['LOGS_POR_PAGINA_MAX']))
+
+
+def _paginar_logs(query, cursor, limite):
+    """
+    Pagina a query por keyset sobre (DATA_HORA, ID_LOG), em ordem decrescente.
+    Em vez de OFFSET, a próxima página começa logo após o último log retornado,
+    o que permite ao SQL Server usar o índice IX_TBLOG_DATA_HORA_ID_LOG sem varrer a tabela.
+    Returns:
+        tuple: (lista de logs da página, cursor da próxima página ou None)
+    """
+    if cursor:
+        data_hora, id_log = _decodificar_cursor(cursor)
+        query = query.filter(or_(
+            Log.DATA_HORA < data_hora,
+            and_(Log.DATA_HORA == data_hora, Log.ID_LOG < id_log)
+        ))
+
+    # Busca um registro a mais para saber se existe próxima página
+    logs = query.order_by(Log.DATA_HORA.desc(), Log.ID_LOG.desc()).limit(limite + 1).all()
+
+    proximo_cursor = None
+    if len(logs) > limite:
+        logs = logs[:limite]
+        proximo_cursor = _codificar_cursor(logs[-1])
+
+    return logs, proximo_cursor
+
+
+@bp.route('/logs', methods=['GET'])
+@limite_queries(3)
 @login_required
-def detalhes_log(id):
+def listar_logs():
     """
-    Retorna os detalhes do log no formato JSON para exibição no modal.
+    Exibe a primeira página de logs com filtros opcionais.
+    Permite filtrar por usuário, ação realizada, e intervalo de datas.
+    As páginas seguintes são carregadas sob demanda pela rota pagina_logs.
     """
+    try:
+        query = _filtrar_logs(_consulta_logs(), request.args)
+        logs, proximo_cursor = _paginar_logs(query, None, _tamanho_pagina(request.args))
+    except ValueError as e:
+        return jsonify({"erro": str(e)}), 400
 
-    log = Log.query.get_or_404(id)  # Busca o log pelo ID ou retorna erro 404 se não encontrado
-    
-    # Converte JSON armazenado como string para um dicionário Python
-    dados_anteriores = log.DADOS_ANTERIORES
-    dados_novos = log.DADOS_NOVOS
-    
+    # Apenas ID e nome dos usuários, suficientes para o filtro (evita carregar objetos User completos)
+    usuarios = db.session.query(User.ID_USUARIO, User.NOME_USUARIO).order_by(User.NOME_USUARIO).all()
+
+    return render_template('logs/index.html', logs=logs, usuarios=usuarios,
+                           proximo_cursor=proximo_cursor, filtros=request.args,
+                           formato_detalhes=FORMATO_DETALHES)
+
+
+@bp.route('/pagina', methods=['GET'])
+@limite_queries(2)
+@login_required
+def pagina_logs():
+    """
+    Retorna, em JSON, a página de logs seguinte ao cursor informado.
+    Utilizada pela rolagem infinita da página de logs (static/js/logs.js).
+    """
     try:
-        dados_anteriores = json.loads(log.DADOS_ANTERIORES) if log.DADOS_ANTERIORES else {}
-    except json.JSONDecodeError:
-        pass  # Mantém como está caso não seja um JSON válido
+        query = _filtrar_logs(_consulta_logs(), request.args)
+        logs, proximo_cursor = _paginar_logs(query, request.args.get('cursor'), _tamanho_pagina(request.args))
+    except ValueError as e:
+        return jsonify({"erro": str(e)}), 400
 
+    return jsonify({
+        "logs": [{
+            "ID_LOG": log.ID_LOG,
+            "USUARIO": log.usuario.NOME_USUARIO,
+            "ACAO": log.ACAO,
+            "TABELA": log.TABELA,
+            "ID_REGISTRO": log.ID_REGISTRO,
+            "DATA_HORA": log.DATA_HORA.strftime('%d/%m/%Y %H:%M:%S')
+        } for log in logs],
+        "proximo_cursor": proximo_cursor
+    })
+
+
+def _carregar_json(texto):
+    """ Converte o JSON armazenado em DADOS_ANTERIORES/DADOS_NOVOS; texto inválido é mantido como está """
+    if not texto:
+        return {}
     try:
-        dados_novos = json.loads(log.DADOS_NOVOS) if log.DADOS_NOVOS else {}
+        return json.loads(texto)
     except json.JSONDecodeError:
-        pass  # Mantém como está caso não seja um JSON válido
+        return texto
+
+
+def calcular_alteracoes(dados_anteriores, dados_novos):
+    """
+    Calcula o diff por campo entre os dados anteriores e os novos: apenas os campos alterados,
+    no formato {campo: [valor anterior, valor novo]}. Campos incluídos ou removidos
+    aparecem com None do lado ausente.
+    """
+    dados_anteriores = dados_anteriores or {}
+    dados_novos = dados_novos or {}
+    if not isinstance(dados_anteriores, dict) or not isinstance(dados_novos, dict):
+        return {'DADOS': [dados_anteriores, dados_novos]} if dados_anteriores != dados_novos else {}
 
-    dados = {
-        "ID_LOG": log.ID_LOG,
-        "USUARIO": log.usuario.NOME_USUARIO,
-        "ACAO": log.ACAO,
-        "TABELA": log.TABELA,
-        "ID_REGISTRO": log.ID_REGISTRO,
-        "DADOS_ANTERIORES": json.dumps(dados_anteriores, indent=4, ensure_ascii=False),  # Enviar como JSON formatado
-        "DADOS_NOVOS": json.dumps(dados_novos, indent=4, ensure_ascii=False),
-        "DATA_HORA": log.DATA_HORA.strftime('%d/%m/%Y %H:%M:%S')
-    }
+    alteracoes = {}
+    for campo in list(dados_anteriores) + [campo for campo in dados_novos if campo not in dados_anteriores]:
+        anterior, novo = dados_anteriores.get(campo), dados_novos.get(campo)
+        if anterior != novo:
+            alteracoes[campo] = [anterior, novo]
+    return alteracoes
 
-    return jsonify(dados)
+
+@bp.route('/detalhes/<int:id>', methods=['GET'])
+@limite_queries(3)
+@login_required
+def detalhes_log(id):
+    """
+    Retorna os detalhes do log no formato JSON para exibição no modal, com apenas os campos
+    alterados (ALTERACOES), calculados na gravação do log. Logs já arquivados são lidos do arquivo.
+    Logs não são alterados após gravados: o ETag depende só do ID e de FORMATO_DETALHES, e uma
+    revalidação (If-None-Match) é respondida com 304 sem consultar o banco.
+    """
+    etag = f'log-{id}-{FORMATO_DETALHES}'
+    if etag in request.if_none_match:
+        resposta = current_app.response_class(status=304)
+    else:
+        # Busca o log pelo ID, já com o nome do usuário; se não estiver mais em TBLOG, procura nos arquivos
+        log = _consulta_logs().filter(Log.ID_LOG == id).first()
+        if log is not None:
+            registro = {
+                'ID_LOG': log.ID_LOG, 'USUARIO': log.usuario.NOME_USUARIO, 'ACAO': log.ACAO,
+                'TABELA': log.TABELA, 'ID_REGISTRO': log.ID_REGISTRO, 'DATA_HORA': log.DATA_HORA,
+                'DADOS_ANTERIORES': log.DADOS_ANTERIORES, 'DADOS_NOVOS': log.DADOS_NOVOS,
+                'DADOS_ALTERACOES': log.DADOS_ALTERACOES
+            }
+        else:
+            registro = buscar_arquivado(id)
+            if registro is None:
+                abort(404)
+            registro['DATA_HORA'] = datetime.fromisoformat(registro['DATA_HORA'])
+
+        if registro['DADOS_ALTERACOES'] is not None:
+            alteracoes = json.loads(registro['DADOS_ALTERACOES'])
+        else:
+            # Logs gravados antes da coluna DADOS_ALTERACOES
+            alteracoes = calcular_alteracoes(_carregar_json(registro['DADOS_ANTERIORES']),
+                                             _carregar_json(registro['DADOS_NOVOS']))
+
+        resposta = jsonify({
+            "ID_LOG": registro['ID_LOG'],
+            "USUARIO": registro['USUARIO'],
+            "ACAO": registro['ACAO'],
+            "TABELA": registro['TABELA'],
+            "ID_REGISTRO": registro['ID_REGISTRO'],
+            "ALTERACOES": alteracoes,
+            "DATA_HORA": registro['DATA_HORA'].strftime('%d/%m/%Y %H:%M:%S')
+        })
+
+    resposta.set_etag(etag)
+    resposta.cache_control.private = True
+    resposta.cache_control.max_age = current_app.config['LOGS_DETALHES_MAX_AGE']
+    return resposta
 
 
 def registrar_log(usuario_id, acao, tabela, id_registro, dados_anteriores=None, dados_novos=None):
     """
     Registra uma ação no log do sistema.
+    O diff por campo (DADOS_ALTERACOES) é calculado aqui, uma única vez, para que a consulta
+    dos detalhes não precise comparar os dois payloads a cada exibição.
+    O log não é confirmado aqui: ele acompanha o próximo commit da sessão, portanto deve ser
+    chamado antes do db.session.commit() da alteração (após um flush, se o ID for necessário).
+    A gravação segue o modo configurado em AUDITORIA_MODO (ver app/logs/auditoria.py).
     
     Parâmetros:
         usuario_id (int): ID do usuário que realizou a ação.
@@ -114,60 +292,118 @@ def registrar_log(usuario_id, acao, tabela, id_registro, dados_anteriores=None,
     # Converte os dados anteriores e novos para JSON se não forem nulos
     dados_anteriores_json = json.dumps(dados_anteriores, ensure_ascii=False) if dados_anteriores else None
     dados_novos_json = json.dumps(dados_novos, ensure_ascii=False) if dados_novos else None
+    alteracoes = calcular_alteracoes(dados_anteriores, dados_novos)
 
-    # Cria o objeto de log
-    novo_log = Log(
-        ID_USUARIO=usuario_id,
-        ACAO=acao,
-        TABELA=tabela,
-        ID_REGISTRO=id_registro,
-        DADOS_ANTERIORES=dados_anteriores_json,
-        DADOS_NOVOS=dados_novos_json,
-        DATA_HORA=datetime.now()
-    )
-
-    # Adiciona e persiste o log no banco de dados
-    db.session.add(novo_log)
-    db.session.commit()
+    # Envia o log ao gravador de auditoria
+    gravador_auditoria.registrar({
+        'ID_USUARIO': usuario_id,
+        'ACAO': acao,
+        'TABELA': tabela,
+        'ID_REGISTRO': id_registro,
+        'DADOS_ANTERIORES': dados_anteriores_json,
+        'DADOS_NOVOS': dados_novos_json,
+        'DADOS_ALTERACOES': json.dumps(alteracoes, ensure_ascii=False),
+        'DATA_HORA': datetime.now(),
+        'CAMPOS': list(alteracoes)  # Indexados em TBLOG_CAMPO para a busca por campo alterado
+    })
     
 
-# Rota para exportar os dados do log em formato CSV, Excel ou PDF
-@bp.route('/exportar/<formato>', methods=['GET'])
+def _linhas_exportacao(query, filtros, tamanho_lote, formatar_data=True):
+    """
+    Linhas da exportação: os logs de TBLOG seguidos dos logs arquivados do período filtrado
+    (mais antigos, portanto a ordem decrescente por DATA_HORA é mantida).
+    """
+    return chain(iterar_linhas(query, tamanho_lote, formatar_data), iterar_linhas_arquivadas(filtros, formatar_data))
+
+
+def _tarefa_exportar(tarefa, formato, filtros):
+    """
+    Executa a exportação em segundo plano, gravando o arquivo no diretório de tarefas
+    e informando o progresso (linhas exportadas / total) a cada lote.
+    """
+    exportador = obter_exportador(formato)
+    query = _filtrar_logs(consulta_exportacao(), filtros)
+    total = query.order_by(None).count()  # Logs em TBLOG; os arquivados entram no fim, além do total
+    tamanho_lote = current_app.config['EXPORTACAO_TAMANHO_LOTE']
+    tarefa.progresso(processadas=0, total=total)
+    exportadas = 0
+
+    def linhas_com_progresso():
+        nonlocal exportadas
+        linhas = _linhas_exportacao(query, filtros, tamanho_lote, not exportador.data_nativa)
+        for exportadas, linha in enumerate(linhas, start=1):
+            if exportadas % tamanho_lote == 0:
+                tarefa.progresso(processadas=exportadas)
+            yield linha
+        tarefa.progresso(processadas=exportadas)
+
+    caminho = tarefa.caminho_resultado(exportador.extensao)
+    with open(caminho, 'wb') as destino:
+        mimetype, extensao = exportador.escrever(linhas_com_progresso(), destino)
+
+    return {'arquivo': caminho, 'nome_download': f'logs.{extensao}', 'mimetype': mimetype, 'linhas': exportadas}
+
+
+# Rota para exportar os dados do log em formato CSV, Excel, PDF ou Parquet
+# POST agenda a exportação em segundo plano e retorna a tarefa para acompanhamento (/tarefas/<id>)
+@bp.route('/exportar/<formato>', methods=['GET', 'POST'])
+@limite_queries(3)
 @login_required
 def exportar_logs(formato):
-    """ Exporta os logs nos formatos CSV, Excel ou PDF """
-    
-    logs = Log.query.order_by(Log.DATA_HORA.desc()).all()  # Obtém todos os logs ordenados
+    """
+    Exporta os logs nos formatos CSV, Excel, PDF ou Parquet, respeitando os mesmos filtros da listagem.
+    Os logs são lidos em lotes e gravados à medida que chegam, mantendo o uso de memória
+    constante independentemente da quantidade de registros exportados.
+    Com POST, a exportação é executada em segundo plano e a resposta (202) traz a tarefa
+    cujo progresso é consultado em /tarefas/<id>; o arquivo é baixado em /tarefas/<id>/resultado.
+    """
+    try:
+        query = _filtrar_logs(consulta_exportacao(), request.args)
+    except ValueError as e:
+        return jsonify({"erro": str(e)}), 400
 
-    # Converte os dados para um formato estruturado
-    data = []
-    for log in logs:
-        data.append({
-            "ID_LOG": log.ID_LOG,
-            "USUARIO": log.usuario.NOME_USUARIO,
-            "ACAO": log.ACAO,
-            "TABELA": log.TABELA,
-            "ID_REGISTRO": log.ID_REGISTRO,
-            "DADOS_ANTERIORES": json.loads(log.DADOS_ANTERIORES) if log.DADOS_ANTERIORES else None,
-            "DADOS_NOVOS": json.loads(log.DADOS_NOVOS) if log.DADOS_NOVOS else None,
-            "DATA_HORA": log.DATA_HORA.strftime('%d/%m/%Y %H:%M:%S')
-        })
+    if request.method == 'POST':
+        if formato not in EXPORTADORES:
+            return jsonify({"erro": "Formato não suportado"}), 400
+        try:
+            id_tarefa = gerenciador_tarefas.submeter(f'exportacao_logs_{formato}', current_user.ID_USUARIO,
+                                                     _tarefa_exportar, formato, request.args.to_dict())
+        except FilaTarefasCheia as e:
+            return jsonify({"erro": str(e)}), 503, {'Retry-After': '30'}
+        return resposta_tarefa(id_tarefa, 202)
 
-    df = pd.DataFrame(data)  # Converte para DataFrame
+    tamanho_lote = current_app.config['EXPORTACAO_TAMANHO_LOTE']
 
-    # Exportação para CSV
+    # Exportação para CSV, enviada em streaming enquanto a consulta é percorrida
     if formato == 'csv':
-        csv_data = df.to_csv(index=False, sep=';', encoding='utf-8')
-        return Response(csv_data, mimetype="text/csv",
+        return Response(stream_with_context(gerar_csv(_linhas_exportacao(query, request.args, tamanho_lote))),
+                        mimetype="text/csv",
                         headers={"Content-Disposition": "attachment;filename=logs.csv"})
 
-    # Exportação para Excel
-    elif formato == 'excel':
-        output = BytesIO()
-        with pd.ExcelWriter(output, engine='xlsxwriter') as writer:
-            df.to_excel(writer, index=False, sheet_name="Logs")
-        output.seek(0)
-        return send_file(output, mimetype="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
-                         as_attachment=True, download_name="logs.xlsx")
+    # Demais formatos (Excel, PDF, Parquet): gravados em arquivo temporário (em disco a partir de certo tamanho),
+    # à medida que os lotes são lidos; o motor de cada formato é carregado apenas no primeiro uso
+    exportador = EXPORTADORES.get(formato)
+    if exportador is None:
+        return jsonify({"erro": "Formato não suportado"}), 400
 
-    return jsonify({"erro": "Formato não suportado"}), 400
+    output = SpooledTemporaryFile(max_size=current_app.config['EXPORTACAO_MEMORIA_MAX'])
+    try:
+        mimetype, extensao = exportador.escrever(
+            _linhas_exportacao(query, request.args, tamanho_lote, not exportador.data_nativa), output)
+    except ParquetIndisponivel as e:
+        return jsonify({"erro": str(e)}), 501
+    output.seek(0)
+    return send_file(output, mimetype=mimetype, as_attachment=True, download_name=f"logs.{extensao}")
+
+
+@bp.cli.command('arquivar')
+@click.option('--dias', type=int, default=None, help='Idade mínima, em dias, dos logs arquivados (padrão: LOGS_RETENCAO_DIAS).')
+def arquivar(dias):
+    """
+    Move os logs antigos de TBLOG para arquivos compactados (uso: flask logs arquivar [--dias N]).
+    Pode ser agendado no Agendador de Tarefas do Windows para execução diária.
+    """
+    dias = dias if dias is not None else current_app.config['LOGS_RETENCAO_DIAS']
+    total = arquivar_logs(dias, current_app.config['LOGS_ARQUIVO_TAMANHO_LOTE'],
+                          progresso=lambda parcial: click.echo(f'{parcial} log(s) arquivado(s)...'))
+    click.echo(f'Concluído: {total} log(s) com mais de {dias} dia(s) arquivado(s).')
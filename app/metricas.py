@@ -0,0 +1,276 @@
+import threading
+import time
+from bisect import bisect_left
+from flask import g, request, has_request_context, has_app_context, current_app
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+# Limites (le) dos histogramas, no formato do Prometheus
+LIMITES_DURACAO = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)  # Segundos
+LIMITES_CONSULTAS = (0, 1, 2, 3, 5, 10, 20, 50, 100, 500)  # Comandos SQL por requisição
+LIMITES_BYTES = (1024, 10240, 102400, 1048576, 10485760, 104857600)  # Tamanho da resposta
+
+QUANTIS = (0.5, 0.95, 0.99)  # Quantis da janela deslizante
+PARTES_JANELA = 6  # A janela é dividida em partes descartadas uma a uma
+LIMITE_TEXTO_SQL = 2000  # Caracteres do SQL e dos parâmetros registrados no log de comandos lentos
+
+
+class Histograma:
+    """ Contagens por faixa (limites crescentes + infinito), soma e total das observações """
+    __slots__ = ('limites', 'contagens', 'soma', 'total')
+
+    def __init__(self, limites):
+        self.limites = limites
+        self.contagens = [0] * (len(limites) + 1)
+        self.soma = 0.0
+        self.total = 0
+
+    def observar(self, valor):
+        self.contagens[bisect_left(self.limites, valor)] += 1
+        self.soma += valor
+        self.total += 1
+
+    def acumular(self, outro):
+        for indice, contagem in enumerate(outro.contagens):
+            self.contagens[indice] += contagem
+        self.soma += outro.soma
+        self.total += outro.total
+
+    def quantil(self, fracao):
+        """ Estimativa do quantil por interpolação linear dentro da faixa (como histogram_quantile) """
+        if not self.total:
+            return None
+        alvo = fracao * self.total
+        acumulado = 0
+        for indice, contagem in enumerate(self.contagens):
+            if acumulado + contagem >= alvo and contagem:
+                if indice == len(self.limites):
+                    return self.limites[-1]  # Acima do último limite: o valor exato é desconhecido
+                inicio = self.limites[indice - 1] if indice else 0
+                return inicio + (self.limites[indice] - inicio) * (alvo - acumulado) / contagem
+            acumulado += contagem
+        return self.limites[-1]
+
+
+class HistogramaJanela:
+    """
+    Histograma das observações dos últimos `janela` segundos: a janela é dividida em PARTES_JANELA
+    histogramas, e a parte mais antiga é descartada (zerada) quando o tempo avança.
+    """
+
+    def __init__(self, limites, janela):
+        self.limites = limites
+        self.duracao_parte = janela / PARTES_JANELA
+        self.partes = [Histograma(limites) for _ in range(PARTES_JANELA)]
+        self.inicios = [None] * PARTES_JANELA
+
+    def _parte(self, agora):
+        numero = int(agora // self.duracao_parte)
+        indice = numero % PARTES_JANELA
+        if self.inicios[indice] != numero:
+            self.partes[indice] = Histograma(self.limites)
+            self.inicios[indice] = numero
+        return self.partes[indice]
+
+    def observar(self, valor, agora):
+        self._parte(agora).observar(valor)
+
+    def agregado(self, agora):
+        numero = int(agora // self.duracao_parte)
+        total = Histograma(self.limites)
+        for inicio, parte in zip(self.inicios, self.partes):
+            if inicio is not None and numero - inicio < PARTES_JANELA:
+                total.acumular(parte)
+        return total
+
+
+class MetricasEndpoint:
+    """ Métricas acumuladas de um endpoint (blueprint, endpoint, método) """
+
+    def __init__(self, janela):
+        self.duracao = Histograma(LIMITES_DURACAO)
+        self.consultas = Histograma(LIMITES_CONSULTAS)
+        self.tempo_sql = Histograma(LIMITES_DURACAO)
+        self.bytes = Histograma(LIMITES_BYTES)
+        self.duracao_janela = HistogramaJanela(LIMITES_DURACAO, janela)
+        self.status = {}  # Código HTTP -> quantidade de respostas
+
+
+def _escapar(valor):
+    return str(valor).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _rotulos(rotulos):
+    return '{' + ','.join(f'{nome}="{_escapar(valor)}"' for nome, valor in rotulos) + '}'
+
+
+def _numero(valor):
+    return repr(float(valor)) if isinstance(valor, float) else str(valor)
+
+
+class ColetorMetricas:
+    """
+    Coleta, por blueprint/endpoint/método, o tempo total da requisição (inclusive respostas em streaming),
+    a quantidade e o tempo dos comandos SQL (eventos do engine) e o tamanho da resposta.
+    Os histogramas ficam em memória, por processo, e são expostos no formato texto do Prometheus;
+    além dos histogramas acumulados, os quantis do tempo de resposta são calculados sobre uma
+    janela deslizante (METRICAS_JANELA_SEGUNDOS).
+    Requisições e comandos SQL acima dos limites configurados são registrados no log.
+    """
+
+    def __init__(self):
+        self.ativo = False
+        self.janela = 300
+        self.requisicao_lenta = 1.0
+        self.sql_lento = 0.2
+        self.log_parametros = False
+        self._endpoints = {}
+        self._lock = threading.Lock()
+
+    def init_app(self, app):
+        self.ativo = app.config['METRICAS_ATIVAS']
+        self.janela = app.config['METRICAS_JANELA_SEGUNDOS']
+        self.requisicao_lenta = app.config['METRICAS_REQUISICAO_LENTA_MS'] / 1000
+        self.sql_lento = app.config['METRICAS_SQL_LENTO_MS'] / 1000
+        self.log_parametros = app.config['METRICAS_SQL_LOG_PARAMETROS']
+        app.extensions['metricas'] = self
+        if not self.ativo:
+            return
+
+        @app.before_request
+        def iniciar_medicao():
+            g.metricas = {'inicio': time.perf_counter(), 'consultas': 0, 'tempo_sql': 0.0}
+
+        @app.after_request
+        def concluir_medicao(response):
+            medicao = g.get('metricas')
+            if medicao is None:
+                return response
+            chave = (request.blueprint or '', request.endpoint or 'desconhecido', request.method)
+            contexto = {'caminho': request.full_path.rstrip('?'), 'status': response.status_code}
+
+            if response.is_streamed:
+                # O tempo (e, sem Content-Length, o tamanho) de respostas em streaming só é conhecido ao fim do envio
+                tamanho = [response.content_length or 0]
+                if response.content_length is None:
+                    corpo = response.response
+
+                    def contar_bytes():
+                        for bloco in corpo:
+                            tamanho[0] += len(bloco.encode('utf-8') if isinstance(bloco, str) else bloco)
+                            yield bloco
+
+                    response.response = contar_bytes()
+                response.call_on_close(lambda: self._registrar(app, chave, contexto, medicao, tamanho[0]))
+            else:
+                self._registrar(app, chave, contexto, medicao, response.calculate_content_length() or 0)
+            return response
+
+    def _registrar(self, app, chave, contexto, medicao, tamanho):
+        duracao = time.perf_counter() - medicao['inicio']
+        agora = time.monotonic()
+        with self._lock:
+            metricas = self._endpoints.get(chave)
+            if metricas is None:
+                metricas = self._endpoints[chave] = MetricasEndpoint(self.janela)
+            metricas.duracao.observar(duracao)
+            metricas.duracao_janela.observar(duracao, agora)
+            metricas.consultas.observar(medicao['consultas'])
+            metricas.tempo_sql.observar(medicao['tempo_sql'])
+            metricas.bytes.observar(tamanho)
+            metricas.status[contexto['status']] = metricas.status.get(contexto['status'], 0) + 1
+
+        if duracao >= self.requisicao_lenta:
+            app.logger.warning('Requisição lenta: %s %s (%s) status %s em %.1f ms; %d comando(s) SQL em %.1f ms; %d bytes',
+                               chave[2], contexto['caminho'], chave[1], contexto['status'], 1000 * duracao,
+                               medicao['consultas'], 1000 * medicao['tempo_sql'], tamanho)
+
+    def registrar_sql(self, duracao, statement, parameters):
+        """ Soma o comando SQL às métricas da requisição atual e registra no log os comandos lentos """
+        if has_request_context():
+            medicao = g.get('metricas')
+            if medicao is not None:
+                medicao['consultas'] += 1
+                medicao['tempo_sql'] += duracao
+
+        if duracao >= self.sql_lento and has_app_context():
+            parametros = repr(parameters)[:LIMITE_TEXTO_SQL] if self.log_parametros else '(omitidos)'
+            current_app.logger.warning('Comando SQL lento (%.1f ms): %s | parâmetros: %s',
+                                       1000 * duracao, statement[:LIMITE_TEXTO_SQL], parametros)
+
+    def exportar_prometheus(self):
+        """ Métricas no formato texto de exposição do Prometheus (version 0.0.4) """
+        agora = time.monotonic()
+        with self._lock:
+            return self._texto_prometheus(agora)
+
+    def _texto_prometheus(self, agora):
+        itens = sorted(self._endpoints.items())
+        janelas = {chave: metricas.duracao_janela.agregado(agora) for chave, metricas in itens}
+        linhas = []
+
+        def histograma(nome, descricao, atributo):
+            linhas.append(f'# HELP {nome} {descricao}')
+            linhas.append(f'# TYPE {nome} histogram')
+            for (blueprint, endpoint, metodo), metricas in itens:
+                dados = getattr(metricas, atributo)
+                base = [('blueprint', blueprint), ('endpoint', endpoint), ('metodo', metodo)]
+                acumulado = 0
+                for limite, contagem in zip(dados.limites + (float('inf'),), dados.contagens):
+                    acumulado += contagem
+                    le = '+Inf' if limite == float('inf') else _numero(limite)
+                    linhas.append(f'{nome}_bucket{_rotulos(base + [("le", le)])} {acumulado}')
+                linhas.append(f'{nome}_sum{_rotulos(base)} {_numero(dados.soma)}')
+                linhas.append(f'{nome}_count{_rotulos(base)} {dados.total}')
+
+        histograma('sgt_requisicao_duracao_segundos', 'Tempo total da requisição, inclusive o envio da resposta.', 'duracao')
+        histograma('sgt_requisicao_sql_comandos', 'Comandos SQL executados por requisição.', 'consultas')
+        histograma('sgt_requisicao_sql_duracao_segundos', 'Tempo gasto em comandos SQL por requisição.', 'tempo_sql')
+        histograma('sgt_resposta_bytes', 'Tamanho do corpo da resposta.', 'bytes')
+
+        nome = 'sgt_requisicao_duracao_janela_segundos'
+        linhas.append(f'# HELP {nome} Quantis do tempo da requisição nos últimos {self.janela} segundos.')
+        linhas.append(f'# TYPE {nome} summary')
+        for chave, janela in janelas.items():
+            base = [('blueprint', chave[0]), ('endpoint', chave[1]), ('metodo', chave[2])]
+            for fracao in QUANTIS:
+                valor = janela.quantil(fracao)
+                linhas.append(f'{nome}{_rotulos(base + [("quantile", _numero(fracao))])} '
+                              f'{"NaN" if valor is None else _numero(float(valor))}')
+            linhas.append(f'{nome}_sum{_rotulos(base)} {_numero(janela.soma)}')
+            linhas.append(f'{nome}_count{_rotulos(base)} {janela.total}')
+
+        nome = 'sgt_requisicoes_total'
+        linhas.append(f'# HELP {nome} Requisições atendidas por código de status.')
+        linhas.append(f'# TYPE {nome} counter')
+        for (blueprint, endpoint, metodo), metricas in itens:
+            for status, quantidade in sorted(metricas.status.items()):
+                rotulos = [('blueprint', blueprint), ('endpoint', endpoint), ('metodo', metodo), ('status', status)]
+                linhas.append(f'{nome}{_rotulos(rotulos)} {quantidade}')
+
+        return '\n'.join(linhas) + '\n'
+
+
+coletor_metricas = ColetorMetricas()
+
+
+@event.listens_for(Engine, 'before_cursor_execute')
+def _iniciar_sql(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault('metricas_inicio_sql', []).append(time.perf_counter())
+
+
+@event.listens_for(Engine, 'after_cursor_execute')
+def _concluir_sql(conn, cursor, statement, parameters, context, executemany):
+    inicios = conn.info.get('metricas_inicio_sql')
+    if inicios and coletor_metricas.ativo:
+        coletor_metricas.registrar_sql(time.perf_counter() - inicios.pop(), statement, parameters)
+    elif inicios:
+        inicios.pop()
+
+
+@event.listens_for(Engine, 'handle_error')
+def _falha_sql(contexto):
+    # Comando com erro: after_cursor_execute não é chamado, descarta o início registrado
+    inicios = contexto.connection.info.get('metricas_inicio_sql') if contexto.connection is not None else None
+    if inicios:
+        inicios.pop()
@@ -0,0 +1,5 @@
+from flask import Blueprint
+
+bp = Blueprint('saude', __name__)
+
+from app.saude import routes
@@ -0,0 +1,66 @@
+import time
+from flask import jsonify, current_app, Response
+from flask_login import login_required
+from sqlalchemy import text
+from sqlalchemy.pool import QueuePool
+from app.extensions import db
+from app.diagnostico import memoria_rss
+from app.metricas import coletor_metricas
+from app.autenticacao.permissoes import requires_permission, VISUALIZAR_METRICAS
+from app.saude import bp
+
+
+@bp.route('/db', methods=['GET'])
+def saude_db():
+    """
+    Verifica a conexão com o banco e retorna o estado do pool de conexões:
+    conexões em uso/ociosas, overflow, tempo de espera no checkout e timeouts.
+    Não exige login, para poder ser consultada pelo monitoramento; não expõe dados de negócio.
+    """
+    pool = db.engine.pool
+    resposta = {'status': 'ok', 'pool': {'classe': type(pool).__name__}}
+
+    inicio = time.perf_counter()
+    try:
+        db.session.execute(text('SELECT 1'))
+        resposta['latencia_ms'] = round(1000 * (time.perf_counter() - inicio), 3)
+        status_http = 200
+    except Exception:
+        # O detalhe (servidor, driver, ODBC) vai apenas para o log: a rota é pública
+        current_app.logger.exception('Falha na verificação de saúde do banco')
+        resposta['status'] = 'erro'
+        resposta['erro'] = 'Banco de dados indisponível'
+        status_http = 503
+    finally:
+        db.session.remove()  # Devolve a conexão ao pool antes de medir o estado
+
+    if hasattr(pool, 'estatisticas'):
+        resposta['pool'].update(pool.estatisticas())
+    elif isinstance(pool, QueuePool):
+        resposta['pool'].update({'em_uso': pool.checkedout(), 'ociosas': pool.checkedin(), 'overflow': pool.overflow()})
+
+    return jsonify(resposta), status_http
+
+
+@bp.route('/inicializacao', methods=['GET'])
+def saude_inicializacao():
+    """
+    Retorna o custo de inicialização deste processo: tempo de importação, de create_app(),
+    tempo até a primeira requisição e memória residente (RSS) na inicialização e agora.
+    Para o custo de cada módulo importado, use `flask diagnostico importacoes`.
+    """
+    dados = dict(current_app.extensions.get('diagnostico_inicializacao', {}))
+    dados['rss_atual_bytes'] = memoria_rss()
+    return jsonify(dados)
+
+
+@bp.route('/metricas', methods=['GET'])
+@login_required
+@requires_permission(VISUALIZAR_METRICAS)
+def metricas():
+    """
+    Métricas de desempenho deste processo no formato texto do Prometheus: histogramas por endpoint
+    do tempo da requisição, da quantidade e do tempo dos comandos SQL e do tamanho da resposta,
+    além dos quantis do tempo de resposta na janela recente (METRICAS_JANELA_SEGUNDOS).
+    """
+    return Response(coletor_metricas.exportar_prometheus(), mimetype='text/plain; version=0.0.4')
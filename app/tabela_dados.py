@@ -0,0 +1,163 @@
+import base64
+import json
+from datetime import date, datetime
+from flask import current_app
+from sqlalchemy import select, func, and_, or_
+from app.extensions import db
+
+DIRECOES = ('asc', 'desc')
+CARACTERES_LIKE = ('\\', '%', '_', '[')  # Curingas do LIKE (o SQL Server também trata [ como curinga)
+
+
+def _valor_cursor(valor):
+    if isinstance(valor, datetime):
+        return {'dt': valor.isoformat()}
+    if isinstance(valor, date):
+        return {'d': valor.isoformat()}
+    return valor
+
+
+def _ler_valor_cursor(valor):
+    if isinstance(valor, dict):
+        if 'dt' in valor:
+            return datetime.fromisoformat(valor['dt'])
+        if 'd' in valor:
+            return date.fromisoformat(valor['d'])
+        raise ValueError('Cursor de paginação inválido')
+    return valor
+
+
+def _conferir_tipo(valor, coluna):
+    """
+    Confere se o valor lido do cursor tem o tipo Python da coluna: o cursor vem do cliente e um
+    valor de outro tipo causaria um erro de conversão no banco (500) em vez de uma resposta 400
+    """
+    tipo = coluna.type.python_type
+    if type(valor) is int and tipo in (int, float) and -2 ** 63 <= valor < 2 ** 63:
+        return valor
+    if type(valor) is tipo and tipo is not int:
+        return valor
+    raise ValueError('Cursor de paginação inválido')
+
+
+def prefixo_like(texto):
+    """ Padrão LIKE 'texto%' com os curingas do texto escapados (busca por prefixo, usa o índice da coluna) """
+    for caractere in CARACTERES_LIKE:
+        texto = texto.replace(caractere, '\\' + caractere)
+    return texto + '%'
+
+
+class TabelaDados:
+    """
+    Listagem paginada no servidor, reutilizável por qualquer cadastro (cargos, colaboradores,
+    departamentos, treinamentos...). Cada requisição lê apenas uma página, de modo que o tamanho
+    da resposta e o tempo de renderização não crescem com a tabela.
+
+        consulta: função que retorna o select() base, com as colunas nomeadas (label) e eventuais joins
+        colunas: nomes (labels da consulta) devolvidos em cada item
+        ordenacoes: {nome aceito em ?ordem=: coluna}; apenas essas colunas podem ser usadas para ordenar.
+                    Devem ser NOT NULL, exigência da paginação por keyset.
+        chave: coluna única (em geral a chave primária), usada como desempate da ordenação e do keyset
+        coluna_busca: coluna da busca por prefixo (?busca=), que deve ter índice
+
+    Parâmetros aceitos (ver pagina):
+        limite, ordem, direcao (asc/desc), busca, contar=1 (total, calculado apenas quando pedido),
+        cursor (keyset: página seguinte à anterior, sem OFFSET) ou pagina (OFFSET, para saltos diretos)
+    """
+
+    def __init__(self, consulta, colunas, ordenacoes, chave, ordenacao_padrao, coluna_busca=None):
+        self.consulta = consulta
+        self.colunas = colunas
+        self.ordenacoes = ordenacoes
+        self.chave = chave
+        self.ordenacao_padrao = ordenacao_padrao  # (nome da ordenação, direção)
+        self.coluna_busca = coluna_busca
+
+    def _parametros(self, args):
+        ordem = args.get('ordem') or self.ordenacao_padrao[0]
+        direcao = (args.get('direcao') or self.ordenacao_padrao[1]).lower()
+        if ordem not in self.ordenacoes:
+            raise ValueError(f"Ordenação inválida. Use: {', '.join(self.ordenacoes)}")
+        if direcao not in DIRECOES:
+            raise ValueError("Direção inválida. Use asc ou desc")
+
+        try:
+            limite = int(args.get('limite') or current_app.config['TABELA_DADOS_POR_PAGINA'])
+            pagina = int(args['pagina']) if args.get('pagina') else None
+        except ValueError:
+            raise ValueError("Parâmetros de paginação inválidos")
+        limite = max(1, min(limite, current_app.config['TABELA_DADOS_POR_PAGINA_MAX']))
+        if pagina is not None and pagina < 1:
+            raise ValueError("Página inválida")
+        if pagina is not None and args.get('cursor'):
+            raise ValueError("Informe cursor ou pagina, não ambos")
+
+        return ordem, direcao, limite, pagina
+
+    def _codificar_cursor(self, ordem, direcao, linha):
+        valores = [_valor_cursor(linha._mapping['_ordem']), _valor_cursor(linha._mapping['_chave'])]
+        texto = json.dumps({'o': ordem, 'd': direcao, 'v': valores}, separators=(',', ':'))
+        return base64.urlsafe_b64encode(texto.encode('utf-8')).decode('ascii')
+
+    def _decodificar_cursor(self, cursor, ordem, direcao):
+        try:
+            dados = json.loads(base64.urlsafe_b64decode(cursor.encode('ascii')).decode('utf-8'))
+            valor, chave = (_ler_valor_cursor(item) for item in dados['v'])
+        except (ValueError, UnicodeError, KeyError, TypeError):
+            raise ValueError("Cursor de paginação inválido")
+        if dados.get('o') != ordem or dados.get('d') != direcao:
+            raise ValueError("O cursor pertence a outra ordenação")
+        return _conferir_tipo(valor, self.ordenacoes[ordem]), _conferir_tipo(chave, self.chave)
+
+    def _filtrar(self, consulta, args):
+        busca = (args.get('busca') or '').strip()
+        if busca and self.coluna_busca is not None:
+            consulta = consulta.where(self.coluna_busca.like(prefixo_like(busca), escape='\\'))
+        return consulta
+
+    def pagina(self, args):
+        """
+        Retorna um dict com os itens da página e os dados para a próxima:
+        {itens, proximo_cursor, pagina, total, ordem, direcao, limite}.
+        Lança ValueError para parâmetros inválidos (a rota deve responder 400).
+        """
+        ordem, direcao, limite, pagina = self._parametros(args)
+        coluna_ordem = self.ordenacoes[ordem]
+        filtrada = self._filtrar(self.consulta(), args)
+
+        consulta = filtrada.add_columns(coluna_ordem.label('_ordem'), self.chave.label('_chave'))
+        if direcao == 'asc':
+            consulta = consulta.order_by(coluna_ordem.asc(), self.chave.asc())
+        else:
+            consulta = consulta.order_by(coluna_ordem.desc(), self.chave.desc())
+
+        if args.get('cursor'):
+            # Keyset: continua logo após o último item da página anterior, sem percorrer as anteriores
+            valor, chave = self._decodificar_cursor(args['cursor'], ordem, direcao)
+            if direcao == 'asc':
+                consulta = consulta.where(or_(coluna_ordem > valor, and_(coluna_ordem == valor, self.chave > chave)))
+            else:
+                consulta = consulta.where(or_(coluna_ordem < valor, and_(coluna_ordem == valor, self.chave < chave)))
+        elif pagina:
+            consulta = consulta.offset((pagina - 1) * limite)
+
+        # Um registro a mais indica se existe próxima página
+        linhas = db.session.execute(consulta.limit(limite + 1)).all()
+        proximo_cursor = None
+        if len(linhas) > limite:
+            linhas = linhas[:limite]
+            proximo_cursor = self._codificar_cursor(ordem, direcao, linhas[-1])
+
+        total = None
+        if args.get('contar') in ('1', 'true'):
+            total = db.session.execute(select(func.count()).select_from(filtrada.order_by(None).subquery())).scalar()
+
+        return {
+            'itens': [{nome: linha._mapping[nome] for nome in self.colunas} for linha in linhas],
+            'proximo_cursor': proximo_cursor,
+            'pagina': pagina,
+            'total': total,
+            'ordem': ordem,
+            'direcao': direcao,
+            'limite': limite,
+        }
@@ -0,0 +1,5 @@
+from flask import Blueprint
+
+bp = Blueprint('tarefas', __name__)
+
+from app.tarefas import routes
@@ -0,0 +1,296 @@
+import json
+import logging
+import os
+import re
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from flask import current_app
+
+# Situações de uma tarefa
+PENDENTE = 'PENDENTE'
+EXECUTANDO = 'EXECUTANDO'
+CONCLUIDA = 'CONCLUIDA'
+ERRO = 'ERRO'
+
+INTERVALO_PROGRESSO = 1.0  # Segundos mínimos entre duas gravações do progresso em disco
+INTERVALO_LIMPEZA = 600  # Segundos entre duas varreduras de tarefas expiradas
+INTERVALO_SINAL = 30  # Segundos entre dois sinais de vida das tarefas ativas de um processo
+LIMITE_SEM_SINAL = 120  # Segundos sem sinal de vida até a tarefa ser considerada interrompida
+TENTATIVAS_ARQUIVO = 5  # Tentativas de ler/substituir um arquivo de estado bloqueado por outro processo
+PAUSA_TENTATIVA = 0.05  # Segundos de espera entre as tentativas (multiplicado pelo número da tentativa)
+FORMATO_ID = re.compile(r'^[0-9a-f]{32}$')
+
+
+class FilaTarefasCheia(Exception):
+    """ Lançada quando o limite de tarefas em execução e aguardando foi atingido """
+
+
+class TarefaIndisponivel(Exception):
+    """ Lançada quando o estado da tarefa continua bloqueado por outro processo após as novas tentativas """
+
+
+def _repetir(operacao):
+    """
+    Executa uma operação de arquivo, repetindo-a quando falhar com PermissionError: no Windows (IIS),
+    um arquivo aberto por outro processo não pode ser substituído e a leitura concorrente ao
+    os.replace também pode falhar por alguns milissegundos
+    """
+    for tentativa in range(1, TENTATIVAS_ARQUIVO + 1):
+        try:
+            return operacao()
+        except PermissionError:
+            if tentativa == TENTATIVAS_ARQUIVO:
+                raise
+            time.sleep(PAUSA_TENTATIVA * tentativa)
+
+
+class Tarefa:
+    """
+    Contexto entregue à função executada em segundo plano: permite informar o progresso
+    e obter o caminho do arquivo de resultado.
+    """
+
+    def __init__(self, gerenciador, estado):
+        self.gerenciador = gerenciador
+        self.estado = estado
+        self._ultima_gravacao = 0
+        self._lock = threading.Lock()  # A thread de sinal de vida também grava o estado
+
+    @property
+    def id(self):
+        return self.estado['id']
+
+    def caminho_resultado(self, extensao):
+        """ Caminho (no diretório de tarefas) onde a função deve gravar o arquivo de resultado """
+        return self.gerenciador.caminho_arquivo(f'{self.id}.{extensao}')
+
+    def progresso(self, **dados):
+        """ Atualiza o progresso (ex.: processadas=100, total=1000); gravado no máximo a cada INTERVALO_PROGRESSO """
+        with self._lock:
+            self.estado['progresso'].update(dados)
+        if time.monotonic() - self._ultima_gravacao >= INTERVALO_PROGRESSO:
+            self.salvar()
+
+    def salvar(self, **campos):
+        """
+        Grava o estado com os campos informados e o sinal de vida. Se o arquivo continuar bloqueado,
+        a falha é apenas registrada: a tarefa segue e o estado é gravado novamente na próxima atualização.
+        """
+        with self._lock:
+            self.estado.update(campos, sinal_em=time.time())
+            estado = json.loads(json.dumps(self.estado))  # Cópia, gravada fora do lock
+        try:
+            self.gerenciador.salvar(estado)
+        except OSError:
+            self.gerenciador.logger.warning('Não foi possível gravar o estado da tarefa %s', self.id, exc_info=True)
+            return
+        self._ultima_gravacao = time.monotonic()
+
+
+class GerenciadorTarefas:
+    """
+    Executa tarefas demoradas (exportações, importações) fora da requisição, em um pool de threads
+    com concorrência limitada (TAREFAS_CONCORRENCIA), para que não ocupem os workers do IIS nem
+    disputem recursos com as requisições interativas.
+    O estado de cada tarefa é gravado em um arquivo JSON no diretório de tarefas, de modo que
+    qualquer processo da aplicação pode consultar a situação e servir o resultado.
+    Cada processo grava periodicamente um sinal de vida (sinal_em) nas suas tarefas ativas; uma tarefa
+    sem sinal há LIMITE_SEM_SINAL segundos (processo reciclado pelo IIS, por exemplo) é marcada como ERRO.
+    """
+
+    def __init__(self):
+        self.diretorio = None
+        self.concorrencia = 2
+        self.fila_max = 10
+        self.retencao = 24 * 3600
+        self.logger = logging.getLogger(__name__)
+        self._ativas = 0
+        self._tarefas = {}  # Tarefas deste processo ainda não finalizadas (recebem o sinal de vida)
+        self._executor = None
+        self._proxima_limpeza = 0
+        self._lock = threading.Lock()
+
+    def init_app(self, app):
+        self.diretorio = app.config['TAREFAS_DIRETORIO'] or os.path.join(app.instance_path, 'tarefas')
+        self.concorrencia = app.config['TAREFAS_CONCORRENCIA']
+        self.fila_max = app.config['TAREFAS_FILA_MAX']
+        self.retencao = app.config['TAREFAS_RETENCAO_HORAS'] * 3600
+        self.logger = app.logger
+        os.makedirs(self.diretorio, exist_ok=True)
+
+    def _obter_executor(self):
+        # As threads (inclusive a do sinal de vida) só são criadas na primeira tarefa
+        if self._executor is None:
+            with self._lock:
+                if self._executor is None:
+                    self._executor = ThreadPoolExecutor(max_workers=self.concorrencia, thread_name_prefix='tarefa')
+                    threading.Thread(target=self._sinalizar, name='tarefa-sinal', daemon=True).start()
+        return self._executor
+
+    def _sinalizar(self):
+        """ Grava o sinal de vida das tarefas deste processo, mesmo quando elas não informam progresso """
+        while True:
+            time.sleep(INTERVALO_SINAL)
+            with self._lock:
+                tarefas = list(self._tarefas.values())
+            for tarefa in tarefas:
+                tarefa.salvar()
+
+    def caminho_arquivo(self, nome):
+        return os.path.join(self.diretorio, nome)
+
+    def _caminho_estado(self, id_tarefa):
+        return self.caminho_arquivo(f'{id_tarefa}.json')
+
+    def salvar(self, estado):
+        """
+        Grava o estado da tarefa de forma atômica (arquivo temporário + replace), repetindo o replace
+        enquanto outro processo estiver lendo o arquivo. Lança OSError se ele continuar bloqueado.
+        """
+        caminho = self._caminho_estado(estado['id'])
+        temporario = f'{caminho}.{os.getpid()}.{threading.get_ident()}.tmp'
+        with open(temporario, 'w', encoding='utf-8') as arquivo:
+            json.dump(estado, arquivo, ensure_ascii=False)
+        try:
+            _repetir(lambda: os.replace(temporario, caminho))
+        except OSError:
+            try:
+                os.remove(temporario)
+            except OSError:
+                pass
+            raise
+
+    def _ler(self, caminho):
+        def ler():
+            with open(caminho, encoding='utf-8') as arquivo:
+                return json.load(arquivo)
+        return _repetir(ler)
+
+    def _interrompida(self, estado, agora):
+        """ Indica se a tarefa ainda consta como ativa, mas o processo que a executava parou de sinalizar """
+        return estado['status'] in (PENDENTE, EXECUTANDO) and agora - estado.get('sinal_em', 0) > LIMITE_SEM_SINAL
+
+    def obter(self, id_tarefa):
+        """
+        Retorna o estado da tarefa ou None se ela não existir. Uma tarefa interrompida (sem sinal de vida)
+        é marcada como ERRO. Lança TarefaIndisponivel se o arquivo continuar bloqueado por outro processo.
+        """
+        if not FORMATO_ID.match(id_tarefa or ''):
+            return None
+        try:
+            estado = self._ler(self._caminho_estado(id_tarefa))
+        except (FileNotFoundError, json.JSONDecodeError):
+            return None
+        except OSError as erro:
+            raise TarefaIndisponivel('Situação da tarefa temporariamente indisponível') from erro
+
+        if self._interrompida(estado, time.time()):
+            estado.update(status=ERRO, erro='A tarefa foi interrompida antes de terminar. Execute-a novamente.',
+                          concluida_em=datetime.now().isoformat(timespec='seconds'))
+            try:
+                self.salvar(estado)
+            except OSError:
+                pass  # Gravado em uma próxima consulta
+        return estado
+
+    def _contar_ativas(self):
+        """
+        Conta as tarefas pendentes ou em execução de todos os processos (pelos arquivos de estado),
+        para que o limite de tarefas em andamento valha para a aplicação e não apenas para este processo
+        """
+        agora = time.time()
+        ativas = 0
+        for entrada in os.scandir(self.diretorio):
+            if not entrada.name.endswith('.json'):
+                continue
+            try:
+                # Uma tarefa ativa tem o estado regravado ao menos a cada INTERVALO_SINAL: os demais arquivos nem são lidos
+                if agora - entrada.stat().st_mtime > LIMITE_SEM_SINAL:
+                    continue
+                estado = self._ler(entrada.path)
+            except (OSError, ValueError):
+                continue  # Removido, bloqueado ou sendo substituído: não altera o limite de forma relevante
+            ativa = isinstance(estado, dict) and estado.get('status') in (PENDENTE, EXECUTANDO)
+            if ativa and not self._interrompida(estado, agora):
+                ativas += 1
+        return ativas
+
+    def submeter(self, tipo, usuario_id, funcao, *args, **kwargs):
+        """
+        Agenda funcao(tarefa, *args, **kwargs) em segundo plano e retorna o ID da tarefa.
+        A função é executada em um contexto da aplicação e deve retornar um dict com o resumo;
+        as chaves 'arquivo', 'nome_download' e 'mimetype' indicam o arquivo de resultado, se houver.
+        Lança FilaTarefasCheia se houver TAREFAS_CONCORRENCIA + TAREFAS_FILA_MAX tarefas ativas neste
+        processo ou, somando os processos da aplicação, pendentes ou em execução no diretório de tarefas.
+        """
+        limite = self.concorrencia + self.fila_max
+        id_tarefa = uuid.uuid4().hex
+        with self._lock:
+            if self._ativas >= limite:
+                raise FilaTarefasCheia('Limite de tarefas em andamento atingido')
+            self._ativas += 1
+
+        try:
+            self._limpar_expiradas()
+            if self._contar_ativas() >= limite:
+                raise FilaTarefasCheia('Limite de tarefas em andamento atingido')
+            estado = {
+                'id': id_tarefa,
+                'tipo': tipo,
+                'usuario_id': usuario_id,
+                'status': PENDENTE,
+                'progresso': {},
+                'resultado': None,
+                'erro': None,
+                'criada_em': datetime.now().isoformat(timespec='seconds'),
+                'concluida_em': None,
+                'pid': os.getpid(),
+                'sinal_em': time.time()
+            }
+            self.salvar(estado)
+            tarefa = Tarefa(self, estado)
+            with self._lock:
+                self._tarefas[tarefa.id] = tarefa
+            self._obter_executor().submit(self._executar, current_app._get_current_object(),
+                                          tarefa, funcao, args, kwargs)
+        except Exception:
+            with self._lock:
+                self._ativas -= 1
+                self._tarefas.pop(id_tarefa, None)
+            raise
+        return id_tarefa
+
+    def _executar(self, app, tarefa, funcao, args, kwargs):
+        try:
+            with app.app_context():
+                tarefa.salvar(status=EXECUTANDO)
+                resultado = funcao(tarefa, *args, **kwargs)
+                tarefa.salvar(status=CONCLUIDA, resultado=resultado,
+                              concluida_em=datetime.now().isoformat(timespec='seconds'))
+        except Exception as erro:
+            app.logger.exception('Falha na tarefa %s (%s)', tarefa.id, tarefa.estado['tipo'])
+            tarefa.salvar(status=ERRO, erro=str(erro), concluida_em=datetime.now().isoformat(timespec='seconds'))
+        finally:
+            with self._lock:
+                self._ativas -= 1
+                self._tarefas.pop(tarefa.id, None)
+
+    def _limpar_expiradas(self):
+        """ Remove os arquivos (estado e resultado) de tarefas mais antigas que TAREFAS_RETENCAO_HORAS """
+        agora = time.time()
+        if agora < self._proxima_limpeza:
+            return
+        self._proxima_limpeza = agora + INTERVALO_LIMPEZA
+
+        for entrada in os.scandir(self.diretorio):
+            try:
+                if entrada.is_file() and agora - entrada.stat().st_mtime > self.retencao:
+                    os.remove(entrada.path)
+            except OSError:
+                pass  # Arquivo removido por outro processo ou ainda em uso
+
+
+gerenciador_tarefas = GerenciadorTarefas()
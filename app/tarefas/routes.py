@@ -0,0 +1,69 @@
+import os
+from flask import jsonify, send_file, url_for, abort
+from flask_login import login_required, current_user
+from app.tarefas import bp
+from app.tarefas.gerenciador import gerenciador_tarefas, CONCLUIDA, TarefaIndisponivel
+
+
+@bp.app_errorhandler(TarefaIndisponivel)
+def tarefa_indisponivel(erro):
+    """
+    Estado bloqueado por outro processo (gravação em andamento no Windows): o cliente repete a consulta.
+    Registrado na aplicação, pois resposta_tarefa também é usada pelas rotas que criam tarefas.
+    """
+    return jsonify({"erro": str(erro)}), 503, {'Retry-After': '2'}
+
+
+def _tarefa_do_usuario(id_tarefa):
+    """ Retorna o estado da tarefa, desde que pertença ao usuário autenticado (404 caso contrário) """
+    estado = gerenciador_tarefas.obter(id_tarefa)
+    if estado is None or estado['usuario_id'] != current_user.ID_USUARIO:
+        abort(404)
+    return estado
+
+
+def resposta_tarefa(id_tarefa, status=200):
+    """ Resposta JSON com a situação da tarefa; usada também pelas rotas que criam tarefas (202) """
+    estado = gerenciador_tarefas.obter(id_tarefa)
+    resultado = dict(estado['resultado'] or {})
+    arquivo = resultado.pop('arquivo', None)
+    resultado.pop('mimetype', None)
+    resultado.pop('nome_download', None)
+    return jsonify({
+        'id': estado['id'],
+        'tipo': estado['tipo'],
+        'status': estado['status'],
+        'progresso': estado['progresso'],
+        'resultado': resultado or None,
+        'erro': estado['erro'],
+        'criada_em': estado['criada_em'],
+        'concluida_em': estado['concluida_em'],
+        'url_status': url_for('tarefas.status', id_tarefa=estado['id']),
+        'url_resultado': url_for('tarefas.resultado', id_tarefa=estado['id'])
+                         if estado['status'] == CONCLUIDA and arquivo else None
+    }), status
+
+
+@bp.route('/<id_tarefa>', methods=['GET'])
+@login_required
+def status(id_tarefa):
+    """ Retorna a situação e o progresso de uma tarefa em segundo plano """
+    _tarefa_do_usuario(id_tarefa)
+    return resposta_tarefa(id_tarefa)
+
+
+@bp.route('/<id_tarefa>/resultado', methods=['GET'])
+@login_required
+def resultado(id_tarefa):
+    """ Envia o arquivo gerado por uma tarefa concluída """
+    estado = _tarefa_do_usuario(id_tarefa)
+    dados = estado['resultado'] or {}
+    if estado['status'] != CONCLUIDA or not dados.get('arquivo'):
+        return jsonify({"erro": "A tarefa não possui arquivo de resultado disponível."}), 409
+
+    caminho = gerenciador_tarefas.caminho_arquivo(os.path.basename(dados['arquivo']))
+    if not os.path.exists(caminho):
+        return jsonify({"erro": "O arquivo de resultado expirou."}), 410
+
+    return send_file(caminho, mimetype=dados.get('mimetype'), as_attachment=True,
+                     download_name=dados.get('nome_download'), max_age=0)
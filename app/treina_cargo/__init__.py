@@ -0,0 +1,5 @@
+from flask import Blueprint
+
+bp = Blueprint('treina_cargo', __name__)
+
+from app.treina_cargo import routes
@@ -0,0 +1,121 @@
+from datetime import date
+from sqlalchemy import select
+from app.extensions import db
+from app.centrodecusto.models import CentroCusto
+from app.colaborador.models import Colaborador
+from app.departamento.models import Departamento
+from app.treina_cargo.models import TreinaCargo
+from app.treina_colaborador.conformidade import ultimas_conclusoes, ultima_valida
+
+# Agrupamentos aceitos no resumo: nome do parâmetro -> (coluna do ID, coluna do nome)
+AGRUPAMENTOS = {
+    'departamento': ('ID_DEPARTAMENTO', 'NOME_DEPARTAMENTO'),
+    'centrodecusto': ('ID_CENTRODECUSTO', 'NOME_CENTRODECUSTO'),
+}
+
+
+def _dataframe(query, colunas):
+    """ Executa a consulta e monta o DataFrame diretamente das tuplas retornadas """
+    # pandas e numpy são importados apenas quando a análise é executada: a importação custa
+    # centenas de milissegundos e dezenas de MB, que cada processo pagaria na inicialização
+    import pandas as pd
+    return pd.DataFrame.from_records(db.session.execute(query).all(), columns=colunas)
+
+
+def carregar_dados(hoje=None):
+    """
+    Carrega, em três consultas, os dados necessários para a análise de lacunas:
+        requisitos: treinamentos exigidos por cargo (TBTREINA_CARGO)
+        colaboradores: colaboradores ativos com cargo, departamento e centro de custo
+        conclusoes: pares (colaborador, treinamento) cuja última conclusão é válida na data de referência
+    """
+    hoje = hoje or date.today()
+
+    requisitos = _dataframe(
+        select(TreinaCargo.ID_CARGO, TreinaCargo.ID_TREINAMENTO).distinct(),
+        ['ID_CARGO', 'ID_TREINAMENTO']
+    )
+
+    colaboradores = _dataframe(
+        select(
+            Colaborador.ID_COLABORADOR, Colaborador.ID_CARGO,
+            Colaborador.ID_DEPARTAMENTO, Departamento.NOME_DEPARTAMENTO,
+            Departamento.ID_CENTRODECUSTO, CentroCusto.NOME_CENTRODECUSTO
+        ).join(Departamento, Departamento.ID_DEPARTAMENTO == Colaborador.ID_DEPARTAMENTO)
+         .outerjoin(CentroCusto, CentroCusto.ID_CENTRODECUSTO == Departamento.ID_CENTRODECUSTO)
+         .where(Colaborador.STATUS == True),
+        ['ID_COLABORADOR', 'ID_CARGO', 'ID_DEPARTAMENTO', 'NOME_DEPARTAMENTO', 'ID_CENTRODECUSTO', 'NOME_CENTRODECUSTO']
+    )
+    colaboradores['ID_CENTRODECUSTO'] = colaboradores['ID_CENTRODECUSTO'].astype('Int64')  # Departamento sem centro de custo
+    # Os nomes se repetem em milhares de linhas; como categoria, cada nome é armazenado uma vez
+    colaboradores['NOME_DEPARTAMENTO'] = colaboradores['NOME_DEPARTAMENTO'].astype('category')
+    colaboradores['NOME_CENTRODECUSTO'] = colaboradores['NOME_CENTRODECUSTO'].astype('category')
+
+    # Conclusão válida: a mais recente de cada par (as anteriores já foram substituídas),
+    # sem validade ou com DATA_VALIDADE ainda não vencida, como na consulta de vencimentos
+    ultimas = ultimas_conclusoes()
+    conclusoes = _dataframe(
+        select(ultimas.c.ID_COLABORADOR, ultimas.c.ID_TREINAMENTO).where(ultima_valida(ultimas, hoje)),
+        ['ID_COLABORADOR', 'ID_TREINAMENTO']
+    )
+
+    return requisitos, colaboradores, conclusoes
+
+
+def _chave_par(id_colaborador, id_treinamento):
+    """ Codifica cada par (colaborador, treinamento) em um único inteiro de 64 bits """
+    import numpy as np
+    return (id_colaborador.to_numpy(dtype=np.int64) << 32) | id_treinamento.to_numpy(dtype=np.int64)
+
+
+def calcular_lacunas(requisitos, colaboradores, conclusoes):
+    """
+    Calcula a matriz de exigências: uma linha por (colaborador, treinamento exigido pelo cargo),
+    com a coluna CUMPRIDO indicando se há conclusão válida.
+    A comparação é vetorizada: os pares são codificados em inteiros e testados com np.isin.
+    """
+    import numpy as np
+    exigidos = colaboradores.merge(requisitos, on='ID_CARGO', how='inner')
+    exigidos['CUMPRIDO'] = np.isin(
+        _chave_par(exigidos['ID_COLABORADOR'], exigidos['ID_TREINAMENTO']),
+        _chave_par(conclusoes['ID_COLABORADOR'], conclusoes['ID_TREINAMENTO'])
+    )
+    return exigidos
+
+
+def resumir(exigidos, agrupamento):
+    """
+    Resume a matriz de exigências por departamento ou centro de custo:
+    total exigido, total cumprido, lacunas, percentual de conformidade e colaboradores com lacuna.
+    """
+    coluna_id, coluna_nome = AGRUPAMENTOS[agrupamento]
+    chaves = [coluna_id, coluna_nome]
+
+    resumo = exigidos.groupby(chaves, dropna=False, observed=True).agg(
+        EXIGIDOS=('CUMPRIDO', 'size'),
+        CUMPRIDOS=('CUMPRIDO', 'sum')
+    )
+    pendentes = exigidos.loc[~exigidos['CUMPRIDO']]
+    resumo['COLABORADORES_COM_LACUNA'] = pendentes.groupby(chaves, dropna=False, observed=True)['ID_COLABORADOR'].nunique()
+    resumo = resumo.fillna({'COLABORADORES_COM_LACUNA': 0}).reset_index()
+
+    resumo['LACUNAS'] = resumo['EXIGIDOS'] - resumo['CUMPRIDOS']
+    resumo['PERCENTUAL_CONFORMIDADE'] = (100 * resumo['CUMPRIDOS'] / resumo['EXIGIDOS']).round(2)
+
+    resumo = resumo.astype({'EXIGIDOS': int, 'CUMPRIDOS': int, 'LACUNAS': int, 'COLABORADORES_COM_LACUNA': int})
+    resumo = resumo.sort_values('PERCENTUAL_CONFORMIDADE')
+    resumo = resumo.astype(object).where(resumo.notna(), None)  # NaN -> None para serialização em JSON
+    return resumo.to_dict(orient='records')
+
+
+def analisar_lacunas(agrupamento='departamento', hoje=None):
+    """ Executa a análise completa e retorna o resumo no agrupamento informado """
+    exigidos = calcular_lacunas(*carregar_dados(hoje))
+    total_cumpridos = int(exigidos['CUMPRIDO'].sum())
+    return {
+        'agrupamento': agrupamento,
+        'total_exigidos': len(exigidos),
+        'total_cumpridos': total_cumpridos,
+        'total_lacunas': len(exigidos) - total_cumpridos,
+        'resumo': resumir(exigidos, agrupamento)
+    }
@@ -0,0 +1,10 @@
+from app.extensions import db
+
+class TreinaCargo(db.Model):
+    __tablename__ = 'TBTREINA_CARGO'
+    ID_TREINACARGO = db.Column(db.Integer, primary_key=True, autoincrement=True)
+    ID_CARGO = db.Column(db.Integer, db.ForeignKey('TBCARGO.ID_CARGO'), nullable=False)
+    ID_TREINAMENTO = db.Column(db.Integer, db.ForeignKey('TBTREINAMENTO.ID_TREINAMENTO'), nullable=False)
+
+    def __repr__(self):
+        return f'<TreinaCargo {self.ID_CARGO}/{self.ID_TREINAMENTO}>'
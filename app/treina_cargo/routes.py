@@ -0,0 +1,22 @@
+from flask import request, jsonify
+from flask_login import login_required
+from app.diagnostico import limite_queries
+from app.treina_cargo import bp
+from app.treina_cargo.lacunas import analisar_lacunas, AGRUPAMENTOS
+
+
+@bp.route('/lacunas', methods=['GET'])
+@limite_queries(4)
+@login_required
+def lacunas():
+    """
+    Retorna, em JSON, a análise de lacunas de treinamentos obrigatórios por cargo:
+    quantos treinamentos exigidos cada departamento (ou centro de custo) possui e quantos foram cumpridos.
+    Parâmetros (query string):
+        agrupar: departamento (padrão) ou centrodecusto
+    """
+    agrupamento = request.args.get('agrupar', 'departamento')
+    if agrupamento not in AGRUPAMENTOS:
+        return jsonify({"erro": "Agrupamento inválido. Use departamento ou centrodecusto."}), 400
+
+    return jsonify(analisar_lacunas(agrupamento))
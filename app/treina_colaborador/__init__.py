@@ -0,0 +1,5 @@
+from flask import Blueprint
+
+bp = Blueprint('treina_colaborador', __name__)
+
+from app.treina_colaborador import routes
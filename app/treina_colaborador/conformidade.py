@@ -0,0 +1,208 @@
+import calendar
+import re
+from datetime import date, timedelta
+from sqlalchemy import select, func, case, and_, or_
+from app.extensions import db
+from app.colaborador.models import Colaborador
+from app.treinamento.models import Treinamento
+from app.treina_colaborador.models import TreinaColaborador
+
+# Situações retornadas pela consulta de conformidade
+VENCIDO = 'VENCIDO'
+A_VENCER = 'A_VENCER'
+
+# Periodicidades aceitas em TBTREINAMENTO.FREQUENCIA, em meses
+MESES_POR_FREQUENCIA = {
+    'MENSAL': 1,
+    'BIMESTRAL': 2,
+    'TRIMESTRAL': 3,
+    'SEMESTRAL': 6,
+    'ANUAL': 12,
+    'BIENAL': 24,
+    'TRIENAL': 36,
+}
+
+
+def _somar_meses(data, meses):
+    """ Soma meses a uma data, ajustando o dia para o último dia do mês quando necessário """
+    mes = data.month - 1 + meses
+    ano = data.year + mes // 12
+    mes = mes % 12 + 1
+    dia = min(data.day, calendar.monthrange(ano, mes)[1])
+    return date(ano, mes, dia)
+
+
+def calcular_data_validade(data_treinamento, frequencia):
+    """
+    Calcula a data de vencimento de um treinamento a partir da sua FREQUENCIA.
+    Aceita os nomes de MESES_POR_FREQUENCIA ou textos como '12 meses' / '2 anos'.
+    Retorna None se a frequência não for reconhecida.
+    """
+    if not data_treinamento or not frequencia:
+        return None
+
+    texto = frequencia.strip().upper()
+    meses = MESES_POR_FREQUENCIA.get(texto)
+    if meses is None:
+        encontrado = re.match(r'^(\d+)\s*(MES|MESES|ANO|ANOS)$', texto)
+        if not encontrado:
+            return None
+        meses = int(encontrado.group(1)) * (12 if encontrado.group(2).startswith('ANO') else 1)
+
+    return _somar_meses(data_treinamento, meses)
+
+
+def ultimas_conclusoes(*filtros):
+    """
+    Subconsulta com os registros de cada colaborador em cada treinamento, numerados por ROW_NUMBER()
+    sobre (ID_COLABORADOR, ID_TREINAMENTO) do mais recente (maior DATA_TREINAMENTO) para o mais antigo.
+    A numeração considera todos os registros: a última conclusão é a de ORDEM = 1, e quem consulta
+    filtra VALIDADE_TREINAMENTO depois dela. Assim, se o registro mais recente não tiver validade
+    (ou tiver sido invalidado), um registro anterior já substituído não volta a ser considerado.
+    O índice IX_TBTREINA_COLABORADOR_ULTIMA entrega as linhas já nessa ordem.
+    filtros: condições sobre TBTREINA_COLABORADOR aplicadas antes da numeração (ex.: colaboradores
+    de um departamento), para que a janela não percorra a tabela inteira.
+    """
+    ordem = func.row_number().over(
+        partition_by=(TreinaColaborador.ID_COLABORADOR, TreinaColaborador.ID_TREINAMENTO),
+        order_by=(TreinaColaborador.DATA_TREINAMENTO.desc(), TreinaColaborador.ID_TREINACOLABORADOR.desc())
+    ).label('ORDEM')
+
+    consulta = select(
+        TreinaColaborador.ID_COLABORADOR,
+        TreinaColaborador.ID_TREINAMENTO,
+        TreinaColaborador.DATA_TREINAMENTO,
+        TreinaColaborador.DATA_VALIDADE,
+        TreinaColaborador.VALIDADE_TREINAMENTO,
+        ordem
+    )
+    if filtros:
+        consulta = consulta.where(*filtros)
+    return consulta.subquery('ULTIMAS')
+
+
+def ultima_com_validade(ultimas):
+    """ Condição sobre ultimas_conclusoes(): a última conclusão, quando ela vence (possui DATA_VALIDADE) """
+    return and_(
+        ultimas.c.ORDEM == 1,
+        ultimas.c.VALIDADE_TREINAMENTO == True,
+        ultimas.c.DATA_VALIDADE.isnot(None)
+    )
+
+
+def ultima_valida(ultimas, hoje):
+    """
+    Condição sobre ultimas_conclusoes(): a última conclusão está válida na data de referência
+    (treinamento sem validade ou DATA_VALIDADE ainda não vencida)
+    """
+    return and_(
+        ultimas.c.ORDEM == 1,
+        or_(ultimas.c.VALIDADE_TREINAMENTO == False, ultimas.c.DATA_VALIDADE >= hoje)
+    )
+
+
+def consulta_vencimentos(dias, situacao=None, id_departamento=None, hoje=None):
+    """
+    Monta a consulta (set-based, sem laços em Python) dos colaboradores ativos com treinamentos
+    vencidos ou que vencem nos próximos `dias` dias, considerando apenas a conclusão mais recente.
+    Parâmetros:
+        dias (int): Horizonte, em dias, para treinamentos a vencer.
+        situacao (str, opcional): VENCIDO, A_VENCER ou None para ambos.
+        id_departamento (int, opcional): Restringe a um departamento.
+        hoje (date, opcional): Data de referência (padrão: data atual).
+    """
+    hoje = hoje or date.today()
+    limite = hoje + timedelta(days=dias)
+
+    # O departamento é aplicado antes da numeração, para que a janela percorra apenas os seus colaboradores
+    filtros = []
+    if id_departamento:
+        filtros.append(TreinaColaborador.ID_COLABORADOR.in_(
+            select(Colaborador.ID_COLABORADOR).where(Colaborador.ID_DEPARTAMENTO == id_departamento)))
+    ultimas = ultimas_conclusoes(*filtros)
+
+    query = select(
+        ultimas.c.ID_COLABORADOR,
+        Colaborador.MATRICULA,
+        Colaborador.NOME_COLABORADOR,
+        Colaborador.ID_DEPARTAMENTO,
+        ultimas.c.ID_TREINAMENTO,
+        Treinamento.NOME_TREINAMENTO,
+        ultimas.c.DATA_TREINAMENTO,
+        ultimas.c.DATA_VALIDADE,
+        case((ultimas.c.DATA_VALIDADE < hoje, VENCIDO), else_=A_VENCER).label('SITUACAO')
+    ).join(
+        Colaborador, Colaborador.ID_COLABORADOR == ultimas.c.ID_COLABORADOR
+    ).join(
+        Treinamento, Treinamento.ID_TREINAMENTO == ultimas.c.ID_TREINAMENTO
+    ).where(
+        ultima_com_validade(ultimas),
+        Colaborador.STATUS == True
+    )
+
+    if situacao == VENCIDO:
+        query = query.where(ultimas.c.DATA_VALIDADE < hoje)
+    elif situacao == A_VENCER:
+        query = query.where(ultimas.c.DATA_VALIDADE >= hoje, ultimas.c.DATA_VALIDADE <= limite)
+    else:
+        query = query.where(ultimas.c.DATA_VALIDADE <= limite)
+
+    return query
+
+
+def listar_vencimentos(dias, situacao=None, id_departamento=None, pagina=1, por_pagina=50, contar_total=False):
+    """
+    Executa a consulta de vencimentos e retorna uma página do resultado, ordenada por DATA_VALIDADE.
+    O total só é calculado quando solicitado (contar_total), pois exige uma segunda consulta.
+    """
+    query = consulta_vencimentos(dias, situacao, id_departamento)
+
+    pagina_query = query.order_by(
+        query.selected_columns.DATA_VALIDADE,
+        query.selected_columns.ID_COLABORADOR,
+        query.selected_columns.ID_TREINAMENTO
+    ).offset((pagina - 1) * por_pagina).limit(por_pagina)
+
+    itens = [{
+        'ID_COLABORADOR': linha.ID_COLABORADOR,
+        'MATRICULA': linha.MATRICULA,
+        'NOME_COLABORADOR': linha.NOME_COLABORADOR,
+        'ID_DEPARTAMENTO': linha.ID_DEPARTAMENTO,
+        'ID_TREINAMENTO': linha.ID_TREINAMENTO,
+        'NOME_TREINAMENTO': linha.NOME_TREINAMENTO,
+        'DATA_TREINAMENTO': linha.DATA_TREINAMENTO.isoformat() if linha.DATA_TREINAMENTO else None,
+        'DATA_VALIDADE': linha.DATA_VALIDADE.isoformat(),
+        'SITUACAO': linha.SITUACAO
+    } for linha in db.session.execute(pagina_query)]
+
+    resultado = {'itens': itens, 'pagina': pagina, 'por_pagina': por_pagina}
+    if contar_total:
+        resultado['total'] = db.session.execute(
+            select(func.count()).select_from(query.subquery())
+        ).scalar()
+    return resultado
+
+
+# Colunas da exportação de vencimentos e seus tipos no Parquet (app/colunar.py)
+COLUNAS_EXPORTACAO = [
+    ('ID_COLABORADOR', 'inteiro'),
+    ('MATRICULA', 'inteiro'),
+    ('NOME_COLABORADOR', 'texto'),
+    ('ID_DEPARTAMENTO', 'inteiro'),
+    ('ID_TREINAMENTO', 'inteiro'),
+    ('NOME_TREINAMENTO', 'texto'),
+    ('DATA_TREINAMENTO', 'data'),
+    ('DATA_VALIDADE', 'data'),
+    ('SITUACAO', 'texto'),
+]
+
+
+def iterar_vencimentos(dias, situacao=None, id_departamento=None, tamanho_lote=1000):
+    """
+    Percorre todos os vencimentos da consulta em lotes (yield_per), ordenados por DATA_VALIDADE,
+    devolvendo uma lista de valores por linha na ordem de COLUNAS_EXPORTACAO (datas como date).
+    """
+    query = consulta_vencimentos(dias, situacao, id_departamento)
+    query = query.order_by(query.selected_columns.DATA_VALIDADE, query.selected_columns.ID_COLABORADOR)
+    for linha in db.session.execute(query.execution_options(yield_per=tamanho_lote)):
+        yield [getattr(linha, coluna) for coluna, _ in COLUNAS_EXPORTACAO]
@@ -0,0 +1,43 @@
+from sqlalchemy import event, inspect, select
+from app.extensions import db
+from app.treinamento.models import Treinamento
+
+class TreinaColaborador(db.Model):
+    __tablename__ = 'TBTREINA_COLABORADOR'
+    __table_args__ = (
+        # Índice de cobertura da consulta de conformidade (última conclusão; ver scriptBD.sql)
+        db.Index('IX_TBTREINA_COLABORADOR_ULTIMA', 'ID_COLABORADOR', 'ID_TREINAMENTO', 'DATA_TREINAMENTO'),
+    )
+    ID_TREINACOLABORADOR = db.Column(db.Integer, primary_key=True, autoincrement=True)
+    ID_COLABORADOR = db.Column(db.Integer, db.ForeignKey('TBCOLABORADOR.ID_COLABORADOR'), nullable=False)
+    ID_TREINAMENTO = db.Column(db.Integer, db.ForeignKey('TBTREINAMENTO.ID_TREINAMENTO'), nullable=False)
+    DATA_TREINAMENTO = db.Column(db.Date, nullable=False)
+    VALIDADE_TREINAMENTO = db.Column(db.Boolean, nullable=False)  # Indica se o treinamento vence
+    DATA_VALIDADE = db.Column(db.Date, nullable=True)  # Data de vencimento (calculada pela FREQUENCIA se não informada)
+    STATUS = db.Column(db.String(50), nullable=True)
+    NECESSIDADE = db.Column(db.String(50), nullable=True)
+    TIPO_TREINAMENTO = db.Column(db.String(50), nullable=True)
+    ARQUIVO_ANEXO = db.Column(db.String(255), nullable=True)
+
+    def __repr__(self):
+        return f'<TreinaColaborador {self.ID_COLABORADOR}/{self.ID_TREINAMENTO}>'
+
+
+@event.listens_for(TreinaColaborador, 'before_insert')
+@event.listens_for(TreinaColaborador, 'before_update')
+def _preencher_data_validade(mapper, connection, alvo):
+    """
+    Pré-calcula DATA_VALIDADE a partir da FREQUENCIA do treinamento quando ela não é informada,
+    para que a consulta de conformidade compare apenas datas já gravadas.
+    Na alteração de DATA_TREINAMENTO ou ID_TREINAMENTO a data é recalculada, salvo se uma nova
+    DATA_VALIDADE for informada na mesma alteração.
+    """
+    atributos = inspect(alvo).attrs
+    base_alterada = atributos.DATA_TREINAMENTO.history.has_changes() or atributos.ID_TREINAMENTO.history.has_changes()
+    informada = alvo.DATA_VALIDADE is not None and atributos.DATA_VALIDADE.history.has_changes()
+    if alvo.VALIDADE_TREINAMENTO and (alvo.DATA_VALIDADE is None or (base_alterada and not informada)):
+        from app.treina_colaborador.conformidade import calcular_data_validade
+        frequencia = connection.execute(
+            select(Treinamento.FREQUENCIA).where(Treinamento.ID_TREINAMENTO == alvo.ID_TREINAMENTO)
+        ).scalar()
+        alvo.DATA_VALIDADE = calcular_data_validade(alvo.DATA_TREINAMENTO, frequencia)
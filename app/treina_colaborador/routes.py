@@ -0,0 +1,75 @@
+from tempfile import SpooledTemporaryFile
+from flask import request, jsonify, current_app, send_file
+from flask_login import login_required
+from app.colunar import escrever_parquet, ParquetIndisponivel, MIMETYPE_PARQUET
+from app.diagnostico import limite_queries
+from app.treina_colaborador import bp
+from app.treina_colaborador.conformidade import (listar_vencimentos, iterar_vencimentos, COLUNAS_EXPORTACAO,
+                                                 VENCIDO, A_VENCER)
+
+
+def _situacao(args):
+    """ Lê o parâmetro situacao (VENCIDO, A_VENCER ou vazio); ValueError se inválido """
+    situacao = (args.get('situacao') or '').upper() or None
+    if situacao not in (None, VENCIDO, A_VENCER):
+        raise ValueError("Situação inválida. Use VENCIDO ou A_VENCER.")
+    return situacao
+
+
+@bp.route('/conformidade', methods=['GET'])
+@limite_queries(3)
+@login_required
+def conformidade():
+    """
+    Retorna, em JSON e paginado, os colaboradores ativos com treinamentos vencidos
+    ou que vencem nos próximos N dias.
+    Parâmetros (query string):
+        dias: horizonte em dias para treinamentos a vencer (padrão: CONFORMIDADE_DIAS_PADRAO)
+        situacao: VENCIDO ou A_VENCER (padrão: ambos)
+        departamento: ID do departamento (opcional)
+        pagina / por_pagina: paginação (por_pagina limitado a CONFORMIDADE_POR_PAGINA_MAX)
+        total: 1 para incluir o total de registros
+    """
+    dias = request.args.get('dias', current_app.config['CONFORMIDADE_DIAS_PADRAO'], type=int)
+    try:
+        situacao = _situacao(request.args)
+    except ValueError as e:
+        return jsonify({"erro": str(e)}), 400
+
+    pagina = max(1, request.args.get('pagina', 1, type=int))
+    por_pagina = request.args.get('por_pagina', current_app.config['CONFORMIDADE_POR_PAGINA'], type=int)
+    por_pagina = max(1, min(por_pagina, current_app.config['CONFORMIDADE_POR_PAGINA_MAX']))
+
+    return jsonify(listar_vencimentos(
+        dias=max(0, dias),
+        situacao=situacao,
+        id_departamento=request.args.get('departamento', type=int),
+        pagina=pagina,
+        por_pagina=por_pagina,
+        contar_total=request.args.get('total') == '1'
+    ))
+
+
+@bp.route('/conformidade/exportar', methods=['GET'])
+@limite_queries(2)
+@login_required
+def exportar_conformidade():
+    """
+    Exporta em Parquet todos os vencimentos da consulta de conformidade (mesmos filtros de /conformidade,
+    sem paginação), com colunas tipadas (inteiros e datas), para consumo pelas ferramentas de BI.
+    """
+    dias = request.args.get('dias', current_app.config['CONFORMIDADE_DIAS_PADRAO'], type=int)
+    try:
+        situacao = _situacao(request.args)
+    except ValueError as e:
+        return jsonify({"erro": str(e)}), 400
+
+    linhas = iterar_vencimentos(max(0, dias), situacao, request.args.get('departamento', type=int),
+                                current_app.config['EXPORTACAO_TAMANHO_LOTE'])
+    output = SpooledTemporaryFile(max_size=current_app.config['EXPORTACAO_MEMORIA_MAX'])
+    try:
+        escrever_parquet(linhas, output, COLUNAS_EXPORTACAO)
+    except ParquetIndisponivel as e:
+        return jsonify({"erro": str(e)}), 501
+    output.seek(0)
+    return send_file(output, mimetype=MIMETYPE_PARQUET, as_attachment=True, download_name="conformidade.parquet")
@@ -0,0 +1,13 @@
+from app.extensions import db
+
+class Treinamento(db.Model):
+    __tablename__ = 'TBTREINAMENTO'
+    ID_TREINAMENTO = db.Column(db.Integer, primary_key=True, autoincrement=True)
+    NOME_TREINAMENTO = db.Column(db.String(150), nullable=False)
+    DESCRICAO = db.Column(db.String(255), nullable=True)
+    CARGA_HORARIA = db.Column(db.Integer, nullable=True)  # Horas
+    FREQUENCIA = db.Column(db.String(50), nullable=True)  # Periodicidade da reciclagem (ex.: Anual, 24 meses)
+    ID_DEPARTAMENTO = db.Column(db.Integer, db.ForeignKey('TBDEPARTAMENTO.ID_DEPARTAMENTO'), nullable=False)
+
+    def __repr__(self):
+        return f'<Treinamento {self.NOME_TREINAMENTO}>'
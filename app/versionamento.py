@@ -0,0 +1,148 @@
+import hashlib
+import os
+import threading
+import time
+from functools import wraps
+from itertools import chain
+from flask import request, session, current_app, make_response
+from flask_login import current_user
+from sqlalchemy import select, update, insert, event
+from sqlalchemy.orm import Session
+from app.extensions import db
+
+# Tabelas com contador de versão em TBVERSAO_TABELA. TBLOG não entra: os logs não são alterados
+# após gravados (detalhes_log usa o próprio ID como ETag) e cada gravação disputaria a mesma linha.
+TABELAS_VERSIONADAS = frozenset({'TBUSUARIO', 'TBROLE', 'TBROLE_PERMISSION', 'TBPERMISSION', 'TBCARGO'})
+
+
+class VersaoTabela(db.Model):
+    """
+    Contador de alterações por tabela, incrementado na mesma transação de cada gravação
+    (ver _registrar_alteracoes). Compõe os ETags das rotas decoradas com @etag_por_versao.
+    """
+    __tablename__ = 'TBVERSAO_TABELA'
+
+    TABELA = db.Column(db.String(50), primary_key=True)
+    VERSAO = db.Column(db.BigInteger, nullable=False, default=0)
+
+
+def incrementar_versoes(conexao, tabelas):
+    """ Incrementa a versão das tabelas (em ordem alfabética, para não inverter a ordem dos bloqueios) """
+    tabelas = sorted(tabelas)
+    tabela = VersaoTabela.__table__
+    resultado = conexao.execute(update(tabela).where(tabela.c.TABELA.in_(tabelas)).values(VERSAO=tabela.c.VERSAO + 1))
+    if resultado.rowcount < len(tabelas):
+        existentes = set(conexao.execute(select(tabela.c.TABELA).where(tabela.c.TABELA.in_(tabelas))).scalars())
+        conexao.execute(insert(tabela), [{'TABELA': nome, 'VERSAO': 1} for nome in tabelas if nome not in existentes])
+
+
+@event.listens_for(Session, 'after_flush')
+def _registrar_alteracoes(sessao, contexto):
+    """ Incrementa a versão das tabelas versionadas cujos registros foram gravados no flush """
+    tabelas = {objeto.__table__.name for objeto in chain(sessao.new, sessao.dirty, sessao.deleted)
+               if hasattr(objeto, '__table__')} & TABELAS_VERSIONADAS
+    if tabelas:
+        incrementar_versoes(sessao.connection(), tabelas)
+        sessao.info['versoes_alteradas'] = True
+
+
+@event.listens_for(Session, 'do_orm_execute')
+def _registrar_comando(estado):
+    """ Comandos INSERT/UPDATE/DELETE executados diretamente pela sessão (ex.: importação em lote) """
+    if not (estado.is_insert or estado.is_update or estado.is_delete):
+        return
+    tabela = getattr(estado.statement, 'table', None)
+    nome = getattr(tabela, 'name', None)
+    if nome in TABELAS_VERSIONADAS:
+        incrementar_versoes(estado.session.connection(), {nome})
+        estado.session.info['versoes_alteradas'] = True
+
+
+@event.listens_for(Session, 'after_commit')
+def _invalidar_apos_commit(sessao):
+    # As versões gravadas por este processo passam a valer imediatamente nele; nos demais, após VERSOES_TTL
+    if sessao.info.pop('versoes_alteradas', False):
+        cache_versoes.invalidar()
+
+
+@event.listens_for(Session, 'after_rollback')
+def _descartar_apos_rollback(sessao):
+    sessao.info.pop('versoes_alteradas', None)
+
+
+class CacheVersoes:
+    """
+    Cópia em memória das versões de TBVERSAO_TABELA, recarregada (uma consulta) após VERSOES_TTL segundos.
+    Permite responder 304 sem acessar o banco; alterações feitas por outros processos
+    são percebidas em no máximo VERSOES_TTL segundos.
+    """
+
+    def __init__(self):
+        self.ttl = 5
+        self._versoes = {}
+        self._expira_em = 0
+        self._lock = threading.Lock()
+        self.versao_aplicacao = ''
+
+    def init_app(self, app):
+        self.ttl = app.config['VERSOES_TTL']
+        self.versao_aplicacao = _versao_templates(app)
+
+    def invalidar(self):
+        self._expira_em = 0
+
+    def obter(self, tabelas):
+        """ Retorna a tupla com a versão atual de cada tabela informada """
+        if time.monotonic() >= self._expira_em:
+            with self._lock:
+                if time.monotonic() >= self._expira_em:
+                    self._versoes = dict(db.session.execute(select(VersaoTabela.TABELA, VersaoTabela.VERSAO)).all())
+                    self._expira_em = time.monotonic() + self.ttl
+        return tuple(self._versoes.get(tabela, 0) for tabela in tabelas)
+
+
+def _versao_templates(app):
+    """ Identifica a versão dos templates (data da última alteração), para que uma implantação invalide os ETags """
+    ultima = 0
+    for raiz, _, arquivos in os.walk(os.path.join(app.root_path, app.template_folder)):
+        for arquivo in arquivos:
+            ultima = max(ultima, os.path.getmtime(os.path.join(raiz, arquivo)))
+    return str(int(ultima))
+
+
+cache_versoes = CacheVersoes()
+
+
+def etag_por_versao(*tabelas):
+    """
+    Decorador de GET condicional: o ETag é calculado a partir da versão das tabelas informadas,
+    da rota e seus parâmetros, do usuário/perfil autenticado e da versão dos templates e assets,
+    sem consultar os dados.
+    Se o navegador enviar o mesmo ETag (If-None-Match), a rota responde 304 sem ser executada
+    (e, com as versões em cache, sem acessar o banco). Deve ser usado abaixo de
+    @login_required/@requires_permission, para que a autorização continue sendo verificada.
+    Apenas GET/HEAD são condicionais; respostas com mensagens flash pendentes não são reaproveitadas.
+    """
+    def decorador(f):
+        @wraps(f)
+        def wrapper(*args, **kwargs):
+            if request.method not in ('GET', 'HEAD'):
+                return f(*args, **kwargs)
+
+            usuario = (current_user.ID_USUARIO, current_user.ID_ROLE) if current_user.is_authenticated else None
+            chave = repr((request.endpoint, sorted(request.view_args.items()), request.query_string,
+                          usuario, cache_versoes.obter(tabelas), cache_versoes.versao_aplicacao,
+                          getattr(current_app.extensions.get('assets'), 'versao', '')))
+            etag = hashlib.sha1(chave.encode('utf-8')).hexdigest()
+
+            if '_flashes' not in session and etag in request.if_none_match:
+                resposta = current_app.response_class(status=304)
+            else:
+                resposta = make_response(f(*args, **kwargs))
+                if resposta.status_code != 200:
+                    return resposta
+            resposta.set_etag(etag)
+            resposta.headers['Cache-Control'] = 'private, no-cache'  # Sempre revalida; reaproveita se não mudou
+            return resposta
+        return wrapper
+    return decorador
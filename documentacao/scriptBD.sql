@@ -111,6 +111,7 @@ CREATE TABLE [dbo].[TBPERMISSION] (
 CREATE TABLE [dbo].[TBROLE_PERMISSION] (
     [ID_ROLE]       INT NOT NULL,
     [ID_PERMISSION] INT NOT NULL,
+    CONSTRAINT [PK_TBROLE_PERMISSION] PRIMARY KEY CLUSTERED ([ID_ROLE] ASC, [ID_PERMISSION] ASC),
     CONSTRAINT [FK_TBROLE_PERMISSION_TBROLE] FOREIGN KEY ([ID_ROLE]) REFERENCES [dbo].[TBROLE]([ID_ROLE]),
     CONSTRAINT [FK_TBROLE_PERMISSION_TBPERMISSION] FOREIGN KEY ([ID_PERMISSION]) REFERENCES [dbo].[TBPERMISSION]([ID_PERMISSION])
 );
@@ -140,7 +141,104 @@ CREATE TABLE [dbo].[TBLOG] (
     [ID_REGISTRO]   INT           NOT NULL,
     [DADOS_ANTERIORES] TEXT, -- Armazenar os dados anteriores em json
     [DADOS_NOVOS] TEXT, -- Armazenar os dados atuais em json
+    [DADOS_ALTERACOES] NVARCHAR (MAX) NULL, -- Campos alterados em json: {campo: [anterior, novo]}
     [DATA_HORA]     DATETIME DEFAULT CURRENT_TIMESTAMP,
     CONSTRAINT [PK_TBLOG] PRIMARY KEY CLUSTERED ([ID_LOG] ASC),
     CONSTRAINT [FK_TBLOG_TBUSUARIO] FOREIGN KEY ([ID_USUARIO]) REFERENCES [dbo].[TBUSUARIO] ([ID_USUARIO])
-);
\ No newline at end of file
+);
+
+-- Índice para a paginação keyset da listagem de logs (ORDER BY DATA_HORA DESC, ID_LOG DESC)
+-- As colunas incluídas cobrem a listagem, evitando lookups na tabela para cada linha
+CREATE NONCLUSTERED INDEX [IX_TBLOG_DATA_HORA_ID_LOG]
+    ON [dbo].[TBLOG] ([DATA_HORA] DESC, [ID_LOG] DESC)
+    INCLUDE ([ID_USUARIO], [ACAO], [TABELA], [ID_REGISTRO]);
+
+-- Bancos já existentes: ALTER TABLE [dbo].[TBLOG] ADD [DADOS_ALTERACOES] NVARCHAR (MAX) NULL;
+
+-- Índice para o filtro por usuário na listagem de logs
+CREATE NONCLUSTERED INDEX [IX_TBLOG_ID_USUARIO_DATA_HORA]
+    ON [dbo].[TBLOG] ([ID_USUARIO], [DATA_HORA] DESC, [ID_LOG] DESC);
+
+-- Índice do histórico de um registro ("todas as alterações do registro 42 de TBUSUARIO")
+CREATE NONCLUSTERED INDEX [IX_TBLOG_TABELA_ID_REGISTRO]
+    ON [dbo].[TBLOG] ([TABELA], [ID_REGISTRO], [DATA_HORA] DESC);
+
+-- Campos alterados por log, gravados junto com o log (busca por "logs em que EMAIL mudou")
+CREATE TABLE [dbo].[TBLOG_CAMPO] (
+    [CAMPO]  NVARCHAR (100) NOT NULL,
+    [ID_LOG] INT            NOT NULL,
+    CONSTRAINT [PK_TBLOG_CAMPO] PRIMARY KEY CLUSTERED ([CAMPO] ASC, [ID_LOG] DESC),
+    CONSTRAINT [FK_TBLOG_CAMPO_TBLOG] FOREIGN KEY ([ID_LOG]) REFERENCES [dbo].[TBLOG] ([ID_LOG])
+);
+
+-- Catálogo dos logs arquivados (flask logs arquivar): uma linha por lote gravado em um arquivo diário
+CREATE TABLE [dbo].[TBLOG_ARQUIVO] (
+    [ID_ARQUIVO]        INT            IDENTITY (1, 1) NOT NULL,
+    [DATA]              DATE           NOT NULL,
+    [ARQUIVO]           NVARCHAR (255) NOT NULL,
+    [ID_LOG_INICIAL]    INT            NOT NULL,
+    [ID_LOG_FINAL]      INT            NOT NULL,
+    [QUANTIDADE]        INT            NOT NULL,
+    [DATA_ARQUIVAMENTO] DATETIME       NOT NULL,
+    CONSTRAINT [PK_TBLOG_ARQUIVO] PRIMARY KEY CLUSTERED ([ID_ARQUIVO] ASC)
+);
+
+CREATE NONCLUSTERED INDEX [IX_TBLOG_ARQUIVO_ID_LOG]
+    ON [dbo].[TBLOG_ARQUIVO] ([ID_LOG_INICIAL], [ID_LOG_FINAL]) INCLUDE ([ARQUIVO]);
+
+CREATE NONCLUSTERED INDEX [IX_TBLOG_ARQUIVO_DATA]
+    ON [dbo].[TBLOG_ARQUIVO] ([DATA]) INCLUDE ([ARQUIVO]);
+
+-- Permissões verificadas pelo decorador @requires_permission (app/autenticacao/permissoes.py)
+-- O perfil 'Administrador' possui todas as permissões, mesmo sem associação em TBROLE_PERMISSION
+INSERT INTO [dbo].[TBPERMISSION] ([NOME_PERMISSION], [DESCRICAO]) VALUES
+    ('GERENCIAR_ACESSO', 'Gerenciar usuários e perfis de acesso'),
+    ('EXCLUIR_CARGO', 'Excluir cargos'),
+    ('IMPORTAR_DADOS', 'Importar planilhas de colaboradores e treinamentos'),
+    ('VISUALIZAR_METRICAS', 'Consultar as métricas de desempenho da aplicação');
+
+-- Índice de cobertura da consulta de conformidade (última conclusão por colaborador e treinamento)
+-- Entrega as linhas já ordenadas para o ROW_NUMBER() OVER (PARTITION BY ID_COLABORADOR, ID_TREINAMENTO
+-- ORDER BY DATA_TREINAMENTO DESC, ID_TREINACOLABORADOR DESC)
+-- Bancos já existentes: DROP INDEX [IX_TBTREINA_COLABORADOR_VALIDADE] ON [dbo].[TBTREINA_COLABORADOR];
+CREATE NONCLUSTERED INDEX [IX_TBTREINA_COLABORADOR_ULTIMA]
+    ON [dbo].[TBTREINA_COLABORADOR] ([ID_COLABORADOR], [ID_TREINAMENTO], [DATA_TREINAMENTO] DESC, [ID_TREINACOLABORADOR] DESC)
+    INCLUDE ([DATA_VALIDADE], [VALIDADE_TREINAMENTO]);
+
+-- Índice para localizar rapidamente os treinamentos que vencem em um intervalo de datas
+CREATE NONCLUSTERED INDEX [IX_TBTREINA_COLABORADOR_DATA_VALIDADE]
+    ON [dbo].[TBTREINA_COLABORADOR] ([DATA_VALIDADE])
+    INCLUDE ([ID_COLABORADOR], [ID_TREINAMENTO], [DATA_TREINAMENTO], [VALIDADE_TREINAMENTO]);
+
+-- Resumo materializado do dashboard, uma linha por departamento (app/dashboard/resumo.py)
+-- PENDENTE é marcado quando os treinamentos do departamento mudam; a linha é recalculada na próxima leitura
+CREATE TABLE [dbo].[TBRESUMO_DEPARTAMENTO] (
+    [ID_DEPARTAMENTO]  INT      NOT NULL,
+    [ID_CENTRODECUSTO] INT      NULL,
+    [TOTAL_EXIGIDOS]   INT      NOT NULL DEFAULT 0,
+    [TOTAL_CUMPRIDOS]  INT      NOT NULL DEFAULT 0,
+    [VENCENDO_MES]     INT      NOT NULL DEFAULT 0,
+    [HORAS_TREINADAS]  INT      NOT NULL DEFAULT 0,
+    [PENDENTE]         BIT      NOT NULL DEFAULT 0,
+    [DATA_ATUALIZACAO] DATETIME NULL,
+    CONSTRAINT [PK_TBRESUMO_DEPARTAMENTO] PRIMARY KEY CLUSTERED ([ID_DEPARTAMENTO] ASC),
+    CONSTRAINT [FK_TBRESUMO_DEPARTAMENTO_TBDEPARTAMENTO] FOREIGN KEY ([ID_DEPARTAMENTO]) REFERENCES [dbo].[TBDEPARTAMENTO] ([ID_DEPARTAMENTO])
+);
+
+-- Versão de cada tabela, incrementada na mesma transação das gravações (app/versionamento.py)
+-- Compõe os ETags das consultas de usuários, perfis e cargos (respostas 304 sem consultar os dados)
+CREATE TABLE [dbo].[TBVERSAO_TABELA] (
+    [TABELA] NVARCHAR (50) NOT NULL,
+    [VERSAO] BIGINT        NOT NULL DEFAULT 0,
+    CONSTRAINT [PK_TBVERSAO_TABELA] PRIMARY KEY CLUSTERED ([TABELA] ASC)
+);
+
+INSERT INTO [dbo].[TBVERSAO_TABELA] ([TABELA], [VERSAO]) VALUES
+    ('TBCARGO', 0), ('TBPERMISSION', 0), ('TBROLE', 0), ('TBROLE_PERMISSION', 0), ('TBUSUARIO', 0);
+
+-- Índice da listagem de cargos no servidor (/cargos/dados, app/tabela_dados.py)
+-- Atende a busca por prefixo (NOME_CARGO LIKE 'texto%') e a ordenação por nome; a chave clusterizada
+-- (ID_CARGO) faz parte do índice e desempata a paginação keyset. DESCRICAO incluída cobre a consulta.
+CREATE NONCLUSTERED INDEX [IX_TBCARGO_NOME_CARGO]
+    ON [dbo].[TBCARGO] ([NOME_CARGO] ASC, [ID_CARGO] ASC)
+    INCLUDE ([DESCRICAO]);
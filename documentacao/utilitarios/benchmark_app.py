@@ -0,0 +1,362 @@
+# benchmark_app.py
+# Benchmark reprodutível das rotas principais: cria a aplicação via create_app() sobre um banco SQLite local,
+# gera dados sintéticos na escala informada e mede latência, queries por requisição e pico de memória
+# de cada cenário (listagem e exportação de logs, cargos, login e APIs JSON de administração),
+# além do custo de inicialização de um processo novo (tempo até a primeira requisição e RSS).
+# O resultado é gravado em JSON (com o commit atual) para comparar regressões entre commits.
+# Uso: python documentacao/utilitarios/benchmark_app.py [--logs 1000000] [--repeticoes 20] [--saida resultado.json]
+import argparse
+import json
+import os
+import platform
+import random
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+
+from app import create_app, diagnostico
+from app.config import Config
+from app.extensions import db, bcrypt
+from app.autenticacao.models import User, Role, Permission, role_permission
+from app.autenticacao.permissoes import (GERENCIAR_ACESSO, EXCLUIR_CARGO, IMPORTAR_DADOS, VISUALIZAR_METRICAS,
+                                         PERFIL_ADMINISTRADOR)
+from app.cargo.models import Cargo
+from app.centrodecusto.models import CentroCusto
+from app.departamento.models import Departamento
+from app.colaborador.models import Colaborador
+from app.logs.models import Log, LogCampo
+
+SENHA = 'benchmark'
+LOGIN_ADMIN = 'admin'
+TAMANHO_LOTE_INSERCAO = 10000
+TABELAS_LOG = ('TBCARGO', 'TBCOLABORADOR', 'TBUSUARIO', 'TBROLE', 'TBTREINA_COLABORADOR')
+ACOES_LOG = ('INSERT', 'UPDATE', 'DELETE')
+
+
+def argumentos():
+    parser = argparse.ArgumentParser(description='Benchmark das rotas principais sobre dados sintéticos (SQLite).')
+    parser.add_argument('--usuarios', type=int, default=200)
+    parser.add_argument('--perfis', type=int, default=10)
+    parser.add_argument('--cargos', type=int, default=500)
+    parser.add_argument('--departamentos', type=int, default=80)
+    parser.add_argument('--colaboradores', type=int, default=20000)
+    parser.add_argument('--logs', type=int, default=200000, help='Linhas geradas em TBLOG (aceita milhões).')
+    parser.add_argument('--dias-logs', type=int, default=365, help='Período coberto pelas datas dos logs.')
+    parser.add_argument('--dias-exportacao', type=int, default=30,
+                        help='Intervalo (últimos N dias) exportado nos cenários /logs/exportar/*; 0 exporta tudo.')
+    parser.add_argument('--repeticoes', type=int, default=20, help='Requisições medidas por cenário.')
+    parser.add_argument('--repeticoes-exportacao', type=int, default=3, help='Requisições medidas por exportação.')
+    parser.add_argument('--aquecimento', type=int, default=2, help='Requisições descartadas antes da medição.')
+    parser.add_argument('--inicializacoes', type=int, default=5,
+                        help='Processos novos usados para medir a inicialização (mediana); 0 desativa.')
+    parser.add_argument('--bcrypt-rounds', type=int, default=Config.BCRYPT_LOG_ROUNDS)
+    parser.add_argument('--banco', help='Arquivo SQLite (padrão: temporário). Um banco existente é reaproveitado.')
+    parser.add_argument('--cenarios', help='Lista de cenários separados por vírgula (padrão: todos).')
+    parser.add_argument('--saida', default='benchmark_app.json', help='Arquivo JSON com os resultados.')
+    parser.add_argument('--semente', type=int, default=42)
+    return parser.parse_args()
+
+
+def configuracao(caminho_banco, args):
+    """ Subclasse de Config para o benchmark: SQLite local, bcrypt na própria requisição e sem limite de login """
+    uri = f'sqlite:///{caminho_banco}'
+
+    class ConfigBenchmark(Config):
+        SECRET_KEY = 'benchmark'
+        SQLALCHEMY_DATABASE_URI = uri
+        SQLALCHEMY_ENGINE_OPTIONS = {}
+        SESSION_COOKIE_SECURE = False  # O cliente de testes usa http
+        BCRYPT_LOG_ROUNDS = args.bcrypt_rounds
+        SENHA_PROCESSOS = 0
+        AUDITORIA_MODO = 'transacional'
+        LIMITADOR_REDIS_URL = None
+        LOGIN_TENTATIVAS_POR_IP = 10 ** 9
+        LOGIN_TENTATIVAS_POR_LOGIN = 10 ** 9
+        TAREFAS_DIRETORIO = os.path.join(os.path.dirname(caminho_banco), 'tarefas_benchmark')
+
+    return ConfigBenchmark
+
+
+def inserir_em_lotes(tabela, linhas):
+    """ Insere as linhas (gerador de dicts) com executemany, em lotes de TAMANHO_LOTE_INSERCAO """
+    lote = []
+    for linha in linhas:
+        lote.append(linha)
+        if len(lote) >= TAMANHO_LOTE_INSERCAO:
+            db.session.execute(tabela.insert(), lote)
+            lote = []
+    if lote:
+        db.session.execute(tabela.insert(), lote)
+    db.session.commit()
+
+
+def gerar_dados(args):
+    """ Cria o esquema a partir dos modelos (equivalente ao scriptBD.sql) e gera os dados sintéticos """
+    gerador = random.Random(args.semente)
+    inicio = time.perf_counter()
+    db.create_all()
+
+    nomes_permissoes = (GERENCIAR_ACESSO, EXCLUIR_CARGO, IMPORTAR_DADOS, VISUALIZAR_METRICAS)
+    inserir_em_lotes(Permission.__table__, (
+        {'ID_PERMISSION': indice, 'NOME_PERMISSION': nome, 'DESCRICAO': nome}
+        for indice, nome in enumerate(nomes_permissoes, start=1)))
+    inserir_em_lotes(Role.__table__, (
+        {'ID_ROLE': indice, 'NOME_ROLE': PERFIL_ADMINISTRADOR if indice == 1 else f'Perfil {indice}',
+         'DESCRICAO': f'Perfil sintético {indice}', 'DATA_CADASTRO': datetime.now()}
+        for indice in range(1, args.perfis + 1)))
+    inserir_em_lotes(role_permission, (
+        {'ID_ROLE': id_role, 'ID_PERMISSION': id_permissao}
+        for id_role in range(2, args.perfis + 1)
+        for id_permissao in range(1, len(nomes_permissoes) + 1) if gerador.random() < 0.5))
+
+    # Todos os usuários compartilham o mesmo hash (apenas o login do administrador é medido)
+    senha = bcrypt.generate_password_hash(SENHA).decode('utf-8')
+    inserir_em_lotes(User.__table__, (
+        {'ID_USUARIO': indice, 'NOME_USUARIO': 'Administrador' if indice == 1 else f'Usuário {indice}',
+         'LOGIN': LOGIN_ADMIN if indice == 1 else f'usuario{indice}', 'SENHA': senha,
+         'EMAIL': f'usuario{indice}@benchmark.local', 'ID_ROLE': 1 if indice == 1 else gerador.randint(1, args.perfis),
+         'ATIVO': True, 'DATA_CADASTRO': datetime.now(), 'ULTIMO_ACESSO': None}
+        for indice in range(1, args.usuarios + 1)))
+
+    inserir_em_lotes(Cargo.__table__, (
+        {'ID_CARGO': indice, 'NOME_CARGO': f'Cargo {indice:05d}', 'DESCRICAO': f'Descrição do cargo {indice}'}
+        for indice in range(1, args.cargos + 1)))
+    qtd_centros = max(1, args.departamentos // 4)
+    inserir_em_lotes(CentroCusto.__table__, (
+        {'ID_CENTRODECUSTO': indice, 'NOME_CENTRODECUSTO': f'Centro {indice}', 'CODIGO_OBRA': indice}
+        for indice in range(1, qtd_centros + 1)))
+    inserir_em_lotes(Departamento.__table__, (
+        {'ID_DEPARTAMENTO': indice, 'NOME_DEPARTAMENTO': f'Departamento {indice}',
+         'ID_CENTRODECUSTO': gerador.randint(1, qtd_centros)}
+        for indice in range(1, args.departamentos + 1)))
+    inserir_em_lotes(Colaborador.__table__, (
+        {'ID_COLABORADOR': indice, 'CPF': f'{indice:011d}', 'MATRICULA': indice,
+         'NOME_COLABORADOR': f'Colaborador {indice}', 'DATA_ADMISSAO': None, 'STATUS': gerador.random() < 0.9,
+         'REGIME_TRABALHO': 'CLT', 'CARGO_GESTAO': False, 'ID_CARGO': gerador.randint(1, args.cargos),
+         'ID_DEPARTAMENTO': gerador.randint(1, args.departamentos)}
+        for indice in range(1, args.colaboradores + 1)))
+
+    # Logs distribuídos uniformemente no período; UPDATEs trazem o diff e a linha em TBLOG_CAMPO
+    agora = datetime.now()
+    periodo = args.dias_logs * 86400
+
+    def logs():
+        for indice in range(1, args.logs + 1):
+            acao = ACOES_LOG[indice % len(ACOES_LOG)]
+            anteriores = {'NOME': f'Registro {indice}', 'DESCRICAO': 'Valor anterior'} if acao != 'INSERT' else None
+            novos = {'NOME': f'Registro {indice}', 'DESCRICAO': 'Valor novo'} if acao != 'DELETE' else None
+            yield {
+                'ID_LOG': indice, 'ID_USUARIO': gerador.randint(1, args.usuarios), 'ACAO': acao,
+                'TABELA': TABELAS_LOG[indice % len(TABELAS_LOG)], 'ID_REGISTRO': gerador.randint(1, 100000),
+                'DADOS_ANTERIORES': json.dumps(anteriores) if anteriores else None,
+                'DADOS_NOVOS': json.dumps(novos) if novos else None,
+                'DADOS_ALTERACOES': json.dumps({'DESCRICAO': ['Valor anterior', 'Valor novo']}) if acao == 'UPDATE' else None,
+                'DATA_HORA': agora - timedelta(seconds=gerador.randint(0, periodo))
+            }
+
+    inserir_em_lotes(Log.__table__, logs())
+    inserir_em_lotes(LogCampo.__table__, (
+        {'CAMPO': 'DESCRICAO', 'ID_LOG': indice}
+        for indice in range(1, args.logs + 1) if ACOES_LOG[indice % len(ACOES_LOG)] == 'UPDATE'))
+    db.session.execute(db.text('ANALYZE'))
+    db.session.commit()
+    return round(time.perf_counter() - inicio, 3)
+
+
+def autenticar(app):
+    cliente = app.test_client()
+    resposta = cliente.post('/auth/login', data={'login': LOGIN_ADMIN, 'senha': SENHA})
+    if resposta.status_code != 302:
+        raise RuntimeError(f'Falha no login do benchmark (HTTP {resposta.status_code})')
+    return cliente
+
+
+def cenarios(app, args):
+    """ Lista de (nome, método, url, dados, repetições, cria_cliente_novo) """
+    filtro = ''
+    if args.dias_exportacao:
+        filtro = '?data_inicio=' + (datetime.now() - timedelta(days=args.dias_exportacao)).strftime('%Y-%m-%d')
+    id_log = max(1, args.logs // 2)
+    id_usuario = max(1, args.usuarios // 2)
+    id_perfil = max(1, args.perfis // 2)
+    lista = [
+        ('login', 'POST', '/auth/login', {'login': LOGIN_ADMIN, 'senha': SENHA}, args.repeticoes, True),
+        ('logs_listagem', 'GET', '/logs/logs', None, args.repeticoes, False),
+        ('logs_pagina', 'GET', '/logs/pagina?limite=200', None, args.repeticoes, False),
+        ('logs_filtro_campo', 'GET', '/logs/logs?campo=DESCRICAO&tabela=TBCARGO', None, args.repeticoes, False),
+        ('logs_detalhes', 'GET', f'/logs/detalhes/{id_log}', None, args.repeticoes, False),
+        ('logs_exportar_csv', 'GET', f'/logs/exportar/csv{filtro}', None, args.repeticoes_exportacao, False),
+        ('logs_exportar_excel', 'GET', f'/logs/exportar/excel{filtro}', None, args.repeticoes_exportacao, False),
+        ('logs_exportar_pdf', 'GET', f'/logs/exportar/pdf{filtro}', None, args.repeticoes_exportacao, False),
+        ('logs_exportar_parquet', 'GET', f'/logs/exportar/parquet{filtro}', None, args.repeticoes_exportacao, False),
+        ('cargos_listagem', 'GET', '/cargos/', None, args.repeticoes, False),
+        ('cargos_dados_busca', 'GET', '/cargos/dados?busca=Cargo%20001&contar=1', None, args.repeticoes, False),
+        ('cargos_dados_pagina', 'GET', f'/cargos/dados?ordem=id&pagina={max(1, args.cargos // 50)}', None,
+         args.repeticoes, False),
+        ('gerenciar_acesso', 'GET', '/auth/gerenciar-acesso', None, args.repeticoes, False),
+        ('api_usuario', 'GET', f'/auth/usuario/{id_usuario}', None, args.repeticoes, False),
+        ('api_perfil', 'GET', f'/auth/perfil/{id_perfil}', None, args.repeticoes, False),
+    ]
+    if args.cenarios:
+        escolhidos = set(args.cenarios.split(','))
+        lista = [cenario for cenario in lista if cenario[0] in escolhidos]
+    return lista
+
+
+def percentil(valores, fracao):
+    """ Percentil pelo método do posto mais próximo """
+    ordenados = sorted(valores)
+    return ordenados[min(len(ordenados) - 1, max(0, round(fracao * len(ordenados)) - 1))]
+
+
+def requisitar(app, cliente, metodo, url, dados, cliente_novo):
+    """ Executa uma requisição consumindo toda a resposta (inclusive streaming); retorna (status, bytes) """
+    if cliente_novo:
+        cliente = app.test_client()
+    resposta = cliente.open(url, method=metodo, data=dados)
+    tamanho = len(resposta.get_data())
+    resposta.close()
+    return resposta.status_code, tamanho
+
+
+def medir(app, cliente, metodo, url, dados, repeticoes, cliente_novo, aquecimento):
+    for _ in range(aquecimento):
+        requisitar(app, cliente, metodo, url, dados, cliente_novo)
+
+    latencias, queries, status, tamanho = [], [], set(), 0
+    for _ in range(repeticoes):
+        with diagnostico.contar_queries() as executadas:
+            inicio = time.perf_counter()
+            codigo, tamanho = requisitar(app, cliente, metodo, url, dados, cliente_novo)
+            latencias.append((time.perf_counter() - inicio) * 1000)
+        queries.append(len(executadas))
+        status.add(codigo)
+
+    # Pico de memória medido em uma execução separada (o tracemalloc deixa as requisições mais lentas)
+    tracemalloc.start()
+    requisitar(app, cliente, metodo, url, dados, cliente_novo)
+    _, pico = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    endpoint = app.url_map.bind('localhost').match(url.split('?')[0], method=metodo)[0]
+    return {
+        'metodo': metodo,
+        'url': url,
+        'status': sorted(status),
+        'repeticoes': repeticoes,
+        'latencia_ms': {
+            'min': round(min(latencias), 3),
+            'media': round(statistics.mean(latencias), 3),
+            'p50': round(percentil(latencias, 0.50), 3),
+            'p95': round(percentil(latencias, 0.95), 3),
+            'p99': round(percentil(latencias, 0.99), 3),
+            'max': round(max(latencias), 3),
+        },
+        'queries': {'min': min(queries), 'max': max(queries)},
+        'limite_queries': getattr(app.view_functions[endpoint], 'limite_queries', None),
+        'bytes_resposta': tamanho,
+        'pico_memoria_python_bytes': pico,
+    }
+
+
+# Executado em um processo novo: importa a aplicação como o wfastcgi e atende a primeira requisição
+CODIGO_INICIALIZACAO = """
+import json
+from app import create_app
+app = create_app()
+app.test_client().get('/auth/login')
+print(json.dumps(app.extensions['diagnostico_inicializacao']))
+"""
+
+
+def medir_inicializacao(repeticoes):
+    """ Mede, em processos novos, importação, create_app(), tempo até a primeira requisição e RSS """
+    raiz = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..'))
+    ambiente = dict(os.environ, DATABASE_URL='sqlite://', SECRET_KEY='benchmark')
+    medicoes = []
+    for _ in range(repeticoes):
+        processo = subprocess.run([sys.executable, '-c', CODIGO_INICIALIZACAO], cwd=raiz, env=ambiente,
+                                  capture_output=True, text=True, check=True)
+        medicoes.append(json.loads(processo.stdout.strip().splitlines()[-1]))
+    return {
+        chave: round(statistics.median(medicao[chave] for medicao in medicoes), 1)
+        for chave in medicoes[0] if all(medicao[chave] is not None for medicao in medicoes)
+    }
+
+
+def commit_atual():
+    try:
+        return subprocess.run(['git', 'rev-parse', 'HEAD'], capture_output=True, text=True,
+                              check=True, cwd=os.path.dirname(os.path.abspath(__file__))).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def main():
+    args = argumentos()
+    diretorio_temporario = None
+    caminho_banco = args.banco
+    if not caminho_banco:
+        diretorio_temporario = tempfile.TemporaryDirectory(prefix='benchmark_app_')
+        caminho_banco = os.path.join(diretorio_temporario.name, 'benchmark.db')
+    caminho_banco = os.path.abspath(caminho_banco)
+    banco_existente = os.path.exists(caminho_banco)
+
+    app = create_app(configuracao(caminho_banco, args))
+    resultados = {}
+    with app.app_context():
+        tempo_geracao = None
+        if not banco_existente:
+            print('Gerando dados sintéticos...')
+            tempo_geracao = gerar_dados(args)
+            print(f'Dados gerados em {tempo_geracao:.1f}s')
+        db.session.remove()
+
+    inicializacao = None
+    if args.inicializacoes:
+        inicializacao = medir_inicializacao(args.inicializacoes)
+        print(f"Inicialização: primeira requisição em {inicializacao.get('primeira_requisicao_ms')} ms, "
+              f"RSS {inicializacao.get('rss_primeira_requisicao_bytes')} bytes")
+
+    cliente = autenticar(app)
+    for nome, metodo, url, dados, repeticoes, cliente_novo in cenarios(app, args):
+        resultados[nome] = medir(app, cliente, metodo, url, dados, repeticoes, cliente_novo, args.aquecimento)
+        latencia = resultados[nome]['latencia_ms']
+        print(f"{nome:24s} p50 {latencia['p50']:9.2f} ms  p95 {latencia['p95']:9.2f} ms  "
+              f"queries {resultados[nome]['queries']['max']:3d}  "
+              f"memória {resultados[nome]['pico_memoria_python_bytes'] / 1024 / 1024:8.1f} MB")
+
+    saida = {
+        'data': datetime.now().isoformat(timespec='seconds'),
+        'commit': commit_atual(),
+        'python': platform.python_version(),
+        'plataforma': platform.platform(),
+        'banco': 'sqlite',
+        'escala': {
+            'usuarios': args.usuarios, 'perfis': args.perfis, 'cargos': args.cargos,
+            'departamentos': args.departamentos, 'colaboradores': args.colaboradores, 'logs': args.logs,
+            'dias_logs': args.dias_logs, 'dias_exportacao': args.dias_exportacao, 'bcrypt_rounds': args.bcrypt_rounds,
+            'banco_reaproveitado': banco_existente,
+        },
+        'tempo_geracao_s': tempo_geracao,
+        'inicializacao': inicializacao,
+        'cenarios': resultados,
+    }
+    with open(args.saida, 'w', encoding='utf-8') as arquivo:
+        json.dump(saida, arquivo, ensure_ascii=False, indent=2)
+    print(f'Resultados gravados em {args.saida}')
+
+    if diretorio_temporario:
+        with app.app_context():
+            db.engine.dispose()
+        diretorio_temporario.cleanup()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,171 @@
+# benchmark_lacunas.py
+# Mede o tempo da análise de lacunas (app/treina_cargo/lacunas.py) sobre dados sintéticos:
+# as três consultas em lote de carregar_dados() (sobre um banco SQLite temporário), o cálculo
+# vetorizado da matriz e os resumos.
+# Uso: python documentacao/utilitarios/benchmark_lacunas.py [colaboradores] [treinamentos]
+import os
+import sys
+import tempfile
+import time
+from datetime import date, timedelta
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+
+from app import create_app
+from app.config import Config
+from app.extensions import db
+from app.cargo.models import Cargo
+from app.centrodecusto.models import CentroCusto
+from app.colaborador.models import Colaborador
+from app.departamento.models import Departamento
+from app.treinamento.models import Treinamento
+from app.treina_cargo.models import TreinaCargo
+from app.treina_colaborador.models import TreinaColaborador
+from app.treina_cargo import lacunas
+from app.treina_cargo.lacunas import carregar_dados, calcular_lacunas, resumir
+
+QTD_COLABORADORES = int(sys.argv[1]) if len(sys.argv) > 1 else 50000
+QTD_TREINAMENTOS = int(sys.argv[2]) if len(sys.argv) > 2 else 500
+QTD_CARGOS = 300
+QTD_DEPARTAMENTOS = 80
+QTD_CENTROS = 20
+TREINAMENTOS_POR_CARGO = (5, 40)  # Mínimo e máximo de treinamentos exigidos por cargo
+TAXA_CONCLUSAO = 0.8  # Fração dos treinamentos exigidos que possuem conclusão válida
+
+gerador = np.random.default_rng(42)
+
+# Treinamentos exigidos por cargo
+requisitos = pd.DataFrame([
+    (id_cargo, id_treinamento)
+    for id_cargo in range(1, QTD_CARGOS + 1)
+    for id_treinamento in gerador.choice(np.arange(1, QTD_TREINAMENTOS + 1),
+                                         size=gerador.integers(*TREINAMENTOS_POR_CARGO), replace=False)
+], columns=['ID_CARGO', 'ID_TREINAMENTO'])
+
+# Colaboradores ativos com cargo, departamento e centro de custo
+departamentos = np.arange(1, QTD_DEPARTAMENTOS + 1)
+centro_por_departamento = gerador.integers(1, QTD_CENTROS + 1, size=QTD_DEPARTAMENTOS + 1)
+id_departamento = gerador.choice(departamentos, size=QTD_COLABORADORES)
+colaboradores = pd.DataFrame({
+    'ID_COLABORADOR': np.arange(1, QTD_COLABORADORES + 1),
+    'ID_CARGO': gerador.integers(1, QTD_CARGOS + 1, size=QTD_COLABORADORES),
+    'ID_DEPARTAMENTO': id_departamento,
+    'NOME_DEPARTAMENTO': pd.Categorical([f'Departamento {d}' for d in id_departamento]),
+    'ID_CENTRODECUSTO': pd.array(centro_por_departamento[id_departamento], dtype='Int64'),
+})
+colaboradores['NOME_CENTRODECUSTO'] = pd.Categorical('Centro ' + colaboradores['ID_CENTRODECUSTO'].astype(str))
+
+# Conclusões válidas: uma amostra dos pares exigidos mais alguns treinamentos não exigidos
+pares = colaboradores[['ID_COLABORADOR', 'ID_CARGO']].merge(requisitos, on='ID_CARGO')
+conclusoes = pd.concat([
+    pares.sample(frac=TAXA_CONCLUSAO, random_state=42)[['ID_COLABORADOR', 'ID_TREINAMENTO']],
+    pd.DataFrame({
+        'ID_COLABORADOR': gerador.integers(1, QTD_COLABORADORES + 1, size=QTD_COLABORADORES),
+        'ID_TREINAMENTO': gerador.integers(1, QTD_TREINAMENTOS + 1, size=QTD_COLABORADORES),
+    })
+]).drop_duplicates()
+
+print(f"Colaboradores: {len(colaboradores)} | Treinamentos: {QTD_TREINAMENTOS} | "
+      f"Requisitos: {len(requisitos)} | Conclusões: {len(conclusoes)}")
+
+
+def gravar_banco(caminho):
+    """ Grava os dados sintéticos em um banco SQLite (esquema criado a partir dos modelos) """
+    class ConfigLacunas(Config):
+        SECRET_KEY = 'benchmark'
+        SQLALCHEMY_DATABASE_URI = f'sqlite:///{caminho}'
+        SQLALCHEMY_ENGINE_OPTIONS = {}
+        TAREFAS_DIRETORIO = os.path.join(os.path.dirname(caminho), 'tarefas')
+        ASSETS_CONSTRUIR_NA_INICIALIZACAO = False
+
+    app = create_app(ConfigLacunas)
+    contexto = app.app_context()
+    contexto.push()
+    db.create_all()
+
+    hoje = date.today()
+    validade = hoje + timedelta(days=365)
+
+    def inserir(modelo, linhas):
+        linhas = list(linhas)
+        for inicio in range(0, len(linhas), 10000):
+            db.session.execute(modelo.__table__.insert(), linhas[inicio:inicio + 10000])
+
+    inserir(CentroCusto, ({'ID_CENTRODECUSTO': i, 'NOME_CENTRODECUSTO': f'Centro {i}', 'CODIGO_OBRA': i}
+                          for i in range(1, QTD_CENTROS + 1)))
+    inserir(Departamento, ({'ID_DEPARTAMENTO': int(i), 'NOME_DEPARTAMENTO': f'Departamento {i}',
+                            'ID_CENTRODECUSTO': int(centro_por_departamento[i])} for i in departamentos))
+    inserir(Cargo, ({'ID_CARGO': i, 'NOME_CARGO': f'Cargo {i}'} for i in range(1, QTD_CARGOS + 1)))
+    inserir(Treinamento, ({'ID_TREINAMENTO': i, 'NOME_TREINAMENTO': f'Treinamento {i}', 'ID_DEPARTAMENTO': 1}
+                          for i in range(1, QTD_TREINAMENTOS + 1)))
+    inserir(Colaborador, ({
+        'ID_COLABORADOR': int(linha.ID_COLABORADOR), 'CPF': f'{linha.ID_COLABORADOR:011d}',
+        'MATRICULA': int(linha.ID_COLABORADOR), 'NOME_COLABORADOR': f'Colaborador {linha.ID_COLABORADOR}',
+        'STATUS': True, 'REGIME_TRABALHO': 'CLT', 'CARGO_GESTAO': False,
+        'ID_CARGO': int(linha.ID_CARGO), 'ID_DEPARTAMENTO': int(linha.ID_DEPARTAMENTO)
+    } for linha in colaboradores.itertuples()))
+    inserir(TreinaCargo, ({'ID_CARGO': int(linha.ID_CARGO), 'ID_TREINAMENTO': int(linha.ID_TREINAMENTO)}
+                          for linha in requisitos.itertuples()))
+    # Metade das conclusões sem validade, metade com validade ainda não vencida
+    inserir(TreinaColaborador, ({
+        'ID_COLABORADOR': int(linha.ID_COLABORADOR), 'ID_TREINAMENTO': int(linha.ID_TREINAMENTO),
+        'DATA_TREINAMENTO': hoje, 'VALIDADE_TREINAMENTO': bool(indice % 2),
+        'DATA_VALIDADE': validade if indice % 2 else None
+    } for indice, linha in enumerate(conclusoes.itertuples())))
+    db.session.commit()
+    return contexto
+
+
+def medir_consultas():
+    """
+    Executa carregar_dados() medindo cada uma das três consultas (execução, leitura das linhas
+    e montagem do DataFrame); retorna os DataFrames, os tempos por consulta e o tempo total.
+    """
+    tempos = []
+    original = lacunas._dataframe
+
+    def medido(query, colunas):
+        inicio = time.perf_counter()
+        quadro = original(query, colunas)
+        tempos.append(time.perf_counter() - inicio)
+        return quadro
+
+    lacunas._dataframe = medido
+    try:
+        inicio = time.perf_counter()
+        dados = carregar_dados()
+        total = time.perf_counter() - inicio
+    finally:
+        lacunas._dataframe = original
+    return dados, tempos, total
+
+
+with tempfile.TemporaryDirectory() as diretorio:
+    inicio = time.perf_counter()
+    contexto = gravar_banco(os.path.join(diretorio, 'lacunas.db'))
+    print(f"Geração do banco SQLite: {time.perf_counter() - inicio:.3f}s")
+
+    (requisitos_db, colaboradores_db, conclusoes_db), tempos_consultas, tempo_carga = medir_consultas()
+    for nome, tempo, quadro in zip(('requisitos', 'colaboradores', 'conclusoes'), tempos_consultas,
+                                   (requisitos_db, colaboradores_db, conclusoes_db)):
+        print(f"Consulta {nome}: {tempo:.3f}s ({len(quadro)} linhas)")
+    print(f"Carga completa (3 consultas e DataFrames): {tempo_carga:.3f}s")
+    db.session.remove()
+    db.engine.dispose()
+    contexto.pop()
+
+inicio = time.perf_counter()
+exigidos = calcular_lacunas(requisitos_db, colaboradores_db, conclusoes_db)
+tempo_matriz = time.perf_counter() - inicio
+
+inicio = time.perf_counter()
+por_departamento = resumir(exigidos, 'departamento')
+por_centro = resumir(exigidos, 'centrodecusto')
+tempo_resumos = time.perf_counter() - inicio
+
+print(f"Pares exigidos: {len(exigidos)} | Lacunas: {int((~exigidos['CUMPRIDO']).sum())}")
+print(f"Matriz de lacunas: {tempo_matriz:.3f}s")
+print(f"Resumos ({len(por_departamento)} departamentos, {len(por_centro)} centros de custo): {tempo_resumos:.3f}s")
+print(f"Total: {tempo_carga + tempo_matriz + tempo_resumos:.3f}s")
@@ -0,0 +1,48 @@
+/***************************************************************
+ *                  FUNÇÕES DO DASHBOARD
+ ***************************************************************/
+
+/**
+ * Desenha um gráfico de barras com plotly.
+ * @param {string} elemento - ID do elemento de destino.
+ * @param {string} titulo - Título do gráfico.
+ * @param {Array} rotulos - Rótulos do eixo X.
+ * @param {Array} valores - Valores do eixo Y.
+ * @param {string} rotuloY - Título do eixo Y.
+ */
+function desenharBarras(elemento, titulo, rotulos, valores, rotuloY) {
+    Plotly.newPlot(elemento, [{ type: 'bar', x: rotulos, y: valores }], {
+        title: titulo,
+        yaxis: { title: rotuloY },
+        margin: { t: 50, b: 120 }
+    }, { responsive: true, displaylogo: false });
+}
+
+/**
+ * Carrega os indicadores de /dashboard/dados e monta os cards e gráficos.
+ */
+function carregarDashboard() {
+    fetch('/dashboard/dados')
+        .then(response => response.json())
+        .then(dados => {
+            const departamentos = dados.departamentos.map(d => d.NOME_DEPARTAMENTO);
+
+            document.getElementById('indicadorConformidade').textContent =
+                dados.percentual_conformidade === null ? '-' : `${dados.percentual_conformidade}%`;
+            document.getElementById('indicadorVencendo').textContent = dados.vencendo_mes;
+            document.getElementById('indicadorHoras').textContent = dados.horas_treinadas;
+            document.getElementById('dashboardAtualizado').textContent =
+                dados.atualizado_em ? new Date(dados.atualizado_em).toLocaleString('pt-BR') : '-';
+
+            desenharBarras('graficoConformidade', 'Conformidade por departamento', departamentos,
+                dados.departamentos.map(d => d.PERCENTUAL_CONFORMIDADE), '%');
+            desenharBarras('graficoVencendo', 'Treinamentos vencendo no mês', departamentos,
+                dados.departamentos.map(d => d.VENCENDO_MES), 'Treinamentos');
+            desenharBarras('graficoHoras', 'Horas treinadas por centro de custo',
+                dados.centros_custo.map(c => c.NOME_CENTRODECUSTO),
+                dados.centros_custo.map(c => c.HORAS_TREINADAS), 'Horas');
+        })
+        .catch(error => console.error('Erro ao carregar o dashboard:', error));
+}
+
+document.addEventListener('DOMContentLoaded', carregarDashboard);
@@ -3,22 +3,59 @@
  ***************************************************************/
 
 /**
- * Exibe os detalhes de um log em um modal.
+ * Escapa caracteres especiais de HTML de um texto.
+ * @param {string} texto - Texto a ser escapado.
+ * @returns {string}
+ */
+function escaparHtml(texto) {
+    const elemento = document.createElement('div');
+    elemento.textContent = texto;
+    return elemento.innerHTML;
+}
+
+/**
+ * Formata um valor do diff para exibição (objetos e listas como JSON).
+ * @param {*} valor - Valor anterior ou novo de um campo.
+ * @returns {string}
+ */
+function formatarValorLog(valor) {
+    if (valor === null || valor === undefined) return '—';
+    return escaparHtml(typeof valor === 'object' ? JSON.stringify(valor) : String(valor));
+}
+
+/**
+ * Exibe os detalhes de um log em um modal, com apenas os campos alterados (anterior → novo).
+ * A resposta traz ETag: aberturas repetidas do mesmo log são atendidas pelo cache do navegador.
+ * A versão do formato (data-formato do modal) entra na URL, para que uma resposta em cache
+ * no formato anterior não seja reaproveitada após uma atualização.
  * @param {number} id - ID do log a ser exibido.
  */
 function mostrarDetalhes(id) {
-    fetch(`/logs/detalhes/${id}`)
+    const formato = document.getElementById("detalhesLogModal").dataset.formato;
+    fetch(`/logs/detalhes/${id}?formato=${formato}`)
         .then(response => response.json())
         .then(data => {
+            const campos = Object.entries(data.ALTERACOES || {});
+            const linhas = campos.map(([campo, [anterior, novo]]) => `
+                <tr>
+                    <td><strong>${escaparHtml(campo)}</strong></td>
+                    <td>${formatarValorLog(anterior)}</td>
+                    <td>${formatarValorLog(novo)}</td>
+                </tr>`).join('');
+
             let detalhes = `
                 <p><strong>ID:</strong> ${data.ID_LOG}</p>
-                <p><strong>Usuário:</strong> ${data.USUARIO}</p>
-                <p><strong>Ação:</strong> ${data.ACAO}</p>
-                <p><strong>Tabela:</strong> ${data.TABELA}</p>
+                <p><strong>Usuário:</strong> ${escaparHtml(data.USUARIO)}</p>
+                <p><strong>Ação:</strong> ${escaparHtml(data.ACAO)}</p>
+                <p><strong>Tabela:</strong> ${escaparHtml(data.TABELA)}</p>
                 <p><strong>ID do Registro:</strong> ${data.ID_REGISTRO}</p>
                 <p><strong>Data/Hora:</strong> ${data.DATA_HORA}</p>
-                <p><strong>Dados Anteriores:</strong> <pre>${data.DADOS_ANTERIORES || 'N/A'}</pre></p>
-                <p><strong>Dados Novos:</strong> <pre>${data.DADOS_NOVOS || 'N/A'}</pre></p>
+                <p><strong>Alterações:</strong></p>
+                ${campos.length ? `
+                <table class="table table-sm table-bordered">
+                    <thead><tr><th>Campo</th><th>Anterior</th><th>Novo</th></tr></thead>
+                    <tbody>${linhas}</tbody>
+                </table>` : '<p>N/A</p>'}
             `;
             document.getElementById("detalhesLogContent").innerHTML = detalhes;
             new bootstrap.Modal(document.getElementById("detalhesLogModal")).show();
@@ -28,10 +65,32 @@ function mostrarDetalhes(id) {
 
 /**
  * Exporta os logs para um dos formatos suportados: CSV, Excel ou PDF.
+ * Os filtros ativos na página (query string) são repassados para a exportação, que é executada
+ * em segundo plano; o progresso é exibido no botão de exportação e o arquivo é baixado ao final.
  * @param {string} formato - Formato do arquivo a ser exportado.
  */
 function exportar(formato) {
-    window.location.href = `/logs/exportar/${formato}`;
+    const botao = document.getElementById('logsBotaoExportar');
+    const textoOriginal = botao ? botao.textContent : '';
+    const exibirProgresso = situacao => {
+        if (!botao) return;
+        const { processadas, total } = situacao.progresso || {};
+        botao.textContent = total ? `Exportando... ${Math.min(100, Math.floor(100 * processadas / total))}%` : 'Exportando...';
+    };
+
+    if (botao) botao.disabled = true;
+    fetch(`/logs/exportar/${formato}${window.location.search}`, { method: 'POST' })
+        .then(response => response.json().then(dados => {
+            if (!response.ok) throw new Error(dados.erro || MENSAGENS.ERRO_CARREGAR);
+            return acompanharTarefa(dados, exibirProgresso);
+        }))
+        .catch(error => showErrorMessage(error.message))
+        .finally(() => {
+            if (botao) {
+                botao.disabled = false;
+                botao.textContent = textoOriginal;
+            }
+        });
 }
 
 /**
@@ -41,6 +100,80 @@ function limparFiltros() {
     window.location.href = window.location.pathname;
 }
 
+/**
+ * Indica se uma página de logs já está sendo carregada (evita requisições duplicadas).
+ */
+let carregandoLogs = false;
+
+/**
+ * Cria uma célula de tabela com o texto informado (textContent evita injeção de HTML).
+ * @param {string|number} texto - Conteúdo da célula.
+ * @returns {HTMLTableCellElement}
+ */
+function criarCelulaLog(texto) {
+    const celula = document.createElement('td');
+    celula.textContent = texto;
+    return celula;
+}
+
+/**
+ * Busca a próxima página de logs (paginação por cursor) e adiciona as linhas ao final da tabela.
+ * Os filtros ativos na URL são reaproveitados na requisição.
+ */
+function carregarMaisLogs() {
+    const tabela = document.getElementById('logsTabela');
+    const cursor = tabela ? tabela.dataset.proximoCursor : '';
+    if (!cursor || carregandoLogs) return;
+
+    carregandoLogs = true;
+    const params = new URLSearchParams(window.location.search);
+    params.set('cursor', cursor);
+
+    fetch(`/logs/pagina?${params.toString()}`)
+        .then(response => response.json())
+        .then(data => {
+            const corpo = document.getElementById('logsCorpo');
+            data.logs.forEach(log => {
+                const linha = document.createElement('tr');
+                [log.ID_LOG, log.USUARIO, log.ACAO, log.TABELA, log.ID_REGISTRO, log.DATA_HORA]
+                    .forEach(valor => linha.appendChild(criarCelulaLog(valor)));
+
+                const celulaBotao = document.createElement('td');
+                const botao = document.createElement('button');
+                botao.className = 'btn btn-sm btn-info';
+                botao.textContent = 'Ver';
+                botao.addEventListener('click', () => mostrarDetalhes(log.ID_LOG));
+                celulaBotao.appendChild(botao);
+                linha.appendChild(celulaBotao);
+
+                corpo.appendChild(linha);
+            });
+
+            tabela.dataset.proximoCursor = data.proximo_cursor || '';
+            if (!data.proximo_cursor) {
+                document.getElementById('logsCarregarMais').classList.add('d-none');
+            }
+        })
+        .catch(error => console.error("Erro ao carregar mais logs:", error))
+        .finally(() => { carregandoLogs = false; });
+}
+
+/**
+ * Inicializa a rolagem infinita da página de logs:
+ * quando o sentinela "Carregar mais" entra na tela, a próxima página é buscada.
+ */
+document.addEventListener('DOMContentLoaded', function () {
+    const sentinela = document.getElementById('logsCarregarMais');
+    if (sentinela && 'IntersectionObserver' in window) {
+        const observer = new IntersectionObserver(entries => {
+            if (entries.some(entry => entry.isIntersecting)) {
+                carregarMaisLogs();
+            }
+        }, { rootMargin: '200px' });
+        observer.observe(sentinela);
+    }
+});
+
 /**
  * Inicializa a tabela de logs utilizando List.js para pesquisa e ordenação.
  */
@@ -47,11 +47,51 @@ function abrirModal(modalId) {
     modal.show();
 }
 
+/**
+ * Intervalo, em milissegundos, entre as consultas da situação de uma tarefa em segundo plano.
+ */
+const INTERVALO_TAREFA = 2000;
+
+/**
+ * Acompanha uma tarefa em segundo plano até sua conclusão, consultando /tarefas/<id>.
+ * Quando a tarefa gera um arquivo, o download é iniciado automaticamente.
+ * @param {object} tarefa - Situação da tarefa retornada pelo servidor (url_status, status...).
+ * @param {function} [aoAtualizar] - Chamada a cada consulta com a situação atual.
+ * @returns {Promise<object>} Situação final da tarefa.
+ */
+function acompanharTarefa(tarefa, aoAtualizar) {
+    return new Promise((resolve, reject) => {
+        const consultar = () => {
+            fetch(tarefa.url_status)
+                .then(response => response.json())
+                .then(situacao => {
+                    if (aoAtualizar) aoAtualizar(situacao);
+                    if (situacao.status === 'CONCLUIDA') {
+                        if (situacao.url_resultado) window.location.href = situacao.url_resultado;
+                        resolve(situacao);
+                    } else if (situacao.status === 'ERRO') {
+                        reject(new Error(situacao.erro || MENSAGENS.ERRO_CARREGAR));
+                    } else {
+                        setTimeout(consultar, INTERVALO_TAREFA);
+                    }
+                })
+                .catch(reject);
+        };
+        consultar();
+    });
+}
+
 /** 
  * Função para exportar dados de uma tabela para um arquivo CSV, Excel ou PDF.
+ * A exportação é executada em segundo plano; o arquivo é baixado quando a tarefa termina.
  */
 function exportar(formato) {
-    window.location.href = "/logs/exportar/" + formato;
+    fetch("/logs/exportar/" + formato + window.location.search, { method: 'POST' })
+        .then(response => response.json().then(dados => {
+            if (!response.ok) throw new Error(dados.erro || MENSAGENS.ERRO_CARREGAR);
+            return acompanharTarefa(dados);
+        }))
+        .catch(error => showErrorMessage(error.message));
 }
 
 
@@ -214,11 +254,6 @@ function initializeDataTable(containerId, valueNames) {
  */
 document.addEventListener('DOMContentLoaded', function () {
     const tables = [
-        {
-            id: 'cargos',
-            columns: ['id', 'nome', 'descricao'],
-            options: { page: 10 }
-        },
         {
             id: 'colaboradores',
             columns: ['id', 'nome', 'cargo', 'departamento'],
@@ -243,6 +278,142 @@ document.addEventListener('DOMContentLoaded', function () {
     });
 });
 
+/***************************************************************
+ *      TABELAS PAGINADAS NO SERVIDOR (app/tabela_dados.py)
+ ***************************************************************/
+
+/**
+ * Inicializa uma tabela cujos dados são buscados, ordenados e paginados no servidor.
+ * O container informa em data-* a URL dos dados, a ordenação e o cursor da próxima página;
+ * as linhas de cada página são criadas a partir do <template class="linha-modelo">.
+ * @param {HTMLElement} container - Elemento com o atributo data-tabela-dados
+ */
+function inicializarTabelaServidor(container) {
+    const corpo = container.querySelector('tbody.list');
+    const modelo = container.querySelector('template.linha-modelo');
+    const campoBusca = container.querySelector('.search');
+    const total = container.querySelector('.total-registros');
+    const estado = {
+        ordem: container.dataset.ordem,
+        direcao: container.dataset.direcao,
+        busca: campoBusca ? campoBusca.value.trim() : '',
+        cursores: [''], // Cursor de cada página visitada ('' = primeira), para o botão Anterior
+        proximoCursor: container.dataset.proximoCursor || null
+    };
+    let requisicao = null;
+    let temporizador = null;
+
+    function atualizarControles() {
+        container.querySelectorAll('th[data-ordem]').forEach(th => {
+            th.classList.toggle('asc', th.dataset.ordem === estado.ordem && estado.direcao === 'asc');
+            th.classList.toggle('desc', th.dataset.ordem === estado.ordem && estado.direcao === 'desc');
+        });
+        container.querySelector('[data-pagina="anterior"]').parentElement
+            .classList.toggle('disabled', estado.cursores.length < 2);
+        container.querySelector('[data-pagina="proxima"]').parentElement
+            .classList.toggle('disabled', !estado.proximoCursor);
+    }
+
+    function renderizar(itens) {
+        const linhas = itens.map(item => {
+            const linha = modelo.content.firstElementChild.cloneNode(true);
+            linha.querySelectorAll('[data-campo]').forEach(celula => {
+                const valor = item[celula.dataset.campo];
+                celula.textContent = valor === null || valor === undefined ? '' : valor;
+            });
+            linha.querySelectorAll('[data-acao]').forEach(botao => { botao.dataset.id = item.id; });
+            return linha;
+        });
+        corpo.replaceChildren(...linhas);
+        corpo.querySelectorAll('[data-bs-toggle="tooltip"]').forEach(el => new bootstrap.Tooltip(el));
+    }
+
+    async function carregar(cursor, contar = false) {
+        const parametros = new URLSearchParams({ ordem: estado.ordem, direcao: estado.direcao });
+        if (estado.busca) parametros.set('busca', estado.busca);
+        if (cursor) parametros.set('cursor', cursor);
+        if (contar) parametros.set('contar', '1');
+
+        // Uma nova busca cancela a anterior, para que respostas atrasadas não sobrescrevam a tabela
+        if (requisicao) requisicao.abort();
+        requisicao = new AbortController();
+        try {
+            const response = await fetch(`${container.dataset.url}?${parametros}`, {
+                signal: requisicao.signal,
+                headers: { 'X-Requested-With': 'XMLHttpRequest' }
+            });
+            const dados = await response.json();
+            if (!response.ok) throw new Error(dados.erro || `Erro HTTP: ${response.status}`);
+
+            renderizar(dados.itens);
+            estado.proximoCursor = dados.proximo_cursor;
+            if (total && dados.total !== null) {
+                total.textContent = `${dados.total} registro(s) encontrado(s)`;
+            }
+            atualizarControles();
+        } catch (error) {
+            if (error.name === 'AbortError') return;
+            console.error('Erro ao carregar a tabela:', error);
+            showErrorMessage(MENSAGENS.ERRO_CARREGAR);
+        }
+    }
+
+    // Busca e ordenação voltam à primeira página; a URL guarda o estado para recarregar a página
+    function recarregar(contar) {
+        estado.cursores = [''];
+        const parametros = new URLSearchParams({ ordem: estado.ordem, direcao: estado.direcao });
+        if (estado.busca) parametros.set('busca', estado.busca);
+        history.replaceState(null, '', `${window.location.pathname}?${parametros}`);
+        carregar('', contar);
+    }
+
+    if (campoBusca) {
+        campoBusca.addEventListener('input', () => {
+            clearTimeout(temporizador);
+            temporizador = setTimeout(() => {
+                const busca = campoBusca.value.trim();
+                if (busca === estado.busca) return;
+                estado.busca = busca;
+                if (total) total.textContent = '';
+                recarregar(Boolean(busca));
+            }, 300);
+        });
+    }
+
+    container.addEventListener('click', event => {
+        const cabecalho = event.target.closest('th[data-ordem]');
+        const paginacao = event.target.closest('[data-pagina]');
+        const acao = event.target.closest('[data-acao]');
+
+        if (cabecalho) {
+            if (cabecalho.dataset.ordem === estado.ordem) {
+                estado.direcao = estado.direcao === 'asc' ? 'desc' : 'asc';
+            } else {
+                estado.ordem = cabecalho.dataset.ordem;
+                estado.direcao = 'asc';
+            }
+            recarregar(false);
+        } else if (paginacao && !paginacao.parentElement.classList.contains('disabled')) {
+            if (paginacao.dataset.pagina === 'proxima') {
+                estado.cursores.push(estado.proximoCursor);
+            } else {
+                estado.cursores.pop();
+            }
+            carregar(estado.cursores[estado.cursores.length - 1]);
+        } else if (acao && acao.dataset.acao === 'editar') {
+            editarRegistro(container.dataset.rota, Number(acao.dataset.id));
+        } else if (acao && acao.dataset.acao === 'excluir') {
+            excluirRegistro(container.dataset.rota, Number(acao.dataset.id), container.dataset.mensagemExcluir);
+        }
+    });
+
+    atualizarControles();
+}
+
+document.addEventListener('DOMContentLoaded', function () {
+    document.querySelectorAll('[data-tabela-dados]').forEach(inicializarTabelaServidor);
+});
+
 /***************************************************************
  *           FUNÇÕES DE MANIPULAÇÃO DE REGISTROS (CRUD)
  ***************************************************************/
@@ -0,0 +1,77 @@
+"""
+Fixtures compartilhadas pelos testes: aplicação com SQLite em diretório temporário
+(create_app com uma subclasse de Config, como o benchmark) e um cliente autenticado.
+
+Uso: python -m pytest tests
+"""
+from datetime import datetime
+
+import pytest
+
+from app import create_app
+from app.config import Config
+from app.extensions import db, bcrypt
+from app.autenticacao.models import User, Role  # Antes de app.logs (ver create_app)
+
+LOGIN = 'admin'
+SENHA = 'senha-testes'
+
+
+@pytest.fixture
+def config_testes(tmp_path):
+    """ Configuração dos testes; cada módulo pode estender a classe antes de criar a aplicação """
+    class ConfigTestes(Config):
+        TESTING = True
+        LIMITE_QUERIES_ATIVO = True
+        SECRET_KEY = 'testes'
+        SQLALCHEMY_DATABASE_URI = f"sqlite:///{tmp_path / 'testes.db'}"
+        SQLALCHEMY_ENGINE_OPTIONS = {}
+        SESSION_COOKIE_SECURE = False  # O cliente de testes usa http
+        BCRYPT_LOG_ROUNDS = 4
+        SENHA_PROCESSOS = 0
+        AUDITORIA_MODO = 'transacional'
+        LIMITADOR_REDIS_URL = None
+        LOGS_ARQUIVO_DIRETORIO = str(tmp_path / 'arquivo_logs')
+        TAREFAS_DIRETORIO = str(tmp_path / 'tarefas')
+        ASSETS_DIRETORIO = str(tmp_path / 'assets')
+        ASSETS_CONSTRUIR_NA_INICIALIZACAO = False
+
+    return ConfigTestes
+
+
+@pytest.fixture
+def app(config_testes):
+    app = create_app(config_testes)
+    with app.app_context():
+        db.create_all()
+    yield app
+    with app.app_context():
+        db.session.remove()
+        db.drop_all()
+
+
+@pytest.fixture
+def contexto(app):
+    """ Contexto da aplicação para os testes que usam db.session diretamente """
+    with app.app_context():
+        yield app
+
+
+def criar_administrador(quantidade_usuarios=1):
+    """ Perfil de administrador e `quantidade_usuarios` usuários com a mesma senha (o primeiro com LOGIN) """
+    agora = datetime.now()
+    senha = bcrypt.generate_password_hash(SENHA).decode('utf-8')
+    db.session.add(Role(ID_ROLE=1, NOME_ROLE='Administrador', DESCRICAO='Administrador', DATA_CADASTRO=agora))
+    db.session.add_all(User(
+        ID_USUARIO=indice, NOME_USUARIO=f'Usuário {indice}', LOGIN=LOGIN if indice == 1 else f'usuario{indice}',
+        SENHA=senha, EMAIL=f'usuario{indice}@testes.local', ID_ROLE=1, ATIVO=True, DATA_CADASTRO=agora
+    ) for indice in range(1, quantidade_usuarios + 1))
+    db.session.flush()
+
+
+def autenticar(app):
+    """ Cliente de testes com a sessão do administrador criado por criar_administrador """
+    cliente = app.test_client()
+    resposta = cliente.post('/auth/login', data={'login': LOGIN, 'senha': SENHA})
+    assert resposta.status_code == 302
+    return cliente
@@ -0,0 +1,102 @@
+"""
+Arquivamento de logs (app/logs/arquivamento.py): logs antigos saem de TBLOG para arquivos gzip por dia
+e continuam disponíveis nos detalhes e na exportação do período.
+"""
+import gzip
+import json
+import os
+from datetime import date, datetime, timedelta
+
+import pytest
+
+from app.extensions import db
+from app.logs.arquivamento import (arquivar_logs, buscar_arquivado, iterar_linhas_arquivadas, diretorio_arquivo,
+                                   _acrescentar, _caminho_relativo)
+from app.logs.models import Log, LogCampo, LogArquivo
+from app.logs.routes import registrar_log
+from conftest import criar_administrador, autenticar
+
+ANTIGO = datetime.combine(date.today() - timedelta(days=400), datetime.min.time())
+DIA_1, DIA_2 = ANTIGO.date(), ANTIGO.date() + timedelta(days=1)
+
+
+def _criar_logs():
+    """ Logs 1 a 3 no primeiro dia antigo, 4 e 5 no dia seguinte e 6 recente """
+    criar_administrador()
+    datas = [ANTIGO + timedelta(hours=1), ANTIGO + timedelta(hours=2), ANTIGO + timedelta(hours=3),
+             ANTIGO + timedelta(days=1, hours=1), ANTIGO + timedelta(days=1, hours=2), datetime.now()]
+    for indice, _ in enumerate(datas, start=1):
+        registrar_log(1, 'UPDATE' if indice % 2 else 'INSERT', 'TBCARGO', indice,
+                      {'NOME_CARGO': 'Antes'}, {'NOME_CARGO': f'Cargo {indice}'})
+    db.session.commit()
+    for log, data_hora in zip(db.session.query(Log).order_by(Log.ID_LOG), datas):
+        log.DATA_HORA = data_hora
+    db.session.commit()
+
+
+@pytest.fixture
+def logs(contexto):
+    _criar_logs()
+
+
+def test_move_somente_os_logs_antigos(logs):
+    assert arquivar_logs(365, 2) == 5
+
+    assert [id_log for (id_log,) in db.session.query(Log.ID_LOG)] == [6]
+    assert db.session.query(LogCampo).filter(LogCampo.ID_LOG != 6).count() == 0
+    assert db.session.query(LogArquivo.DATA).distinct().count() == 2
+    for dia in (DIA_1, DIA_2):
+        assert os.path.exists(os.path.join(diretorio_arquivo(), _caminho_relativo(dia)))
+
+
+def test_lotes_acrescentados_ao_mesmo_arquivo_do_dia(logs):
+    arquivar_logs(365, 2)  # O primeiro dia é gravado em dois lotes (dois membros gzip)
+
+    with gzip.open(os.path.join(diretorio_arquivo(), _caminho_relativo(DIA_1)), 'rt', encoding='utf-8') as arquivo:
+        registros = [json.loads(linha) for linha in arquivo]
+    assert [registro['ID_LOG'] for registro in registros] == [1, 2, 3]
+    assert registros[0]['USUARIO'] == 'Usuário 1'
+    assert registros[0]['CAMPOS'] == ['NOME_CARGO']
+
+
+def test_buscar_arquivado(logs):
+    arquivar_logs(365, 2)
+
+    registro = buscar_arquivado(4)
+    assert (registro['ID_LOG'], registro['ID_REGISTRO']) == (4, 4)
+    assert buscar_arquivado(6) is None  # Ainda em TBLOG
+    assert buscar_arquivado(99) is None
+
+
+def test_detalhes_de_log_arquivado(app):
+    with app.app_context():
+        _criar_logs()
+        arquivar_logs(365, 2)
+    cliente = autenticar(app)
+
+    resposta = cliente.get('/logs/detalhes/2')
+
+    assert resposta.status_code == 200
+    dados = resposta.get_json()
+    assert dados['ALTERACOES'] == {'NOME_CARGO': ['Antes', 'Cargo 2']}
+    assert dados['DATA_HORA'] == (ANTIGO + timedelta(hours=2)).strftime('%d/%m/%Y %H:%M:%S')
+
+
+def test_exportacao_do_periodo_com_filtros(logs):
+    arquivar_logs(365, 2)
+    periodo = {'data_inicio': f'{DIA_1:%Y-%m-%d}', 'data_fim': f'{DIA_2:%Y-%m-%d}'}
+
+    assert [linha[0] for linha in iterar_linhas_arquivadas(periodo)] == [5, 4, 3, 2, 1]
+    assert [linha[0] for linha in iterar_linhas_arquivadas(dict(periodo, acao='update'))] == [5, 3, 1]
+    assert [linha[0] for linha in iterar_linhas_arquivadas({'data_inicio': f'{DIA_2:%Y-%m-%d}'})] == [5, 4]
+    assert list(iterar_linhas_arquivadas({})) == []  # Sem período, somente TBLOG
+
+
+def test_registro_gravado_duas_vezes_exportado_uma_vez(logs):
+    arquivar_logs(365, 10)
+    # Simula um lote reprocessado após falha no commit: o registro já gravado é acrescentado de novo
+    caminho = os.path.join(diretorio_arquivo(), _caminho_relativo(DIA_2))
+    _acrescentar(caminho, [buscar_arquivado(4)])
+
+    periodo = {'data_inicio': f'{DIA_2:%Y-%m-%d}', 'data_fim': f'{DIA_2:%Y-%m-%d}'}
+    assert [linha[0] for linha in iterar_linhas_arquivadas(periodo)] == [5, 4]
@@ -0,0 +1,85 @@
+"""
+Gravador de auditoria (app/logs/auditoria.py): no modo assíncrono os logs só seguem para a fila após
+o commit da alteração, e a fila cheia não prende a requisição além do prazo AUDITORIA_TIMEOUT_FILA.
+"""
+import queue
+import time
+
+import pytest
+
+from app.extensions import db
+from app.logs.auditoria import gravador_auditoria, MODO_ASSINCRONO, POLITICA_BLOQUEAR, POLITICA_DESCARTAR
+from app.logs.models import Log
+from app.logs.routes import registrar_log
+from conftest import criar_administrador
+
+
+@pytest.fixture
+def assincrono(contexto, monkeypatch):
+    """ Modo assíncrono sem a thread de gravação: os logs enviados ficam na fila do teste """
+    criar_administrador()
+    db.session.commit()
+    monkeypatch.setattr(gravador_auditoria, 'modo', MODO_ASSINCRONO)
+    monkeypatch.setattr(gravador_auditoria, 'thread', object())
+    monkeypatch.setattr(gravador_auditoria, 'fila', queue.Queue(maxsize=10))
+    monkeypatch.setattr(gravador_auditoria, 'politica', POLITICA_BLOQUEAR)
+    monkeypatch.setattr(gravador_auditoria, 'timeout_fila', 0.2)
+    monkeypatch.setattr(gravador_auditoria, 'descartados', 0)
+    return gravador_auditoria
+
+
+def _registrar(quantidade):
+    for indice in range(quantidade):
+        registrar_log(1, 'INSERT', 'TBCARGO', indice, None, {'NOME_CARGO': f'Cargo {indice}'})
+
+
+def test_transacional_grava_no_commit_da_alteracao(contexto):
+    criar_administrador()
+    _registrar(1)
+    db.session.rollback()
+    assert db.session.query(Log).count() == 0
+
+    _registrar(1)
+    db.session.commit()
+    assert db.session.query(Log).count() == 1
+
+
+def test_assincrono_enfileira_somente_apos_o_commit(assincrono):
+    _registrar(2)
+    assert assincrono.fila.empty()
+    db.session.rollback()
+    assert assincrono.fila.empty()
+
+    _registrar(2)
+    db.session.commit()
+    assert [assincrono.fila.get_nowait()['ID_REGISTRO'] for _ in range(2)] == [0, 1]
+    assert db.session.query(Log).count() == 0
+
+
+def test_fila_cheia_usa_um_prazo_para_todos_os_logs(assincrono, monkeypatch):
+    assincrono.fila = queue.Queue(maxsize=1)
+    assincrono.fila.put({})
+    gravacoes = []
+    gravar = assincrono._gravar
+    monkeypatch.setattr(assincrono, '_gravar', lambda lote: (gravacoes.append(len(lote)), gravar(lote)))
+
+    _registrar(10)
+    inicio = time.monotonic()
+    db.session.commit()
+    decorrido = time.monotonic() - inicio
+
+    # Um único prazo de 0,2 s (e não 10 x 0,2 s) e os logs restantes gravados em uma transação
+    assert decorrido < 1
+    assert gravacoes == [10]
+    assert db.session.query(Log).count() == 10
+
+
+def test_fila_cheia_com_politica_descartar(assincrono):
+    assincrono.politica = POLITICA_DESCARTAR
+    assincrono.fila = queue.Queue(maxsize=1)
+
+    _registrar(3)
+    db.session.commit()
+
+    assert assincrono.descartados == 2
+    assert db.session.query(Log).count() == 0
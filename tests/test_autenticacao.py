@@ -0,0 +1,25 @@
+"""
+Autenticação (app/autenticacao): login, mensagens exibidas pelo layout e logout.
+"""
+import pytest
+
+from app.extensions import db
+from conftest import LOGIN, criar_administrador, autenticar
+
+
+@pytest.fixture
+def usuarios(contexto):
+    criar_administrador()
+    db.session.commit()
+
+
+def test_login_invalido_exibe_a_mensagem_uma_vez(app, usuarios):
+    resposta = app.test_client().post('/auth/login', data={'login': LOGIN, 'senha': 'errada'})
+    assert resposta.status_code == 200
+    assert resposta.get_data(as_text=True).count('Login ou senha inválidos') == 1
+
+
+def test_logout_exibe_a_mensagem_uma_vez(app, usuarios):
+    cliente = autenticar(app)
+    resposta = cliente.get('/auth/logout', follow_redirects=True)
+    assert resposta.get_data(as_text=True).count('Você foi desconectado com sucesso') == 1
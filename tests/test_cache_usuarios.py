@@ -0,0 +1,86 @@
+"""
+Cache dos usuários autenticados (app/autenticacao/cache.py): acertos não consultam o banco,
+itens expiram após o TTL e as rotas de gerenciamento invalidam o usuário alterado.
+"""
+import pytest
+
+from app.extensions import db
+from app.autenticacao import cache
+from app.autenticacao.cache import CacheUsuarios, UsuarioAutenticado, cache_usuarios
+from app.autenticacao.models import User
+from conftest import SENHA, criar_administrador, autenticar
+
+
+@pytest.fixture
+def relogio(monkeypatch):
+    """ Substitui time.monotonic do módulo do cache por um relógio controlado pelo teste """
+    agora = [1000.0]
+    monkeypatch.setattr(cache.time, 'monotonic', lambda: agora[0])
+    return agora
+
+
+def _usuario(id_usuario):
+    return UsuarioAutenticado(id_usuario, f'Usuário {id_usuario}', f'usuario{id_usuario}', None, 1, True, 'Perfil')
+
+
+def test_item_expira_apos_o_ttl(relogio):
+    usuarios = CacheUsuarios(ttl=60)
+    usuarios.guardar(1, _usuario(1))
+
+    relogio[0] += 59
+    assert usuarios.obter(1).ID_USUARIO == 1
+    relogio[0] += 2
+    assert usuarios.obter(1) is None
+
+
+def test_remove_o_usuario_usado_ha_mais_tempo():
+    usuarios = CacheUsuarios(tamanho_max=2)
+    usuarios.guardar(1, _usuario(1))
+    usuarios.guardar(2, _usuario(2))
+    usuarios.obter(1)
+    usuarios.guardar(3, _usuario(3))
+
+    assert usuarios.obter(2) is None
+    assert usuarios.obter(1) is not None and usuarios.obter(3) is not None
+
+
+@pytest.fixture
+def clientes(app):
+    """ Cliente do administrador e cliente do usuário 2, ambos autenticados """
+    with app.app_context():
+        criar_administrador(quantidade_usuarios=2)
+        db.session.commit()
+    cliente_usuario = app.test_client()
+    resposta = cliente_usuario.post('/auth/login', data={'login': 'usuario2', 'senha': SENHA})
+    assert resposta.status_code == 302
+    return autenticar(app), cliente_usuario
+
+
+def _inativar_no_banco(app, id_usuario):
+    """ Altera o usuário diretamente no banco, sem passar pelas rotas (o cache não é invalidado) """
+    with app.app_context():
+        db.session.get(User, id_usuario).ATIVO = False
+        db.session.commit()
+
+
+def test_usuario_servido_pelo_cache_ate_a_invalidacao(app, clientes):
+    _, cliente_usuario = clientes
+    assert cliente_usuario.get('/auth/usuario/2').status_code == 200
+    assert isinstance(cache_usuarios.obter(2), UsuarioAutenticado)
+
+    _inativar_no_banco(app, 2)
+    assert cliente_usuario.get('/auth/usuario/2').status_code == 200  # Ainda no cache (até o TTL)
+
+    cache_usuarios.invalidar(2)
+    assert cliente_usuario.get('/auth/usuario/2').status_code != 200
+
+
+def test_inativacao_pela_rota_invalida_o_cache(clientes):
+    cliente_admin, cliente_usuario = clientes
+    assert cliente_usuario.get('/auth/usuario/2').status_code == 200
+
+    resposta = cliente_admin.post('/auth/usuario/2/toggle', json={'ativo': False})
+
+    assert resposta.status_code == 200
+    assert cache_usuarios.obter(2) is None
+    assert cliente_usuario.get('/auth/usuario/2').status_code != 200
@@ -0,0 +1,88 @@
+"""
+Listagem de cargos paginada no servidor (app/cargo/routes.py e app/tabela_dados.py):
+página HTML com a primeira página e a API JSON /cargos/dados.
+"""
+import base64
+import json
+
+import pytest
+
+from app.extensions import db
+from app.cargo.models import Cargo
+from conftest import criar_administrador, autenticar
+
+QUANTIDADE_CARGOS = 60
+
+
+def _cursor(ordem, direcao, valores):
+    texto = json.dumps({'o': ordem, 'd': direcao, 'v': valores})
+    return base64.urlsafe_b64encode(texto.encode('utf-8')).decode('ascii')
+
+
+@pytest.fixture
+def cliente(app):
+    with app.app_context():
+        criar_administrador()
+        db.session.add_all(Cargo(ID_CARGO=indice, NOME_CARGO=f'Cargo {indice:03d}', DESCRICAO=f'Descrição {indice}')
+                           for indice in range(1, QUANTIDADE_CARGOS + 1))
+        db.session.commit()
+    return autenticar(app)
+
+
+@pytest.mark.parametrize('url', ['/cargos/', '/cargos/dados'])
+def test_listagem_exige_login(app, url):
+    resposta = app.test_client().get(url)
+    assert resposta.status_code == 302
+    assert '/auth/login' in resposta.headers['Location']
+
+
+def test_pagina_html_exibe_a_primeira_pagina(cliente):
+    resposta = cliente.get('/cargos/')
+    assert resposta.status_code == 200
+    assert 'Cargo 001' in resposta.get_data(as_text=True)
+
+
+def test_dados_percorre_as_paginas_pelo_cursor(cliente):
+    nomes, cursor = [], None
+    while True:
+        url = '/cargos/dados?limite=25' + (f'&cursor={cursor}' if cursor else '')
+        dados = cliente.get(url).get_json()
+        nomes += [item['nome'] for item in dados['itens']]
+        cursor = dados['proximo_cursor']
+        if not cursor:
+            break
+    assert nomes == [f'Cargo {indice:03d}' for indice in range(1, QUANTIDADE_CARGOS + 1)]
+
+
+@pytest.mark.parametrize('url', ['/cargos/?contar=1', '/cargos/dados?contar=1'])
+def test_contagem_dentro_do_limite_de_queries(cliente, url):
+    # Primeira requisição após o login: usuário e versões das tabelas ainda fora do cache
+    assert cliente.get(url).status_code == 200
+
+
+def test_dados_busca_por_prefixo_e_total(cliente):
+    dados = cliente.get('/cargos/dados?busca=Cargo 05&contar=1&ordem=id&direcao=desc').get_json()
+    assert [item['id'] for item in dados['itens']] == list(range(59, 49, -1))
+    assert dados['total'] == 10
+
+
+@pytest.mark.parametrize('parametros', [
+    'ordem=salario', 'direcao=cima', 'cursor=@@', 'limite=dez', 'pagina=0',
+    # Cursores forjados: valores de outro tipo que o da coluna não chegam ao banco
+    f"ordem=id&cursor={_cursor('id', 'asc', ['10', 10])}",
+    f"cursor={_cursor('nome', 'asc', ['Cargo 010', 'dez'])}",
+    f"cursor={_cursor('nome', 'asc', [10, 10])}",
+    f"cursor={_cursor('nome', 'asc', ['Cargo 010', True])}",
+    f"cursor={_cursor('nome', 'asc', ['Cargo 010', 10 ** 30])}",
+    f"cursor={_cursor('nome', 'desc', ['Cargo 010', 10])}",
+])
+def test_parametros_invalidos(cliente, parametros):
+    resposta = cliente.get(f'/cargos/dados?{parametros}')
+    assert resposta.status_code == 400
+    assert resposta.get_json()['erro']
+
+    # A página HTML avisa e exibe a listagem com os parâmetros padrão
+    resposta = cliente.get(f'/cargos/?{parametros}')
+    assert resposta.status_code == 200
+    assert 'Cargo 001' in resposta.get_data(as_text=True)
+    assert resposta.get_data(as_text=True).count('alert-danger') == 1
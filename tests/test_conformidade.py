@@ -0,0 +1,105 @@
+"""
+Conformidade de treinamentos (app/treina_colaborador/conformidade.py): DATA_VALIDADE pré-calculada
+pela FREQUENCIA e consulta de vencimentos sobre a conclusão mais recente de cada treinamento.
+"""
+from datetime import date
+
+import pytest
+
+from app.extensions import db
+from app.cargo.models import Cargo
+from app.colaborador.models import Colaborador
+from app.departamento.models import Departamento
+from app.treina_colaborador.conformidade import calcular_data_validade, consulta_vencimentos, VENCIDO, A_VENCER
+from app.treina_colaborador.models import TreinaColaborador
+from app.treinamento.models import Treinamento
+
+HOJE = date(2024, 6, 1)
+NR35, NR10 = 1, 2
+
+
+@pytest.fixture
+def dados(contexto):
+    db.session.add_all([
+        Departamento(ID_DEPARTAMENTO=1, NOME_DEPARTAMENTO='Produção'),
+        Departamento(ID_DEPARTAMENTO=2, NOME_DEPARTAMENTO='Manutenção'),
+    ])
+    db.session.add(Cargo(ID_CARGO=1, NOME_CARGO='Operador'))
+    db.session.add_all([
+        Treinamento(ID_TREINAMENTO=NR35, NOME_TREINAMENTO='NR-35', FREQUENCIA='Anual', ID_DEPARTAMENTO=1),
+        Treinamento(ID_TREINAMENTO=NR10, NOME_TREINAMENTO='NR-10', FREQUENCIA='24 meses', ID_DEPARTAMENTO=1),
+    ])
+    db.session.add_all(Colaborador(
+        ID_COLABORADOR=indice, CPF=f'000.000.000-0{indice}', MATRICULA=indice, NOME_COLABORADOR=f'Colaborador {indice}',
+        STATUS=True, ID_CARGO=1, ID_DEPARTAMENTO=departamento
+    ) for indice, departamento in ((1, 1), (2, 2)))
+    db.session.flush()
+
+
+def _registro(id_colaborador, id_treinamento, data_treinamento, **campos):
+    registro = TreinaColaborador(ID_COLABORADOR=id_colaborador, ID_TREINAMENTO=id_treinamento,
+                                 DATA_TREINAMENTO=data_treinamento, VALIDADE_TREINAMENTO=campos.pop('validade', True),
+                                 **campos)
+    db.session.add(registro)
+    db.session.flush()
+    return registro
+
+
+def _vencimentos(**parametros):
+    linhas = db.session.execute(consulta_vencimentos(30, hoje=HOJE, **parametros)).all()
+    return sorted((linha.ID_COLABORADOR, linha.ID_TREINAMENTO, linha.SITUACAO) for linha in linhas)
+
+
+@pytest.mark.parametrize('frequencia, esperado', [
+    ('Anual', date(2025, 1, 31)),
+    ('semestral', date(2024, 7, 31)),
+    ('1 mes', date(2024, 2, 29)),  # Ajusta para o último dia do mês
+    ('2 anos', date(2026, 1, 31)),
+    ('Quando necessário', None),
+    (None, None),
+])
+def test_calcular_data_validade(frequencia, esperado):
+    assert calcular_data_validade(date(2024, 1, 31), frequencia) == esperado
+
+
+def test_data_validade_acompanha_data_e_treinamento(dados):
+    registro = _registro(1, NR35, date(2024, 1, 10))
+    assert registro.DATA_VALIDADE == date(2025, 1, 10)
+
+    registro.DATA_TREINAMENTO = date(2024, 3, 5)
+    db.session.flush()
+    assert registro.DATA_VALIDADE == date(2025, 3, 5)
+
+    registro.ID_TREINAMENTO = NR10
+    db.session.flush()
+    assert registro.DATA_VALIDADE == date(2026, 3, 5)
+
+    # Validade informada junto com a alteração prevalece sobre o cálculo
+    registro.DATA_TREINAMENTO = date(2024, 4, 1)
+    registro.DATA_VALIDADE = date(2024, 12, 31)
+    db.session.flush()
+    assert registro.DATA_VALIDADE == date(2024, 12, 31)
+
+
+def test_vencimentos_consideram_apenas_a_conclusao_mais_recente(dados):
+    _registro(1, NR35, date(2023, 1, 10))                  # Venceu em 2024-01-10...
+    _registro(1, NR35, date(2024, 5, 1), validade=False)   # ...mas foi substituído por um registro sem validade
+    _registro(1, NR10, date(2022, 6, 20))                  # Vence em 2024-06-20 (a vencer)
+    _registro(2, NR35, date(2023, 2, 1))                   # Vencido
+
+    assert _vencimentos() == [(1, NR10, A_VENCER), (2, NR35, VENCIDO)]
+    assert _vencimentos(situacao=VENCIDO) == [(2, NR35, VENCIDO)]
+    assert _vencimentos(situacao=A_VENCER) == [(1, NR10, A_VENCER)]
+
+
+def test_vencimentos_por_departamento(dados):
+    _registro(1, NR35, date(2023, 1, 10))
+    _registro(2, NR35, date(2023, 2, 1))
+
+    assert _vencimentos(id_departamento=1) == [(1, NR35, VENCIDO)]
+    assert _vencimentos(id_departamento=2) == [(2, NR35, VENCIDO)]
+
+    # O filtro do departamento é aplicado dentro da subconsulta numerada por ROW_NUMBER()
+    sql = str(consulta_vencimentos(30, id_departamento=1, hoje=HOJE))
+    numeracao = sql[sql.index('row_number()'):sql.index(') AS "ULTIMAS"')]
+    assert '"ID_DEPARTAMENTO"' in numeracao
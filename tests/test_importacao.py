@@ -0,0 +1,77 @@
+"""
+Importação de planilhas (app/importacao): CSVs salvos pelo Excel em português (cp1252) são lidos,
+arquivos em codificação desconhecida são recusados e valores inválidos rejeitam apenas a própria linha.
+"""
+import io
+
+import pytest
+
+from app.extensions import db
+from app.cargo.models import Cargo
+from app.centrodecusto.models import CentroCusto
+from app.colaborador.models import Colaborador
+from app.departamento.models import Departamento
+from app.importacao.importador import Importador, ImportadorColaboradores
+from app.importacao.leitores import ler_csv
+from conftest import criar_administrador, autenticar
+
+CABECALHO = 'CPF;MATRICULA;NOME_COLABORADOR;CARGO;DEPARTAMENTO\n'
+
+
+@pytest.fixture
+def referencias(contexto):
+    criar_administrador()
+    db.session.add(CentroCusto(ID_CENTRODECUSTO=1, NOME_CENTRODECUSTO='Obra 1'))
+    db.session.add(Departamento(ID_DEPARTAMENTO=1, NOME_DEPARTAMENTO='Produção', ID_CENTRODECUSTO=1))
+    db.session.add(Cargo(ID_CARGO=1, NOME_CARGO='Operador'))
+    db.session.commit()
+
+
+def _importar(conteudo):
+    return ImportadorColaboradores(1).executar(io.BytesIO(conteudo), 'colaboradores.csv')
+
+
+@pytest.mark.parametrize('codificacao', ['utf-8-sig', 'utf-8', 'cp1252'])
+def test_csv_com_acentos_em_qualquer_codificacao_aceita(referencias, codificacao):
+    conteudo = (CABECALHO + '111.111.111-11;10;João Conceição;Operador;Produção\n').encode(codificacao)
+
+    resultado = _importar(conteudo)
+
+    assert (resultado['inseridas'], resultado['rejeitadas']) == (1, 0)
+    assert db.session.query(Colaborador.NOME_COLABORADOR).scalar() == 'João Conceição'
+
+
+def test_csv_em_codificacao_desconhecida_recusado():
+    with pytest.raises(ValueError, match='Codificação'):
+        ler_csv(io.BytesIO(CABECALHO.encode() + b'\x81\x8d;1;x;y;z\n'), 100)
+
+
+def test_matricula_fracionaria_rejeita_somente_a_linha(referencias):
+    conteudo = (CABECALHO +
+                '111.111.111-11;123.7;Ana;Operador;Produção\n'
+                '222.222.222-22;124.0;Bruno;Operador;Produção\n').encode('utf-8')
+
+    resultado = _importar(conteudo)
+
+    assert (resultado['inseridas'], resultado['rejeitadas']) == (1, 1)
+    assert resultado['rejeicoes'] == [{'linha': 2, 'motivo': 'MATRICULA deve ser um número inteiro: 123.7'}]
+    assert db.session.query(Colaborador.MATRICULA).scalar() == 124
+
+
+def test_importador_sem_converter_nao_instancia():
+    class ImportadorIncompleto(Importador):
+        tabela = 'TBCOLABORADOR'
+
+    with pytest.raises(TypeError):
+        ImportadorIncompleto(1)
+
+
+def test_upload_em_codificacao_desconhecida_responde_400(app, referencias):
+    cliente = autenticar(app)
+
+    resposta = cliente.post('/importacao/colaboradores', data={
+        'arquivo': (io.BytesIO(CABECALHO.encode() + b'\x81;1;x;y;z\n'), 'colaboradores.csv')
+    })
+
+    assert resposta.status_code == 400
+    assert 'Codificação' in resposta.get_json()['erro']
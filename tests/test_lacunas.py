@@ -0,0 +1,88 @@
+"""
+Análise de lacunas (app/treina_cargo/lacunas.py): um treinamento exigido pelo cargo só é cumprido
+quando a conclusão mais recente do colaborador está válida, como na consulta de vencimentos.
+"""
+from datetime import date
+
+import pytest
+
+from app.extensions import db
+from app.cargo.models import Cargo
+from app.centrodecusto.models import CentroCusto
+from app.colaborador.models import Colaborador
+from app.dashboard.models import ResumoDepartamento
+from app.dashboard.resumo import atualizar_resumo
+from app.departamento.models import Departamento
+from app.treina_cargo.models import TreinaCargo
+from app.treina_cargo.lacunas import carregar_dados, calcular_lacunas, analisar_lacunas
+from app.treina_colaborador.conformidade import consulta_vencimentos, VENCIDO
+from app.treina_colaborador.models import TreinaColaborador
+from app.treinamento.models import Treinamento
+
+HOJE = date(2024, 6, 1)
+RECICLAGEM, INTEGRACAO, SEM_REGISTRO = 1, 2, 3
+
+
+@pytest.fixture
+def dados(contexto):
+    db.session.add(CentroCusto(ID_CENTRODECUSTO=1, NOME_CENTRODECUSTO='Obra 1'))
+    db.session.add(Departamento(ID_DEPARTAMENTO=1, NOME_DEPARTAMENTO='Produção', ID_CENTRODECUSTO=1))
+    db.session.add(Cargo(ID_CARGO=1, NOME_CARGO='Operador'))
+    db.session.add_all([
+        Treinamento(ID_TREINAMENTO=RECICLAGEM, NOME_TREINAMENTO='NR-35', FREQUENCIA='Anual', ID_DEPARTAMENTO=1),
+        Treinamento(ID_TREINAMENTO=INTEGRACAO, NOME_TREINAMENTO='Integração', ID_DEPARTAMENTO=1),
+        Treinamento(ID_TREINAMENTO=SEM_REGISTRO, NOME_TREINAMENTO='NR-10', FREQUENCIA='Anual', ID_DEPARTAMENTO=1),
+    ])
+    db.session.add(Colaborador(ID_COLABORADOR=1, CPF='000.000.000-00', MATRICULA=1, NOME_COLABORADOR='Ana',
+                               STATUS=True, ID_CARGO=1, ID_DEPARTAMENTO=1))
+    db.session.add_all(TreinaCargo(ID_CARGO=1, ID_TREINAMENTO=id_treinamento)
+                       for id_treinamento in (RECICLAGEM, INTEGRACAO, SEM_REGISTRO))
+    db.session.flush()
+    db.session.add_all([
+        # Registro antigo com validade informada ainda vigente, substituído por um mais recente já vencido
+        TreinaColaborador(ID_COLABORADOR=1, ID_TREINAMENTO=RECICLAGEM, DATA_TREINAMENTO=date(2022, 1, 10),
+                          VALIDADE_TREINAMENTO=True, DATA_VALIDADE=date(2025, 1, 10)),
+        TreinaColaborador(ID_COLABORADOR=1, ID_TREINAMENTO=RECICLAGEM, DATA_TREINAMENTO=date(2023, 3, 1),
+                          VALIDADE_TREINAMENTO=True, DATA_VALIDADE=date(2024, 3, 1)),
+        TreinaColaborador(ID_COLABORADOR=1, ID_TREINAMENTO=INTEGRACAO, DATA_TREINAMENTO=date(2020, 5, 1),
+                          VALIDADE_TREINAMENTO=False),
+    ])
+    db.session.commit()
+
+
+def _cumpridos(hoje):
+    exigidos = calcular_lacunas(*carregar_dados(hoje))
+    return dict(zip(exigidos['ID_TREINAMENTO'], exigidos['CUMPRIDO']))
+
+
+def test_registro_mais_recente_vencido_substitui_o_anterior_valido(dados):
+    cumpridos = _cumpridos(HOJE)
+    assert not cumpridos[RECICLAGEM]
+    assert cumpridos[INTEGRACAO]
+    assert not cumpridos[SEM_REGISTRO]
+
+    # A consulta de vencimentos considera o mesmo registro: o treinamento aparece como vencido
+    vencidos = db.session.execute(consulta_vencimentos(30, VENCIDO, hoje=HOJE)).all()
+    assert [(linha.ID_COLABORADOR, linha.ID_TREINAMENTO) for linha in vencidos] == [(1, RECICLAGEM)]
+
+
+def test_nova_conclusao_valida_cumpre_o_requisito(dados):
+    db.session.add(TreinaColaborador(ID_COLABORADOR=1, ID_TREINAMENTO=RECICLAGEM, DATA_TREINAMENTO=date(2024, 5, 20),
+                                     VALIDADE_TREINAMENTO=True))
+    db.session.commit()
+    assert _cumpridos(HOJE)[RECICLAGEM]
+
+
+def test_resumo_por_departamento(dados):
+    resultado = analisar_lacunas('departamento', hoje=HOJE)
+    assert (resultado['total_exigidos'], resultado['total_cumpridos'], resultado['total_lacunas']) == (3, 1, 2)
+    departamento, = resultado['resumo']
+    assert departamento['NOME_DEPARTAMENTO'] == 'Produção'
+    assert departamento['COLABORADORES_COM_LACUNA'] == 1
+    assert departamento['PERCENTUAL_CONFORMIDADE'] == pytest.approx(33.33)
+
+
+def test_resumo_do_dashboard_usa_o_mesmo_criterio(dados):
+    atualizar_resumo(todos=True, hoje=HOJE)
+    resumo = db.session.get(ResumoDepartamento, 1)
+    assert (resumo.TOTAL_EXIGIDOS, resumo.TOTAL_CUMPRIDOS) == (3, 1)
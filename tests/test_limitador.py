@@ -0,0 +1,77 @@
+"""
+Limitador de tentativas de login (app/autenticacao/limitador.py): baldes de tokens por IP e por login,
+reabastecidos ao longo da janela, e resposta 429 da rota de login.
+"""
+import pytest
+
+from app.extensions import db
+from app.autenticacao import limitador
+from app.autenticacao.limitador import BackendMemoria, LimitadorLogin
+from conftest import LOGIN, SENHA, criar_administrador
+
+
+@pytest.fixture
+def relogio(monkeypatch):
+    """ Substitui time.monotonic do módulo do limitador por um relógio controlado pelo teste """
+    agora = [1000.0]
+    monkeypatch.setattr(limitador.time, 'monotonic', lambda: agora[0])
+    return agora
+
+
+def _limitador(capacidade_ip=20, capacidade_login=5, janela=60):
+    limitador_teste = LimitadorLogin()
+    limitador_teste.capacidade_ip, limitador_teste.capacidade_login = capacidade_ip, capacidade_login
+    limitador_teste.janela = janela
+    return limitador_teste
+
+
+def test_balde_esgotado_e_reabastecido_ao_longo_da_janela(relogio):
+    backend = BackendMemoria()
+    assert all(backend.consumir('chave', 5, 5 / 60) for _ in range(5))
+    assert not backend.consumir('chave', 5, 5 / 60)
+
+    relogio[0] += 12  # Um token a cada 12 segundos
+    assert backend.consumir('chave', 5, 5 / 60)
+    assert not backend.consumir('chave', 5, 5 / 60)
+
+
+def test_baldes_cheios_removidos_na_limpeza(relogio):
+    backend = BackendMemoria(intervalo_limpeza=60)
+    backend.consumir('antiga', 5, 5 / 60)
+    relogio[0] += 30
+    for _ in range(5):
+        backend.consumir('recente', 5, 5 / 60)  # Esgotado: volta a ficar cheio em 60 segundos
+
+    relogio[0] += 31  # A chave antiga já se encheu novamente; a recente ainda não
+    backend.consumir('outra', 5, 5 / 60)
+
+    assert set(backend._baldes) == {'recente', 'outra'}
+
+
+def test_limite_por_login_ignora_maiusculas_e_espacos(relogio):
+    limitador_teste = _limitador(capacidade_login=2)
+    assert limitador_teste.permitir('10.0.0.1', 'Admin')
+    assert limitador_teste.permitir('10.0.0.2', ' admin ')
+    assert not limitador_teste.permitir('10.0.0.3', 'ADMIN')
+    assert limitador_teste.permitir('10.0.0.3', 'outro')
+
+
+def test_limite_por_ip_vale_para_qualquer_login(relogio):
+    limitador_teste = _limitador(capacidade_ip=3)
+    assert all(limitador_teste.permitir('10.0.0.1', f'usuario{indice}') for indice in range(3))
+    assert not limitador_teste.permitir('10.0.0.1', 'usuario9')
+    assert limitador_teste.permitir('10.0.0.2', 'usuario9')
+
+
+def test_login_responde_429_ao_exceder_as_tentativas(app, contexto):
+    criar_administrador()
+    db.session.commit()
+    cliente = app.test_client()
+
+    for _ in range(app.config['LOGIN_TENTATIVAS_POR_LOGIN']):
+        assert cliente.post('/auth/login', data={'login': LOGIN, 'senha': 'errada'}).status_code == 200
+    resposta = cliente.post('/auth/login', data={'login': LOGIN, 'senha': SENHA})
+
+    assert resposta.status_code == 429
+    assert resposta.headers['Retry-After'] == str(app.config['LOGIN_JANELA_SEGUNDOS'])
+    assert 'Muitas tentativas de login' in resposta.get_data(as_text=True)
@@ -0,0 +1,70 @@
+"""
+Verifica os limites de queries (@limite_queries) das rotas de logs: com TESTING e LIMITE_QUERIES_ATIVO,
+uma requisição que exceder o limite da rota lança LimiteQueriesExcedido, de modo que a volta de um
+N+1 (ex.: o nome do usuário carregado log a log) faz estes testes falharem.
+
+Uso: python -m pytest tests
+"""
+import json
+from datetime import datetime, timedelta
+
+import pytest
+
+from app.diagnostico import LimiteQueriesExcedido
+from app.extensions import db
+from app.logs.models import Log, LogCampo
+from conftest import criar_administrador, autenticar
+
+QUANTIDADE_LOGS = 120
+QUANTIDADE_USUARIOS = 15
+
+
+@pytest.fixture
+def cliente(app):
+    """ Vários autores de logs e logs de todas as ações (para que um N+1 apareça) """
+    with app.app_context():
+        criar_administrador(QUANTIDADE_USUARIOS)
+        agora = datetime.now()
+        acoes = ('INSERT', 'UPDATE', 'DELETE')
+        db.session.execute(Log.__table__.insert(), [{
+            'ID_LOG': indice, 'ID_USUARIO': indice % QUANTIDADE_USUARIOS + 1, 'ACAO': acoes[indice % 3],
+            'TABELA': 'TBCARGO', 'ID_REGISTRO': indice,
+            'DADOS_ANTERIORES': json.dumps({'DESCRICAO': 'Anterior'}), 'DADOS_NOVOS': json.dumps({'DESCRICAO': 'Nova'}),
+            'DADOS_ALTERACOES': json.dumps({'DESCRICAO': ['Anterior', 'Nova']}),
+            'DATA_HORA': agora - timedelta(minutes=indice)
+        } for indice in range(1, QUANTIDADE_LOGS + 1)])
+        db.session.execute(LogCampo.__table__.insert(), [
+            {'CAMPO': 'DESCRICAO', 'ID_LOG': indice} for indice in range(1, QUANTIDADE_LOGS + 1) if indice % 3 == 1])
+        db.session.commit()
+    return autenticar(app)
+
+
+@pytest.mark.parametrize('url', [
+    '/logs/logs',
+    '/logs/logs?campo=DESCRICAO&tabela=TBCARGO',
+    '/logs/pagina?limite=100',
+    '/logs/detalhes/42',
+    '/logs/exportar/csv',
+])
+def test_rotas_de_logs_respeitam_o_limite_de_queries(cliente, url):
+    resposta = cliente.get(url)
+    resposta.get_data()  # Consome as respostas em streaming; o limite é verificado ao final da requisição
+    assert resposta.status_code == 200
+
+
+def test_paginacao_segue_o_cursor_dentro_do_limite(cliente):
+    primeira = cliente.get('/logs/pagina?limite=50').get_json()
+    assert primeira['proximo_cursor']
+    segunda = cliente.get(f"/logs/pagina?limite=50&cursor={primeira['proximo_cursor']}")
+    assert segunda.status_code == 200
+
+
+def test_limite_excedido_falha_em_modo_de_testes(app, cliente):
+    view = app.view_functions['logs.listar_logs']
+    limite_original = view.limite_queries
+    view.limite_queries = 0
+    try:
+        with pytest.raises(LimiteQueriesExcedido):
+            cliente.get('/logs/logs')
+    finally:
+        view.limite_queries = limite_original
@@ -0,0 +1,78 @@
+"""
+Logs de auditoria (app/logs/routes.py): diff por campo calculado na gravação (DADOS_ALTERACOES)
+e detalhes do log com ETag para o cache do navegador.
+"""
+import json
+from datetime import datetime
+
+import pytest
+
+from app.extensions import db
+from app.logs.models import Log, LogCampo
+from app.logs.routes import calcular_alteracoes, registrar_log, FORMATO_DETALHES
+from conftest import criar_administrador, autenticar
+
+
+@pytest.fixture
+def cliente(app):
+    with app.app_context():
+        criar_administrador()
+        db.session.commit()
+    return autenticar(app)
+
+
+@pytest.mark.parametrize('anteriores, novos, esperado', [
+    ({'NOME': 'A', 'DESCRICAO': 'x'}, {'NOME': 'B', 'DESCRICAO': 'x'}, {'NOME': ['A', 'B']}),
+    (None, {'NOME': 'A'}, {'NOME': [None, 'A']}),
+    ({'NOME': 'A'}, None, {'NOME': ['A', None]}),
+    ({'NOME': 'A', 'ANTIGO': 1}, {'NOME': 'A', 'NOVO': 2}, {'ANTIGO': [1, None], 'NOVO': [None, 2]}),
+    ({'NOME': 'A'}, {'NOME': 'A'}, {}),
+    ('texto', {'NOME': 'A'}, {'DADOS': ['texto', {'NOME': 'A'}]}),
+])
+def test_calcular_alteracoes(anteriores, novos, esperado):
+    assert calcular_alteracoes(anteriores, novos) == esperado
+
+
+def test_registrar_log_grava_o_diff_e_os_campos(contexto):
+    criar_administrador()
+    registrar_log(1, 'UPDATE', 'TBCARGO', 7, {'NOME_CARGO': 'Operador', 'DESCRICAO': 'x'},
+                  {'NOME_CARGO': 'Operador II', 'DESCRICAO': 'x'})
+    db.session.commit()
+
+    log = db.session.execute(db.select(Log)).scalar_one()
+    assert json.loads(log.DADOS_ALTERACOES) == {'NOME_CARGO': ['Operador', 'Operador II']}
+    assert db.session.execute(db.select(LogCampo.CAMPO)).scalars().all() == ['NOME_CARGO']
+
+
+def test_detalhes_retorna_apenas_as_alteracoes(app, cliente):
+    with app.app_context():
+        registrar_log(1, 'UPDATE', 'TBCARGO', 7, {'NOME_CARGO': 'Operador'}, {'NOME_CARGO': 'Operador II'})
+        db.session.commit()
+        id_log = db.session.execute(db.select(Log.ID_LOG)).scalar_one()
+
+    resposta = cliente.get(f'/logs/detalhes/{id_log}?formato={FORMATO_DETALHES}')
+    dados = resposta.get_json()
+    assert dados['ALTERACOES'] == {'NOME_CARGO': ['Operador', 'Operador II']}
+    assert 'DADOS_ANTERIORES' not in dados
+    assert dados['USUARIO'] == 'Usuário 1'
+
+    # O ETag inclui a versão do formato: uma resposta guardada no formato anterior não é reaproveitada
+    etag = resposta.headers['ETag']
+    assert str(FORMATO_DETALHES) in etag
+    assert cliente.get(f'/logs/detalhes/{id_log}', headers={'If-None-Match': etag}).status_code == 304
+    antigo = cliente.get(f'/logs/detalhes/{id_log}', headers={'If-None-Match': f'"log-{id_log}"'})
+    assert antigo.status_code == 200
+
+
+def test_detalhes_de_log_sem_diff_gravado(app, cliente):
+    """ Logs gravados antes da coluna DADOS_ALTERACOES têm o diff calculado na consulta """
+    with app.app_context():
+        db.session.add(Log(ID_LOG=1, ID_USUARIO=1, ACAO='UPDATE', TABELA='TBCARGO', ID_REGISTRO=3,
+                           DADOS_ANTERIORES=json.dumps({'NOME_CARGO': 'A'}), DADOS_NOVOS=json.dumps({'NOME_CARGO': 'B'}),
+                           DATA_HORA=datetime(2024, 1, 2, 3, 4, 5)))
+        db.session.commit()
+
+    dados = cliente.get('/logs/detalhes/1').get_json()
+    assert dados['ALTERACOES'] == {'NOME_CARGO': ['A', 'B']}
+    assert dados['DATA_HORA'] == '02/01/2024 03:04:05'
+    assert cliente.get('/logs/detalhes/999').status_code == 404
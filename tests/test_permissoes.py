@@ -0,0 +1,74 @@
+"""
+Permissões dos perfis (app/autenticacao/permissoes.py): máscaras de bits por perfil, acesso total do
+Administrador e respostas do @requires_permission (403 em JSON ou redirecionamento com mensagem).
+"""
+import pytest
+
+from app.extensions import db
+from app.autenticacao.models import User, Role, Permission, role_permission
+from app.autenticacao.permissoes import (mapa_permissoes, GERENCIAR_ACESSO, EXCLUIR_CARGO, IMPORTAR_DADOS,
+                                         VISUALIZAR_METRICAS)
+from conftest import SENHA, criar_administrador
+
+ADMINISTRADOR, GESTOR, LEITOR = 1, 2, 3
+
+
+@pytest.fixture
+def perfis(contexto):
+    """ Administrador (usuário 1), Gestor com duas permissões (usuário 2) e Leitor sem permissões (usuário 3) """
+    criar_administrador(quantidade_usuarios=3)
+    db.session.add_all([Role(ID_ROLE=GESTOR, NOME_ROLE='Gestor'), Role(ID_ROLE=LEITOR, NOME_ROLE='Leitor')])
+    db.session.add_all(Permission(ID_PERMISSION=id_permissao, NOME_PERMISSION=nome) for id_permissao, nome in
+                       enumerate((GERENCIAR_ACESSO, EXCLUIR_CARGO, IMPORTAR_DADOS, VISUALIZAR_METRICAS), start=1))
+    db.session.flush()
+    db.session.execute(role_permission.insert(), [{'ID_ROLE': GESTOR, 'ID_PERMISSION': 2},
+                                                  {'ID_ROLE': GESTOR, 'ID_PERMISSION': 3}])
+    db.session.get(User, 2).ID_ROLE = GESTOR
+    db.session.get(User, 3).ID_ROLE = LEITOR
+    db.session.commit()
+
+
+def test_mascaras_por_perfil(perfis):
+    assert mapa_permissoes.permissoes_do_perfil(GESTOR) == {EXCLUIR_CARGO, IMPORTAR_DADOS}
+    assert mapa_permissoes.tem_permissao(GESTOR, IMPORTAR_DADOS)
+    assert not mapa_permissoes.tem_permissao(GESTOR, GERENCIAR_ACESSO)
+    assert mapa_permissoes.permissoes_do_perfil(LEITOR) == set()
+    assert not mapa_permissoes.tem_permissao(GESTOR, 'PERMISSAO_INEXISTENTE')
+
+
+def test_administrador_possui_todas_as_permissoes(perfis):
+    assert mapa_permissoes.permissoes_do_perfil(ADMINISTRADOR) == {
+        GERENCIAR_ACESSO, EXCLUIR_CARGO, IMPORTAR_DADOS, VISUALIZAR_METRICAS}
+    assert mapa_permissoes.tem_permissao(ADMINISTRADOR, GERENCIAR_ACESSO)
+
+
+def test_mapa_recarregado_apos_invalidar(perfis):
+    assert not mapa_permissoes.tem_permissao(LEITOR, VISUALIZAR_METRICAS)
+    db.session.execute(role_permission.insert(), {'ID_ROLE': LEITOR, 'ID_PERMISSION': 4})
+    db.session.commit()
+
+    assert not mapa_permissoes.tem_permissao(LEITOR, VISUALIZAR_METRICAS)  # Mapa ainda em memória
+    mapa_permissoes.invalidar()
+    assert mapa_permissoes.tem_permissao(LEITOR, VISUALIZAR_METRICAS)
+
+
+def _cliente(app, login):
+    cliente = app.test_client()
+    assert cliente.post('/auth/login', data={'login': login, 'senha': SENHA}).status_code == 302
+    return cliente
+
+
+def test_rota_de_api_sem_permissao_responde_403(app, perfis):
+    resposta = _cliente(app, 'usuario2').get('/auth/usuario/1')
+    assert resposta.status_code == 403
+    assert resposta.get_json() == {'error': 'Não autorizado'}
+
+
+def test_pagina_sem_permissao_redireciona_com_mensagem(app, perfis):
+    resposta = _cliente(app, 'usuario3').get('/auth/gerenciar-acesso', follow_redirects=True)
+    assert resposta.request.path == '/'
+    assert 'Acesso não autorizado' in resposta.get_data(as_text=True)
+
+
+def test_perfil_com_permissao_acessa_a_rota(app, perfis):
+    assert _cliente(app, 'admin').get('/auth/usuario/2').status_code == 200
@@ -0,0 +1,68 @@
+"""
+Hashing de senhas em pool de processos (app/autenticacao/senhas.py): verificação, limite da fila
+e recuperação do pool quando um processo morre.
+"""
+import os
+from types import SimpleNamespace
+
+import pytest
+
+from app.autenticacao.senhas import ServicoSenhas, ServicoSenhaIndisponivel
+
+
+def _encerrar_processo():
+    os._exit(1)  # Simula um processo do pool encerrado pelo sistema (ex.: falta de memória)
+
+
+def _servico(processos=1, fila_max=2, rounds=4):
+    servico = ServicoSenhas()
+    servico.init_app(SimpleNamespace(config={
+        'BCRYPT_LOG_ROUNDS': rounds, 'SENHA_PROCESSOS': processos, 'SENHA_FILA_MAX': fila_max, 'SENHA_TIMEOUT': 10
+    }))
+    return servico
+
+
+@pytest.fixture
+def servico():
+    servico = _servico()
+    yield servico
+    if servico._executor is not None:
+        servico._executor.shutdown()
+
+
+@pytest.mark.parametrize('processos', [0, 1])
+def test_gerar_e_verificar(processos):
+    servico = _servico(processos)
+    senha_hash = servico.gerar_hash('segredo')
+    assert servico.verificar(senha_hash, 'segredo')
+    assert not servico.verificar(senha_hash, 'outra')
+    assert not servico.precisa_rehash(senha_hash)
+    assert _servico(processos, rounds=5).precisa_rehash(senha_hash)
+    if servico._executor is not None:
+        servico._executor.shutdown()
+
+
+def test_pool_quebrado_e_recriado(servico):
+    senha_hash = servico.gerar_hash('segredo')
+    quebrado = servico._executor
+
+    with pytest.raises(ServicoSenhaIndisponivel):
+        servico._executar(_encerrar_processo)
+    assert servico._executor is None
+
+    # A próxima operação cria um pool novo em vez de falhar até a aplicação ser reiniciada
+    assert servico.verificar(senha_hash, 'segredo')
+    assert servico._executor is not quebrado
+
+
+def test_fila_cheia_responde_imediatamente(servico):
+    # Ocupa as vagas (1 processo + 2 aguardando): a próxima operação não é enfileirada
+    for _ in range(3):
+        servico._vagas.acquire()
+    try:
+        with pytest.raises(ServicoSenhaIndisponivel):
+            servico.gerar_hash('segredo')
+    finally:
+        for _ in range(3):
+            servico._vagas.release()
+    assert servico._executor is None
@@ -0,0 +1,183 @@
+"""
+Tarefas em segundo plano (app/tarefas): submissão, acompanhamento, falhas, tarefas interrompidas,
+arquivos de estado bloqueados por outro processo e remoção das tarefas expiradas.
+"""
+import os
+import time
+
+import pytest
+
+from app.extensions import db
+from app.tarefas import gerenciador as modulo
+from app.tarefas.gerenciador import (gerenciador_tarefas, Tarefa, TarefaIndisponivel, FilaTarefasCheia,
+                                     PENDENTE, EXECUTANDO, CONCLUIDA, ERRO)
+from conftest import criar_administrador, autenticar
+
+
+def _aguardar(id_tarefa, tempo_maximo=10):
+    limite = time.monotonic() + tempo_maximo
+    while time.monotonic() < limite:
+        estado = gerenciador_tarefas.obter(id_tarefa)
+        if estado['status'] in (CONCLUIDA, ERRO):
+            return estado
+        time.sleep(0.02)
+    raise AssertionError(f'A tarefa {id_tarefa} não terminou')
+
+
+def _exportar(tarefa, linhas):
+    caminho = tarefa.caminho_resultado('csv')
+    with open(caminho, 'w', encoding='utf-8') as arquivo:
+        for indice in range(1, linhas + 1):
+            arquivo.write(f'{indice}\n')
+            tarefa.progresso(processadas=indice, total=linhas)
+    return {'arquivo': caminho, 'nome_download': 'dados.csv', 'mimetype': 'text/csv', 'linhas': linhas}
+
+
+def _falhar(tarefa):
+    raise RuntimeError('Falha na leitura')
+
+
+def _estado_externo(status, sinal_em):
+    """ Estado gravado por outro processo da aplicação """
+    estado = {'id': os.urandom(16).hex(), 'tipo': 'exportacao', 'usuario_id': 1, 'status': status, 'progresso': {},
+              'resultado': None, 'erro': None, 'criada_em': '2024-01-01T00:00:00', 'concluida_em': None,
+              'pid': -1, 'sinal_em': sinal_em}
+    gerenciador_tarefas.salvar(estado)
+    return estado['id']
+
+
+@pytest.fixture
+def cliente(app):
+    with app.app_context():
+        criar_administrador()
+        db.session.commit()
+    return autenticar(app)
+
+
+def test_submeter_e_acompanhar(app, cliente):
+    with app.test_request_context():
+        id_tarefa = gerenciador_tarefas.submeter('exportacao', 1, _exportar, 3)
+    estado = _aguardar(id_tarefa)
+    assert estado['status'] == CONCLUIDA
+    assert estado['progresso'] == {'processadas': 3, 'total': 3}
+    assert estado['pid'] == os.getpid()
+
+    situacao = cliente.get(f'/tarefas/{id_tarefa}').get_json()
+    assert situacao['status'] == CONCLUIDA
+    assert situacao['resultado'] == {'linhas': 3}  # O caminho do arquivo não é exposto
+    resposta = cliente.get(situacao['url_resultado'])
+    assert resposta.status_code == 200
+    assert resposta.get_data(as_text=True) == '1\n2\n3\n'
+
+
+def test_tarefa_de_outro_usuario_nao_e_exibida(app, cliente):
+    with app.test_request_context():
+        id_tarefa = gerenciador_tarefas.submeter('exportacao', 2, _exportar, 1)
+    _aguardar(id_tarefa)
+    assert cliente.get(f'/tarefas/{id_tarefa}').status_code == 404
+    assert cliente.get('/tarefas/inexistente').status_code == 404
+
+
+def test_falha_registrada_na_tarefa(app, cliente):
+    with app.test_request_context():
+        id_tarefa = gerenciador_tarefas.submeter('exportacao', 1, _falhar)
+    estado = _aguardar(id_tarefa)
+    assert (estado['status'], estado['erro']) == (ERRO, 'Falha na leitura')
+    assert cliente.get(f'/tarefas/{id_tarefa}/resultado').status_code == 409
+
+
+def test_tarefa_sem_sinal_de_vida_e_marcada_como_erro(app):
+    interrompida = _estado_externo(EXECUTANDO, time.time() - modulo.LIMITE_SEM_SINAL - 1)
+    em_andamento = _estado_externo(PENDENTE, time.time())
+
+    estado = gerenciador_tarefas.obter(interrompida)
+    assert estado['status'] == ERRO and estado['concluida_em']
+    assert gerenciador_tarefas.obter(interrompida)['status'] == ERRO  # Gravado no arquivo de estado
+    assert gerenciador_tarefas.obter(em_andamento)['status'] == PENDENTE
+
+
+def test_gravacao_atualiza_o_sinal_de_vida(app):
+    tarefa = Tarefa(gerenciador_tarefas, {'id': os.urandom(16).hex(), 'status': EXECUTANDO, 'progresso': {},
+                                          'sinal_em': 0})
+    tarefa.salvar()
+    assert time.time() - gerenciador_tarefas.obter(tarefa.id)['sinal_em'] < 5
+
+
+def test_limite_de_tarefas_considera_os_outros_processos(app, monkeypatch):
+    monkeypatch.setattr(gerenciador_tarefas, 'concorrencia', 1)
+    monkeypatch.setattr(gerenciador_tarefas, 'fila_max', 1)
+    _estado_externo(EXECUTANDO, time.time())
+    _estado_externo(EXECUTANDO, time.time() - modulo.LIMITE_SEM_SINAL - 1)  # Interrompida: não conta
+    _estado_externo(CONCLUIDA, time.time())
+    with app.test_request_context():
+        id_tarefa = gerenciador_tarefas.submeter('exportacao', 1, _exportar, 1)
+        _aguardar(id_tarefa)
+        _estado_externo(PENDENTE, time.time())
+        with pytest.raises(FilaTarefasCheia):
+            gerenciador_tarefas.submeter('exportacao', 1, _exportar, 1)
+
+
+def test_substituicao_bloqueada_e_repetida(app, monkeypatch):
+    monkeypatch.setattr(modulo, 'PAUSA_TENTATIVA', 0)
+    replace = os.replace
+    falhas = []
+
+    def replace_bloqueado(origem, destino):
+        if len(falhas) < 2:
+            falhas.append(destino)
+            raise PermissionError(13, 'O arquivo está sendo usado por outro processo', destino)
+        replace(origem, destino)
+
+    monkeypatch.setattr(modulo.os, 'replace', replace_bloqueado)
+    id_tarefa = _estado_externo(PENDENTE, time.time())
+    assert len(falhas) == 2
+    assert gerenciador_tarefas.obter(id_tarefa)['status'] == PENDENTE
+
+
+def test_gravacao_bloqueada_nao_interrompe_a_tarefa(app, monkeypatch):
+    monkeypatch.setattr(modulo, 'PAUSA_TENTATIVA', 0)
+    id_tarefa = _estado_externo(EXECUTANDO, time.time())
+    tarefa = Tarefa(gerenciador_tarefas, gerenciador_tarefas.obter(id_tarefa))
+
+    def bloqueado(origem, destino):
+        raise PermissionError(13, 'O arquivo está sendo usado por outro processo', destino)
+
+    with monkeypatch.context() as contexto:
+        contexto.setattr(modulo.os, 'replace', bloqueado)
+        tarefa.progresso(processadas=10)  # Apenas registra a falha
+    assert [nome for nome in os.listdir(gerenciador_tarefas.diretorio) if nome.endswith('.tmp')] == []
+
+    tarefa.salvar(status=CONCLUIDA)
+    assert gerenciador_tarefas.obter(id_tarefa)['progresso'] == {'processadas': 10}
+
+
+def test_leitura_bloqueada_responde_503(app, cliente, monkeypatch):
+    monkeypatch.setattr(modulo, 'PAUSA_TENTATIVA', 0)
+    id_tarefa = _estado_externo(EXECUTANDO, time.time())
+
+    def bloqueado(*args, **kwargs):
+        raise PermissionError(13, 'O arquivo está sendo usado por outro processo')
+
+    monkeypatch.setattr(modulo, 'open', bloqueado, raising=False)
+    with pytest.raises(TarefaIndisponivel):
+        gerenciador_tarefas.obter(id_tarefa)
+    resposta = cliente.get(f'/tarefas/{id_tarefa}')
+    assert resposta.status_code == 503
+    assert resposta.headers['Retry-After']
+
+
+def test_tarefas_expiradas_sao_removidas(app, monkeypatch):
+    antiga = _estado_externo(CONCLUIDA, time.time())
+    recente = _estado_externo(CONCLUIDA, time.time())
+    resultado = gerenciador_tarefas.caminho_arquivo(f'{antiga}.csv')
+    with open(resultado, 'w') as arquivo:
+        arquivo.write('1\n')
+    vencimento = time.time() - gerenciador_tarefas.retencao - 60
+    for caminho in (gerenciador_tarefas.caminho_arquivo(f'{antiga}.json'), resultado):
+        os.utime(caminho, (vencimento, vencimento))
+
+    monkeypatch.setattr(gerenciador_tarefas, '_proxima_limpeza', 0)
+    gerenciador_tarefas._limpar_expiradas()
+    assert gerenciador_tarefas.obter(antiga) is None
+    assert not os.path.exists(resultado)
+    assert gerenciador_tarefas.obter(recente)['status'] == CONCLUIDA